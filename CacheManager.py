@@ -0,0 +1,178 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class SQLiteCacheStore:
+    """
+    재시작 후에도 유지되는 SQLite 기반 키-값 저장소
+    - 값은 JSON으로 저장
+    - ttl(초)이 0보다 크면 그보다 오래된 항목은 없는 것으로 취급
+    """
+
+    def __init__(self, path, table='cache', ttl=0):
+        self.path = path
+        self.table = table
+        self.ttl = float(ttl)
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                f'CREATE TABLE IF NOT EXISTS {self.table} '
+                f'(key TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at REAL NOT NULL)'
+            )
+            self._conn.commit()
+
+    def get(self, key, default=None):
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    f'SELECT value, updated_at FROM {self.table} WHERE key = ?', (str(key),)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logging.error(f"SQLite 캐시 조회 오류 ({self.table}): {str(e)}")
+            return default
+        if row is None:
+            return default
+        if self.ttl > 0 and row[1] + self.ttl < time.time():
+            return default
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        try:
+            with self._lock:
+                self._conn.execute(
+                    f'INSERT OR REPLACE INTO {self.table} (key, value, updated_at) VALUES (?, ?, ?)',
+                    (str(key), json.dumps(value), time.time())
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logging.error(f"SQLite 캐시 저장 오류 ({self.table}): {str(e)}")
+
+    def delete(self, key):
+        try:
+            with self._lock:
+                self._conn.execute(f'DELETE FROM {self.table} WHERE key = ?', (str(key),))
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logging.error(f"SQLite 캐시 삭제 오류 ({self.table}): {str(e)}")
+
+    def prune(self, older_than):
+        """older_than(초)보다 오래된 항목을 삭제하고 삭제 건수를 반환합니다."""
+        try:
+            with self._lock:
+                cursor = self._conn.execute(
+                    f'DELETE FROM {self.table} WHERE updated_at < ?', (time.time() - older_than,)
+                )
+                self._conn.commit()
+                return cursor.rowcount
+        except sqlite3.Error as e:
+            logging.error(f"SQLite 캐시 정리 오류 ({self.table}): {str(e)}")
+            return 0
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute(f'SELECT COUNT(*) FROM {self.table}').fetchone()[0]
+
+
+class TTLCache:
+    """
+    스레드 안전한 메모리 캐시
+    - 항목별 유효 시간(ttl, 초)이 지나면 만료
+    - maxsize를 넘으면 가장 오래 사용되지 않은 항목부터 제거 (LRU)
+    - store(SQLiteCacheStore)를 지정하면 메모리 미스 시 디스크에서 읽어 다시 채움
+    - ttl이 0 이하이면 캐시를 사용하지 않음
+    """
+
+    def __init__(self, ttl=60, name='cache', maxsize=None, store=None):
+        self.ttl = float(ttl)
+        self.name = name
+        self.maxsize = int(maxsize) if maxsize else None
+        self.store = store
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.store_hits = 0
+
+    @property
+    def enabled(self):
+        return self.ttl > 0
+
+    def _put(self, key, value):
+        self._data[key] = (value, time.monotonic() + self.ttl)
+        self._data.move_to_end(key)
+        if self.maxsize:
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get(self, key, default=None):
+        if not self.enabled:
+            return default
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at >= time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+
+        if self.store is not None:
+            value = self.store.get(key)
+            if value is not None:
+                with self._lock:
+                    self._put(key, value)
+                    self.store_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def set(self, key, value):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._put(key, value)
+        if self.store is not None:
+            self.store.set(key, value)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+        if self.store is not None:
+            self.store.delete(key)
+
+    def discard_if(self, predicate):
+        """predicate(key)가 참인 메모리 항목을 모두 제거합니다."""
+        with self._lock:
+            for key in [key for key in self._data if predicate(key)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def get_stats(self):
+        with self._lock:
+            stats = {
+                'name': self.name,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+        if self.store is not None:
+            stats['store_hits'] = self.store_hits
+            stats['store_size'] = self.store.count()
+        return stats
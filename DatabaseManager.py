@@ -1,24 +1,43 @@
 import cx_Oracle
 import logging
 import os
+import threading
+from contextlib import contextmanager
 
 
 class DatabaseManager:
     _client_initialized = False  # 클래스 변수로 초기화 상태 추적
-    
-    def __init__(self, user, password, host, port, service_name):
+
+    def __init__(self, user, password, host, port, service_name,
+                 pool_min=1, pool_max=8, pool_increment=1,
+                 pool_timeout=300, pool_wait_timeout=5000, pool_ping_interval=60,
+                 name=None, statement_registry=None):
+        self.name = name or service_name
         self.user = user
         self.password = password
         self.host = host
         self.port = port
         self.service_name = service_name
         self.dsn = None
-        
+
+        # 세션 풀 설정 (.env에서 전달)
+        self.pool_min = int(pool_min)
+        self.pool_max = int(pool_max)
+        self.pool_increment = int(pool_increment)
+        self.pool_timeout = int(pool_timeout)            # 유휴 세션 정리 시간(초)
+        self.pool_wait_timeout = int(pool_wait_timeout)  # 세션 획득 대기 시간(ms)
+        self.pool_ping_interval = int(pool_ping_interval)
+        self.pool = None
+        self._pool_lock = threading.Lock()
+
+        # 새 세션마다 statement cache 설정 및 자주 쓰는 SQL을 미리 prepare
+        self.statement_registry = statement_registry
+
         # 클래스 전체에서 한 번만 초기화
         if not DatabaseManager._client_initialized:
             self._init_oracle_client()
             DatabaseManager._client_initialized = True
-            
+
         self._create_dsn()
 
     def _init_oracle_client(self):
@@ -27,7 +46,7 @@ class DatabaseManager:
             oracle_client_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "instantclient_21_7")
             if not os.path.exists(oracle_client_path):
                 raise Exception(f"Oracle client path not found: {oracle_client_path}")
-                
+
             cx_Oracle.init_oracle_client(lib_dir=oracle_client_path)
             logging.info("Oracle client initialized successfully")
         except Exception as e:
@@ -47,15 +66,48 @@ class DatabaseManager:
             logging.error(f"Failed to create DSN: {str(e)}")
             raise
 
+    def _get_pool(self):
+        """세션 풀을 반환합니다. 최초 호출 시 한 번만 생성합니다."""
+        if self.pool is not None:
+            return self.pool
+        with self._pool_lock:
+            if self.pool is None:
+                logging.info(f"Creating session pool for DSN: {self.dsn} "
+                             f"(min={self.pool_min}, max={self.pool_max}, increment={self.pool_increment})")
+                self.pool = cx_Oracle.SessionPool(
+                    user=self.user,
+                    password=self.password,
+                    dsn=self.dsn,
+                    min=self.pool_min,
+                    max=self.pool_max,
+                    increment=self.pool_increment,
+                    threaded=True,
+                    getmode=cx_Oracle.SPOOL_ATTRVAL_TIMEDWAIT,
+                    waitTimeout=self.pool_wait_timeout,
+                    timeout=self.pool_timeout,
+                    ping_interval=self.pool_ping_interval,
+                    stmtcachesize=self.statement_registry.stmt_cache_size if self.statement_registry else 20,
+                    sessionCallback=self._init_session if self.statement_registry else None,
+                    encoding='UTF-8'
+                )
+                logging.info("Session pool created successfully")
+        return self.pool
+
+    def _init_session(self, connection, requested_tag):
+        """풀에 새 세션이 만들어질 때 한 번 호출됩니다."""
+        try:
+            self.statement_registry.prepare_session(connection, self.name)
+        except Exception as e:
+            logging.error(f"Session initialization failed ({self.name}): {str(e)}")
+
     def connect(self):
+        """
+        풀에서 세션을 하나 가져옵니다.
+        반환된 커넥션의 close()를 호출하면 세션은 끊기지 않고 풀로 반환됩니다.
+        """
         try:
-            logging.info(f"Attempting to connect to database with DSN: {self.dsn}")
-            connection = cx_Oracle.connect(
-                user=self.user,
-                password=self.password,
-                dsn=self.dsn
-            )
-            logging.info("Database connection successful")
+            connection = self._get_pool().acquire()
+            logging.debug(f"Session acquired from pool: {self.dsn}")
             return connection
         except cx_Oracle.Error as e:
             error_msg = f"Database connection error: {str(e)}"
@@ -65,10 +117,66 @@ class DatabaseManager:
                          f"service_name={self.service_name}, user={self.user}")
             raise
 
+    def release(self, connection):
+        """세션을 풀로 반환합니다."""
+        try:
+            if connection is not None and self.pool is not None:
+                self.pool.release(connection)
+        except cx_Oracle.Error as e:
+            logging.error(f"Error releasing session to pool: {str(e)}")
+
+    @contextmanager
+    def acquire(self):
+        """with 구문으로 세션을 사용하고 블록이 끝나면 풀로 반환합니다."""
+        connection = self.connect()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    @contextmanager
+    def cursor(self):
+        """풀 세션의 커서를 제공하고 블록이 끝나면 커서를 닫고 세션을 반환합니다."""
+        with self.acquire() as connection:
+            cursor = connection.cursor()
+            try:
+                yield connection, cursor
+            finally:
+                cursor.close()
+
+    def ping(self):
+        """풀 세션으로 DB 상태를 확인합니다."""
+        try:
+            with self.acquire() as connection:
+                connection.ping()
+            return True
+        except cx_Oracle.Error as e:
+            logging.error(f"Database ping failed ({self.dsn}): {str(e)}")
+            return False
+
+    def get_pool_stats(self):
+        """세션 풀 통계를 반환합니다."""
+        if self.pool is None:
+            return {'created': False}
+        return {
+            'created': True,
+            'stmt_cache_size': self.pool.stmtcachesize,
+            'min': self.pool.min,
+            'max': self.pool.max,
+            'increment': self.pool.increment,
+            'opened': self.pool.opened,
+            'busy': self.pool.busy,
+            'timeout': self.pool.timeout,
+            'wait_timeout': self.pool.wait_timeout,
+            'ping_interval': self.pool.ping_interval
+        }
+
     def close(self):
+        """세션 풀을 닫습니다."""
         try:
-            if hasattr(self, 'connection') and self.connection:
-                self.connection.close()
-                logging.info("Database connection closed")
+            if self.pool is not None:
+                self.pool.close(force=True)
+                self.pool = None
+                logging.info("Session pool closed")
         except Exception as e:
-            logging.error(f"Error closing database connection: {str(e)}")
+            logging.error(f"Error closing session pool: {str(e)}")
@@ -0,0 +1,138 @@
+import logging
+import threading
+import time
+
+
+class EmployeeDirectory:
+    """
+    사원번호 → 이름/부서 메모리 디렉터리 (ORA7 EMPM)
+    - 최초 사용 시 EMPM 전체를 한 번에 읽어 적재
+    - refresh()는 스케줄러에서 주기적으로 호출되어 새 목록으로 통째로 교체
+    - 디렉터리에 없는 사원번호는 EMP.sql로 한 건만 조회해 채움 (신규 입사자)
+    - 로그인(get_active)은 적재된 목록 대신 항상 EMP.sql로 재직 여부를 확인 (퇴직 처리 즉시 반영)
+    """
+
+    def __init__(self, db_manager, statement_registry, miss_ttl=300):
+        self.db_manager = db_manager
+        self.statements = statement_registry
+        self.miss_ttl = float(miss_ttl)  # 없는 사원번호를 다시 조회하지 않는 시간(초)
+        self._employees = {}
+        self._missing = {}
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self.loaded_at = None
+        self._load_attempted_at = None
+        self.hits = 0
+        self.misses = 0
+        self.lookups = 0
+
+    def _ensure_loaded(self):
+        # 적재에 실패했으면 miss_ttl 동안은 다시 시도하지 않고 한 건 조회로 동작
+        if self.loaded_at is None:
+            with self._load_lock:
+                attempted_at = self._load_attempted_at
+                if self.loaded_at is None and (attempted_at is None or attempted_at + self.miss_ttl < time.time()):
+                    self._load_attempted_at = time.time()
+                    self.refresh()
+
+    def refresh(self):
+        """EMPM 전체를 다시 읽어 디렉터리를 교체합니다."""
+        started = time.perf_counter()
+        try:
+            with self.db_manager.cursor() as (connection, cursor):
+                cursor.arraysize = 1000
+                self.statements.execute(cursor, 'emp_directory')
+                employees = {
+                    row[0]: {
+                        'emp_no': row[0],
+                        'emp_name': row[1],
+                        'dept_code': row[2],
+                        'dept_name': row[3],
+                        'active': row[4] == 1
+                    }
+                    for row in cursor
+                }
+        except Exception as e:
+            logging.error(f"사원 디렉터리 적재 오류: {str(e)}")
+            return False
+
+        with self._lock:
+            self._employees = employees
+            self._missing.clear()
+            self.loaded_at = time.time()
+        logging.info(f"사원 디렉터리 적재 완료: {len(employees)}명 "
+                     f"({(time.perf_counter() - started) * 1000:.0f}ms)")
+        return True
+
+    def _lookup(self, emp_no):
+        """디렉터리에 없는 사원번호를 EMP.sql로 조회합니다. (재직자만 반환)"""
+        with self._lock:
+            missed_at = self._missing.get(emp_no)
+        if missed_at is not None and missed_at + self.miss_ttl > time.time():
+            return None
+
+        with self.db_manager.cursor() as (connection, cursor):
+            self.statements.execute(cursor, 'emp_by_no', {'employee_id': emp_no})
+            row = cursor.fetchone()
+
+        with self._lock:
+            self.lookups += 1
+            if row is None:
+                self._missing[emp_no] = time.time()
+                employee = self._employees.get(emp_no)
+                if employee is not None and employee['active']:
+                    # 적재 이후 퇴직/비활성화된 사원 - 이름 조회용으로 남기고 비재직으로 표시
+                    self._employees[emp_no] = dict(employee, active=False)
+                return None
+            employee = {
+                'emp_no': row[2],
+                'emp_name': row[3],
+                'dept_code': row[0],
+                'dept_name': row[1],
+                'active': True
+            }
+            self._employees[emp_no] = employee
+            return employee
+
+    def get(self, emp_no, read_through=True):
+        """
+        사원 정보를 반환합니다.
+
+        :param emp_no: 사원번호
+        :param read_through: 디렉터리에 없으면 DB에서 한 건 조회할지 여부
+        :return: {'emp_no', 'emp_name', 'dept_code', 'dept_name', 'active'} 또는 None
+        """
+        self._ensure_loaded()
+        with self._lock:
+            employee = self._employees.get(emp_no)
+            if employee is not None:
+                self.hits += 1
+                return employee
+            self.misses += 1
+        if not read_through:
+            return None
+        return self._lookup(emp_no)
+
+    def get_active(self, emp_no):
+        """
+        로그인용 조회 - 재직자만 반환
+        적재된 목록은 갱신 주기만큼 늦을 수 있으므로 EMP.sql 한 건 조회로 매번 확인
+        """
+        return self._lookup(emp_no)
+
+    def get_name(self, emp_no, default='-'):
+        """이력 화면용 이름 조회 (DB 조회 없이 디렉터리만 사용)"""
+        employee = self.get(emp_no, read_through=False) if emp_no else None
+        return employee['emp_name'] if employee else default
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'name': 'employee_directory',
+                'size': len(self._employees),
+                'loaded_at': self.loaded_at,
+                'hits': self.hits,
+                'misses': self.misses,
+                'lookups': self.lookups,
+                'missing': len(self._missing)
+            }
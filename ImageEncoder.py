@@ -0,0 +1,61 @@
+import cv2
+import numpy as np
+
+
+class ImageEncoder:
+    """
+    응답용 이미지 인코더 (OpenCV imencode 사용 - PIL 저장보다 빠름)
+    - png : 무손실, 압축 레벨 조정 가능 (낮을수록 빠르고 파일이 큼)
+    - webp: 무손실 WebP, Accept에 image/webp가 있을 때 사용
+    - jpeg: 손실 압축, 미리보기(preview) 요청에서만 사용
+    """
+
+    FORMATS = {
+        'png': ('.png', 'image/png'),
+        'webp': ('.webp', 'image/webp'),
+        'jpeg': ('.jpg', 'image/jpeg'),
+    }
+
+    def __init__(self, png_compression=1, jpeg_quality=90, webp_enabled=True):
+        self.png_compression = int(png_compression)
+        self.jpeg_quality = int(jpeg_quality)
+        self.webp_enabled = webp_enabled
+
+    def negotiate(self, accept_header, preview=False):
+        """
+        Accept 헤더로 응답 형식을 고릅니다.
+        체크시트 화면은 받은 이미지를 캔버스에 그려 그대로 저장하므로 기본은 무손실 형식만 사용합니다.
+        """
+        accept = (accept_header or '').lower()
+        if preview and ('image/jpeg' in accept or 'image/*' in accept or '*/*' in accept):
+            return 'jpeg'
+        if self.webp_enabled and 'image/webp' in accept:
+            return 'webp'
+        return 'png'
+
+    def params_for(self, fmt):
+        if fmt == 'png':
+            return [cv2.IMWRITE_PNG_COMPRESSION, self.png_compression]
+        if fmt == 'webp':
+            # OpenCV는 품질 100 초과 시 무손실 WebP로 저장
+            return [cv2.IMWRITE_WEBP_QUALITY, 101]
+        return [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality]
+
+    def encode(self, image, fmt='png'):
+        """
+        BGR(또는 그레이스케일) numpy 이미지를 인코딩합니다.
+
+        :return: (bytes, mimetype)
+        """
+        extension, mimetype = self.FORMATS[fmt]
+        ok, buffer = cv2.imencode(extension, image, self.params_for(fmt))
+        if not ok:
+            raise ValueError(f"이미지 인코딩 실패: {fmt}")
+        return buffer.tobytes(), mimetype
+
+    @staticmethod
+    def from_pil(pil_image):
+        """PIL RGB 이미지를 OpenCV용 BGR 배열로 변환합니다."""
+        if pil_image.mode != 'RGB':
+            pil_image = pil_image.convert('RGB')
+        return np.ascontiguousarray(np.asarray(pil_image)[:, :, ::-1])
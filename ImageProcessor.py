@@ -3,17 +3,69 @@ from PIL import Image, ImageDraw
 import os
 import numpy as np
 from pdf2image import convert_from_path
+from ImageEncoder import ImageEncoder
+from MergeLayout import MergeLayout
+from PageImage import PageImage
 
 class ImageProcessor:
+    def __init__(self, render_index=None, pdf_render_threads=1, storage_mode='rgb'):
+        # 마스터 PDF 렌더링 기록 (메모리 + 선택적으로 재시작 후에도 유지되는 저장소(SQLiteCacheStore))
+        self.render_index = render_index
+        self._rendered = {}
+        self.pdf_render_threads = int(pdf_render_threads)
+        # Process/Master 페이지 저장 형식 (PageImage.MODES: rgb 또는 gray+색 오버레이)
+        if storage_mode not in PageImage.MODES:
+            raise ValueError(f"지원하지 않는 페이지 저장 형식: {storage_mode}")
+        self.storage_mode = storage_mode
+
+    # find_checkboxes 결과가 달라지는 변경 시 올려서 저장된 인식 결과를 무효화
+    CHECKBOX_DETECTION_VERSION = 1
+
+    # 체크박스 인식 제외 영역: (부서 그룹, 공정, VJ77 여부) → [(x1, x2, y1, y2), ...]
+    # VJ77 여부가 None이면 모델과 관계없이 적용, x2/y2가 None이면 이미지 끝까지
+    CHECKBOX_EXCLUSION_ZONES = {
+        ('UTA', '06', None): [(800, None, 200, 380)],
+        ('UTA', '11', None): [(825, None, 180, 350)],
+        ('UTA', '15', None): [(850, None, 180, 310)],
+        ('JUXTA', '10', True): [(550, None, 270, 380)],
+        ('JUXTA', '11', True): [(0, None, 0, 500)],
+        ('JUXTA', '11', False): [(0, 50, 0, None)],
+        ('JUXTA', '07', False): [(0, None, 400, 510)],
+        ('JUXTA', '10', False): [(0, 700, 80, 140)],
+    }
+
+    @staticmethod
+    def get_exclusion_zones(image_shape, process_code=None, model=None, dept=None):
+        """부서/공정/모델에 해당하는 제외 영역을 이미지 크기로 채워 반환합니다."""
+        if dept in ['3165', 'UTA']:
+            group = 'UTA'
+        elif dept in ['3186', 'JUXTA']:
+            group = 'JUXTA'
+        else:
+            return []
+        zones = ImageProcessor.CHECKBOX_EXCLUSION_ZONES
+        entries = zones.get((group, process_code, model == 'VJ77')) or zones.get((group, process_code, None)) or []
+        height, width = image_shape[:2]
+        return [(x1, width if x2 is None else x2, y1, height if y2 is None else y2)
+                for x1, x2, y1, y2 in entries]
+
     @staticmethod
     def find_checkboxes(image, process_code=None, model=None, dept=None):
-        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        # 그레이스케일 페이지(PageImage gray 형식)는 변환 없이 그대로 사용
+        gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
         blurred = cv2.GaussianBlur(gray, (3, 3), 0)
         edges = cv2.Canny(blurred, 50, 150)
         contours, _ = cv2.findContours(edges, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+
+        # 제외 영역은 윤곽선마다가 아니라 한 번만 계산
+        exclusion_zones = ImageProcessor.get_exclusion_zones(image.shape, process_code, model, dept)
         
         boxes = []
         for cnt in contours:
+            # 근사 다각형의 외접 사각형은 윤곽선 외접 사각형 안에 있으므로 작은 윤곽선은 바로 제외
+            cx, cy, cw, ch = cv2.boundingRect(cnt)
+            if cw < 7 or ch < 7:
+                continue
             approx = cv2.approxPolyDP(cnt, 0.04 * cv2.arcLength(cnt, True), True)
             if len(approx) == 4:
                 x, y, w, h = cv2.boundingRect(approx)
@@ -21,54 +73,66 @@ class ImageProcessor:
                 if 0.9 <= aspect_ratio <= 1.13:  # 정사각형에 가까운 비율
                     # 작은 사각형만 선택 (예: 10x10 ~ 30x30 픽셀)
                     if 7 <= w <= 25 and 7 <= h <= 25:
-                        # 단자체결기 공정(06)일 경우 제외 영역 체크
-                        if dept in ['3165', 'UTA']:
-                            if process_code == '06' and dept in ['3165', 'UTA']:
-                                # 제외 영역에 있는 체크박스는 건너뜀
-                                if 800 <= x <= image.shape[1] and 200 <= y <= 380:
-                                    continue
-                            elif process_code == '11' and dept in ['3165', 'UTA']:
-                                if 825 <= x <= image.shape[1] and 180 <= y <= 350:
-                                    continue
-                            elif process_code == '15' and dept in ['3165', 'UTA']:
-                                if 850 <= x <= image.shape[1] and 180 <= y <= 310:
-                                    continue
-                        if dept in ['3186', 'JUXTA']:
-                            if process_code == '10' and model == 'VJ77':
-                                if 550 <= x <= image.shape[1] and 270 <= y <= 380:
-                                    continue
-                            elif process_code == '11' and model == 'VJ77':
-                                if 0 <= x <= image.shape[1] and 0 <= y <= 500:
-                                    continue
-                            elif process_code == '11' and model == 'VJ77':
-                                if 0 <= x <= image.shape[1] and 0 <= y <= 500:
-                                    continue
-                            elif process_code == '11' and model != 'VJ77':
-                                if 0 <= x <= 50 and 0 <= y <= image.shape[0]:
-                                    continue
-                            elif process_code == '07' and model != 'VJ77':
-                                if 0 <= x <= image.shape[1] and 400 <= y <= 510:
-                                    continue
-                            elif process_code == '10' and model != 'VJ77':
-                                if 0 <= x <= 700 and 80 <= y <= 140:
-                                    continue
+                        # 제외 영역에 있는 체크박스는 건너뜀
+                        if any(x1 <= x <= x2 and y1 <= y <= y2 for x1, x2, y1, y2 in exclusion_zones):
+                            continue
                     
-                        # 내부 영역의 균일성 검사
-                        mask = np.zeros(gray.shape, np.uint8)
-                        cv2.drawContours(mask, [cnt], 0, 255, -1)
-                        mean, stddev = cv2.meanStdDev(gray, mask=mask)
+                        # 내부 영역의 균일성 검사 - 이미지 전체가 아니라 윤곽선 외접 사각형(ROI)만 사용
+                        roi = gray[cy:cy + ch, cx:cx + cw]
+                        mask = np.zeros(roi.shape, np.uint8)
+                        cv2.drawContours(mask, [cnt], 0, 255, -1, offset=(-cx, -cy))
+                        mean, stddev = cv2.meanStdDev(roi, mask=mask)
                         
                         # 균일성이 높은 경우만 선택
                         if stddev[0][0] < 40:
                             boxes.append({'x': x, 'y': y, 'width': w, 'height': h})
-                            #print(f"체크박스 발견: ({x}, {y}), 크기: {w}x{h}, 균일성: {stddev[0][0]:.2f}, {image.shape[1]},{image.shape[0]},{process_code},{model}")
         
-        result_image = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        result_image = PageImage.to_pil(image)
         draw = ImageDraw.Draw(result_image)
         for box in boxes:
             draw.rectangle([box['x'], box['y'], box['x'] + box['width'], box['y'] + box['height']], outline='red')
         return result_image, boxes
 
+    @staticmethod
+    def merge_similar_boxes(boxes, threshold=20):
+        """
+        x, y가 모두 threshold 미만으로 떨어진 박스를 평균 위치로 통합합니다.
+        - 각 박스는 앞에서부터 처음 일치하는 통합 박스와 합쳐지고, 합쳐진 박스는 새 위치로 이동
+        - 통합 박스를 threshold 크기 격자에 넣어 주변 9칸만 비교 (전체 비교 O(n²) 대신)
+        """
+        merged_boxes = []
+        grid = {}  # (격자 x, 격자 y) -> 통합 박스 인덱스 목록
+
+        for box in boxes:
+            cell_x, cell_y = box['x'] // threshold, box['y'] // threshold
+            match = None
+            for grid_x in (cell_x - 1, cell_x, cell_x + 1):
+                for grid_y in (cell_y - 1, cell_y, cell_y + 1):
+                    for i in grid.get((grid_x, grid_y), ()):
+                        merged_box = merged_boxes[i]
+                        if (abs(box['x'] - merged_box['x']) < threshold and
+                                abs(box['y'] - merged_box['y']) < threshold and
+                                (match is None or i < match)):
+                            match = i
+
+            if match is None:
+                grid.setdefault((cell_x, cell_y), []).append(len(merged_boxes))
+                merged_boxes.append(box)
+                continue
+
+            # 비슷한 위치의 박스를 발견하면 평균값으로 통합하고 격자 위치 갱신
+            merged_box = merged_boxes[match]
+            grid[(merged_box['x'] // threshold, merged_box['y'] // threshold)].remove(match)
+            merged_boxes[match] = {
+                'x': (box['x'] + merged_box['x']) // 2,
+                'y': (box['y'] + merged_box['y']) // 2,
+                'width': max(box['width'], merged_box['width']),
+                'height': max(box['height'], merged_box['height'])
+            }
+            grid.setdefault((merged_boxes[match]['x'] // threshold, merged_boxes[match]['y'] // threshold), []).append(match)
+
+        return merged_boxes
+
     @staticmethod
     def debug_clustering(image_path, threshold_ratio=0.35, proximity_distance=10):
         """밀집 구간 분석 디버깅"""
@@ -283,20 +347,34 @@ class ImageProcessor:
         
         return valid_groups, rejected_groups
 
+    @staticmethod
+    def _ink_margins(projection):
+        """
+        투영값이 0보다 큰 첫/마지막 위치(좌우 마진)를 반환합니다. 없으면 (0, 길이-1)
+        """
+        ink = np.flatnonzero(projection)
+        if ink.size == 0:
+            return 0, len(projection) - 1
+        return int(ink[0]), int(ink[-1])
+
     @staticmethod
     def split_image_by_horizontal_lines(image_path, base_serial, start_index, 
                                         threshold_ratio=0.4, proximity_distance=10, 
-                                        min_row_height=10, min_group_thickness=5, dept=None, model=None):
+                                        min_row_height=10, min_group_thickness=5, dept=None, model=None,
+                                        image=None, output_folder=None, storage_mode='rgb'):
         """
         이미지에서 수평선을 기준으로 이미지를 분할합니다.
         
-        :param image_path: 이미지를 분할할 이미지 파일의 경로
+        :param image_path: 이미지를 분할할 이미지 파일의 경로 (image를 넘기면 읽지 않음)
         :param threshold: 수평선 검출을 위한 임계값
         :param min_row_height: 최소 행 높이
+        :param image: 메모리에 있는 BGR 또는 그레이스케일 이미지 (렌더링 직후 페이지를 다시 읽지 않고 사용)
+        :param output_folder: 분할 이미지 저장 폴더 (기본: image_path 기준 ../Process/base_serial)
+        :param storage_mode: 분할 이미지 저장 형식 (PageImage.MODES)
         :return: 분할된 이미지들의 경로 리스트
         """
-        # 이미지 로드
-        img = cv2.imread(image_path, cv2.IMREAD_COLOR)
+        # 이미지 로드 (메모리 이미지가 없을 때만 한 번 읽음)
+        img = image if image is not None else PageImage.read(image_path)
         if img is None:
             print(f"이미지를 불러올 수 없습니다: {image_path}")
             return []
@@ -307,6 +385,9 @@ class ImageProcessor:
         if start_index is None:
             start_index = 0
 
+        if output_folder is None:
+            output_folder = os.path.join(os.path.dirname(os.path.dirname(image_path)), 'Process', base_serial)
+
         # ImageProcessor.debug_thickness_filtering(image_path, threshold_ratio=0.35, proximity_distance=10, min_group_thickness=min_row_height)
         # ImageProcessor.debug_clustering(image_path)
         # ImageProcessor.debug_horizontal_projection(image_path)
@@ -314,8 +395,7 @@ class ImageProcessor:
         임계값을 넘는 픽셀 합계가 밀집된 구간을 그룹화하고,
         그룹 두께가 min_group_thickness 이상인 경우에만 분할점으로 사용
         """
-        img = cv2.imread(image_path)
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
         _, binary = cv2.threshold(gray, 200, 255, cv2.THRESH_BINARY_INV)
 
         horizontal_projection = np.sum(binary, axis=1)
@@ -325,20 +405,7 @@ class ImageProcessor:
 
         # 좌우 마진 찾기 (수직 투영 계산)
         vertical_projection = np.sum(binary, axis=0)
-        left_margin = 0
-        right_margin = img.shape[1] - 1
-
-        # 왼쪽 마진 찾기 (왼쪽에서 오른쪽으로 탐색)
-        for i, value in enumerate(vertical_projection):
-            if value > 0:  # 검정 픽셀이 있는 경우
-                left_margin = i
-                break
-
-        # 오른쪽 마진 찾기 (오른쪽에서 왼쪽으로 탐색)
-        for i in range(img.shape[1] - 1, -1, -1):
-            if vertical_projection[i] > 0:  # 검정 픽셀이 있는 경우
-                right_margin = i
-                break
+        left_margin, right_margin = ImageProcessor._ink_margins(vertical_projection)
 
         print(f"좌우 마진: left_margin={left_margin}, right_margin={right_margin}")
         margin_width = right_margin - left_margin
@@ -352,12 +419,10 @@ class ImageProcessor:
                 
                 if cropped.size > 0:
                     output_filename = f"{base_serial}_{start_index}.png"
-                    base_directory = os.path.dirname(os.path.dirname(image_path))
-                    process_folder = os.path.join(base_directory, 'Process', base_serial)
-                    os.makedirs(process_folder, exist_ok=True)
-                    output_path = os.path.join(process_folder, output_filename)
+                    os.makedirs(output_folder, exist_ok=True)
+                    output_path = os.path.join(output_folder, output_filename)
 
-                    cv2.imwrite(output_path, cropped)
+                    PageImage.write(output_path, cropped, storage_mode)
                     print(f"저장됨: {output_filename} (전체 이미지, 좌우 마진 적용, 크기: {cropped.shape})")
                     return [output_path]
                 else:
@@ -369,17 +434,9 @@ class ImageProcessor:
 
         print(f"탐지된 원본 행들: {detected_lines}")
 
-        # 밀집된 행들을 그룹화
-        groups = []
-        current_group = [detected_lines[0]]  # 수정: detected_lines[0]
-
-        for i in range(1, len(detected_lines)):
-            if detected_lines[i] - detected_lines[i-1] <= proximity_distance:
-                current_group.append(detected_lines[i])
-            else:
-                groups.append(current_group)
-                current_group = [detected_lines[i]]
-        groups.append(current_group)
+        # 밀집된 행들을 그룹화 (간격이 proximity_distance를 넘는 곳에서 나눔)
+        breaks = np.flatnonzero(np.diff(detected_lines) > proximity_distance) + 1
+        groups = np.split(detected_lines, breaks)
 
         print(f"그룹화 결과:")
         for i, group in enumerate(groups):
@@ -391,35 +448,20 @@ class ImageProcessor:
             group_thickness = len(group)
             if group_thickness >= 20 and group_thickness <= 40:
                 # 추가 검사: 해당 그룹 영역의 좌우 마진 계산
-                group_start = min(group)
-                group_end = max(group)
+                group_start = int(group[0])
+                group_end = int(group[-1])
                 
-                # 그룹 영역의 수직 투영 계산
+                # 그룹 영역의 수직 투영으로 그룹의 좌우 마진 계산
                 group_region = binary[group_start:group_end+1, :]
                 group_vertical_projection = np.sum(group_region, axis=0)
-                
-                # 그룹의 좌우 마진 찾기
-                group_left_margin = 0
-                group_right_margin = img.shape[1] - 1
-                
-                # 그룹의 왼쪽 마진
-                for i, value in enumerate(group_vertical_projection):
-                    if value > 0:
-                        group_left_margin = i
-                        break
-                
-                # 그룹의 오른쪽 마진
-                for i in range(img.shape[1] - 1, -1, -1):
-                    if group_vertical_projection[i] > 0:
-                        group_right_margin = i
-                        break
+                group_left_margin, group_right_margin = ImageProcessor._ink_margins(group_vertical_projection)
                 
                 # 그룹의 폭 계산
                 group_margin_width = group_right_margin - group_left_margin
                 
                 # 전체 폭과 비교하여 최종 결정
                 if group_margin_width >= margin_width * 0.8:  # 전체 폭의 80% 이상
-                    front_row = min(group)
+                    front_row = group_start
                     split_rows.append(front_row)
                     print(f"    ✅ 분할점 추가: {front_row} (두께: {group_thickness}px, 폭: {group_margin_width}px)")
                 else:
@@ -434,6 +476,7 @@ class ImageProcessor:
     
         # 이미지 분할 및 저장
         saved_files = []
+        os.makedirs(output_folder, exist_ok=True)
         print(f"DEBUG: dept={dept}, model={model}, start_index={start_index}")
         for i in range(len(split_points) - 1):
             y_start = split_points[i]
@@ -463,12 +506,9 @@ class ImageProcessor:
                     else:
                         file_index = start_index + i
                     output_filename = f"{base_serial}_{file_index}.png"
-                    base_directory = os.path.dirname(os.path.dirname(image_path))
-                    process_folder = os.path.join(base_directory,'Process', base_serial)
-                    os.makedirs(process_folder, exist_ok=True)
-                    output_path = os.path.join(process_folder, output_filename)
+                    output_path = os.path.join(output_folder, output_filename)
 
-                    cv2.imwrite(output_path, cropped)
+                    PageImage.write(output_path, cropped, storage_mode)
                     saved_files.append(output_path)
                     
                     print(f"저장됨: {output_filename} (Row {y_start}~{y_end}, Col {left_margin}~{right_margin}, 크기: {cropped.shape})")
@@ -482,43 +522,14 @@ class ImageProcessor:
     @staticmethod
     def merge_checksheet_images_uta(image_paths, output_path, target_width=800):
         """
-        모든 체크시트 이미지를 하나의 이미지로 세로로 합칩니다.
+        모든 체크시트 이미지를 하나의 이미지로 세로로 합칩니다. (MergeLayout 합성기 사용)
         
         :param image_paths: 합칠 이미지들의 경로 리스트
         :param output_path: 합쳐진 이미지를 저장할 경로
         :param target_width: 모든 이미지의 동일한 너비
         """
-        images = []
-        # 이미지 불러오기 및 크기 조정
-        for path in image_paths:
-            try:
-                img = Image.open(path)
-                # 비율을 유지하며 높비를 target_width로 조정
-                aspect_ratio = target_width / img.width
-                new_height = int(img.height * aspect_ratio)
-                img = img.resize((target_width, new_height), Image.LANCZOS)
-                images.append(img)
-            except Exception as e:
-                print(f"이미지를 불러오는 중 오류 발생: {path}, 오류: {e}")
-
-        if not images:
-            print("합칠 이미지가 없습니다.")
-            return
-
-        # 모든 이미지의 총 너이 계산
-        total_height = sum(img.height for img in images)
-        # 합쳐질 이미지의 크기 설정
-        merged_image = Image.new('RGB', (target_width, total_height))
-
-        # 이미지 순서대로 합치기
-        current_y = 0
-        for img in images:
-            merged_image.paste(img, (0, current_y))
-            current_y += img.height
-
-        # 합쳐진 이미지 저장
-        merged_image.save(output_path)
-        print(f"체크시트가 성공적으로 합쳐졌습니다: {output_path}")
+        if MergeLayout.compose([{'paths': image_paths, 'width': target_width}], output_path):
+            print(f"체크시트가 성공적으로 합쳐졌습니다: {output_path}")
 
     @staticmethod
     def merge_checksheet_images_juxta(image_paths, output_path, target_width=800):
@@ -526,183 +537,77 @@ class ImageProcessor:
         - 첫 번째(왼쪽) 이미지는 원본 크기 그대로 사용.
         - 오른쪽 이미지는 여러 장(공정 07,10,11 등)을 세로로 이어붙인 뒤,
         '왼쪽 이미지의 높이'에 맞춰 축소(혹은 확대)한 다음, 좌우로 합친다.
-        - 결과적으로, "왼쪽 이미지는 원본 그대로, 오른쪽 이미지는 세로 길이만 왼쪽에 맞춤."
+        - 오른쪽 이미지가 없으면 왼쪽 이미지만 저장
         """
-
         if not image_paths:
             print("합칠 이미지가 없습니다.")
             return
-
-        # 1) 맨 앞 이미지 = '왼쪽' 기준 이미지
-        left_path = image_paths[0]
-        right_paths = image_paths[1:]  # 나머지(오른쪽에 붙일 이미지들)
-
-        # (A) 왼쪽 이미지 로드
-        try:
-            img_left = cv2.imread(left_path, cv2.IMREAD_COLOR)  # shape: (h, w, 3), BGR
-            if img_left is None:
-                print(f"왼쪽 이미지 로드 실패: {left_path}")
-                return
-        except Exception as e:
-            print(f"왼쪽 이미지 로드 오류: {left_path}, {e}")
-            return
-
-        # (B) 오른쪽 이미지 로드
-        right_images = []
-        for path in right_paths:
-            try:
-                img_r = cv2.imread(path, cv2.IMREAD_COLOR)
-                if img_r is not None:
-                    right_images.append(img_r)
-                else:
-                    print(f"오른쪽 이미지 로드 실패: {path}")
-            except Exception as e:
-                print(f"오른쪽 이미지 로드 오류: {path}, {e}")
-
-        # 오른쪽에 합칠 이미지가 없다면, 왼쪽만 저장
-        if not right_images:
-            print("오른쪽에 합칠 이미지가 없어, 왼쪽 단일 이미지만 저장합니다.")
-            cv2.imwrite(output_path, img_left)
-            print(f"단일 이미지 저장 완료: {output_path}")
-            return
-
-        widths = [img.shape[1] for img in right_images]
-        max_width = max(widths)
-
-        resized_right_list = []
-        for img in right_images:
-            h, w, c = img.shape
-            if w != max_width:
-                scale_factor = max_width / float(w)
-                new_h = int(h * scale_factor)
-                # 축소/확대에 따른 보간 설정
-                if new_h > h:  
-                    img_rz = cv2.resize(img, (max_width, new_h), interpolation=cv2.INTER_CUBIC)
-                else:
-                    img_rz = cv2.resize(img, (max_width, new_h), interpolation=cv2.INTER_AREA)
-                resized_right_list.append(img_rz)
-            else:
-                resized_right_list.append(img)
-
-        # 세로 방향으로 쌓기
-        big_right_raw = np.concatenate(resized_right_list, axis=0)
-
-        # (D) 오른쪽 전체를 '왼쪽 이미지 높이'에 맞춰 리사이즈
-        h_left, w_left, _ = img_left.shape
-        h_right_raw, w_right_raw, _ = big_right_raw.shape
-
-        if h_right_raw != h_left:
-            scale_r = h_left / float(h_right_raw)
-            new_w_right = int(w_right_raw * scale_r)
-            # 축소 vs 확대에 따라 보간 다르게
-            if h_left < h_right_raw:
-                big_right_resized = cv2.resize(big_right_raw, (new_w_right, h_left), interpolation=cv2.INTER_AREA)
-            else:
-                big_right_resized = cv2.resize(big_right_raw, (new_w_right, h_left), interpolation=cv2.INTER_CUBIC)
-        else:
-            big_right_resized = big_right_raw
-
-        # (E) 이제 좌우로 합치기
-        merged = np.concatenate((img_left, big_right_resized), axis=1)
-
-        # (F) 저장
-        #   - JPG로 저장 시 품질 설정 가능
-        #   - PNG로 저장 시 무손실
-        ext = os.path.splitext(output_path)[1].lower()
-        if ext in [".jpg", ".jpeg"]:
-            cv2.imwrite(output_path, merged, [cv2.IMWRITE_JPEG_QUALITY, 95])
-        else:
-            cv2.imwrite(output_path, merged)
-
-        print(f"[JUXTA] 체크시트 병합 완료: {output_path}")
+        columns = [{'paths': image_paths[:1]}, {'paths': image_paths[1:], 'fit_height': True}]
+        if MergeLayout.compose(columns, output_path):
+            print(f"[JUXTA] 체크시트 병합 완료: {output_path}")
 
     @staticmethod
     def merge_checksheet_images_newsc(left_images, right_image, output_path):
         """
         NEW SC/3188 전용 병합 함수
         - 왼쪽: 여러 이미지를 세로로 합침 (0.png, 06.png, 2.png)
-        - 오른쪽: 단일 이미지 (09.png)
-        - 최종: 좌우로 배치
+        - 오른쪽: 단일 이미지 (09.png), 왼쪽 높이에 맞춤
         """
         if not left_images or not right_image:
             print("병합할 이미지가 부족합니다.")
             return
         
         try:
-            # 왼쪽 이미지들 로드 및 세로 병합
-            left_cv_images = []
-            for path in left_images:
-                img = cv2.imread(path, cv2.IMREAD_COLOR)
-                if img is not None:
-                    left_cv_images.append(img)
-                else:
-                    print(f"이미지 로드 실패: {path}")
-            
-            if not left_cv_images:
-                print("왼쪽 이미지를 로드할 수 없습니다.")
-                return
-            
-            # 왼쪽 이미지들 너비 통일
-            widths = [img.shape[1] for img in left_cv_images]
-            max_width = max(widths)
-            
-            resized_left_list = []
-            for img in left_cv_images:
-                h, w, c = img.shape
-                if w != max_width:
-                    scale_factor = max_width / float(w)
-                    new_h = int(h * scale_factor)
-                    if new_h > h:
-                        img_rz = cv2.resize(img, (max_width, new_h), interpolation=cv2.INTER_CUBIC)
-                    else:
-                        img_rz = cv2.resize(img, (max_width, new_h), interpolation=cv2.INTER_AREA)
-                    resized_left_list.append(img_rz)
-                else:
-                    resized_left_list.append(img)
-            
-            # 왼쪽 이미지들을 세로로 병합
-            merged_left = np.concatenate(resized_left_list, axis=0)
-            
-            # 오른쪽 이미지 로드
-            img_right = cv2.imread(right_image, cv2.IMREAD_COLOR)
-            if img_right is None:
-                print(f"오른쪽 이미지 로드 실패: {right_image}")
-                return
-            
-            # 오른쪽 이미지를 왼쪽 병합 이미지의 높이에 맞춰 조정
-            h_left, w_left, _ = merged_left.shape
-            h_right, w_right, _ = img_right.shape
-            
-            if h_right != h_left:
-                scale_r = h_left / float(h_right)
-                new_w_right = int(w_right * scale_r)
-                if h_left < h_right:
-                    img_right_resized = cv2.resize(img_right, (new_w_right, h_left), interpolation=cv2.INTER_AREA)
-                else:
-                    img_right_resized = cv2.resize(img_right, (new_w_right, h_left), interpolation=cv2.INTER_CUBIC)
-            else:
-                img_right_resized = img_right
-            
-            # 좌우로 병합
-            merged = np.concatenate((merged_left, img_right_resized), axis=1)
-            
-            # 저장
-            ext = os.path.splitext(output_path)[1].lower()
-            if ext in [".jpg", ".jpeg"]:
-                cv2.imwrite(output_path, merged, [cv2.IMWRITE_JPEG_QUALITY, 95])
-            else:
-                cv2.imwrite(output_path, merged)
-            
-            print(f"[NEW SC] 체크시트 병합 완료: {output_path}")
-            
+            columns = [{'paths': left_images}, {'paths': [right_image], 'fit_height': True}]
+            if MergeLayout.compose(columns, output_path):
+                print(f"[NEW SC] 체크시트 병합 완료: {output_path}")
         except Exception as e:
             print(f"[NEW SC] 병합 중 오류 발생: {e}")
 
-    @staticmethod
-    def convert_pdf_to_process_images(dept, process, serial, base_folder, model=None, base_folder_ori=None):
+    # 부서별 마스터 PDF 변환 DPI (UTA 150dpi, JUXTA/NEW SC 180dpi)
+    MASTER_RENDER_DPI = {'UTA': 150, 'JUXTA': 180, 'NEW SC': 180}
+
+    def render_master_page(self, pdf_path, dpi, output_path):
+        """
+        마스터 PDF의 첫 페이지를 한 번만 이미지로 변환해 output_path(PNG)에 저장합니다.
+        - PDF 이름/수정 시각/크기/DPI로 렌더링 기록을 남기고, 같은 PDF는 저장된 PNG를 재사용
+        - 첫 페이지만 변환 (first_page/last_page), pdftocairo 사용
+
+        - storage_mode가 gray면 그레이스케일 PNG + 색 오버레이로 저장 (PageImage)
+
+        :return: (페이지 PNG 경로, 페이지 이미지) - 새로 렌더링한 경우 다시 읽지 않고 BGR 그대로 반환
         """
+        stat = os.stat(pdf_path)
+        render_key = f"{os.path.basename(pdf_path)}|{stat.st_mtime_ns}|{stat.st_size}|{dpi}"
+        rendered = self._rendered.get(render_key)
+        if rendered is None and self.render_index is not None:
+            rendered = self.render_index.get(render_key)
+        if rendered and rendered.get('png') == output_path and os.path.exists(output_path):
+            page = PageImage.read(output_path)
+            if page is not None:
+                print(f"마스터 렌더링 재사용: {output_path}")
+                return output_path, page
+
+        images = convert_from_path(pdf_path, dpi=dpi, first_page=1, last_page=1,
+                                   use_pdftocairo=True, thread_count=self.pdf_render_threads)
+        if not images:
+            raise ValueError(f"PDF에서 페이지를 변환하지 못했습니다: {pdf_path}")
+        page = ImageEncoder.from_pil(images[0])
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        # 보관용 파일이므로 OpenCV 기본 PNG 압축 사용 (네트워크 경로로도 옮겨짐)
+        PageImage.write(output_path, page, self.storage_mode)
+        self._rendered[render_key] = {'png': output_path}
+        if self.render_index is not None:
+            self.render_index.set(render_key, {'png': output_path})
+        print(f"마스터 렌더링 완료: {pdf_path} → {output_path} ({dpi}dpi)")
+        return output_path, page
+
+    def convert_pdf_to_process_images(self, dept, process, serial, base_folder, model=None, base_folder_ori=None):
+        """
+        마스터 PDF를 페이지 이미지로 한 번 렌더링(render_master_page)한 뒤
+        메모리의 페이지 이미지를 그대로 공정별 이미지로 분할합니다. (base_folder/dept/Process/serial)
         UTA:
-        - 기존대로 한 PDF → 전부 split
+        - serial.pdf 첫 페이지(150dpi) → split (이미 변환된 serial.png가 있으면 그대로 사용)
         JUXTA:
         - PDF 2개 존재, set공정=04(serial_0.pdf), 나머지공정(serial_1.pdf)
         - serial_0.pdf 그대로 출력
@@ -711,124 +616,97 @@ class ImageProcessor:
         - serial_0.pdf → split, 1번항목만 저장
         - serial_1.pdf → 원본 그대로 사용
         """
+        master_folder_ori = os.path.join(base_folder_ori, dept, 'Master')
+        master_folder = os.path.join(base_folder, dept, 'Master')
+        process_folder = os.path.join(base_folder, dept, 'Process', serial)
+
+        def master_page(pdf_name, dpi):
+            pdf_path = os.path.join(master_folder_ori, pdf_name)
+            if not os.path.exists(pdf_path):
+                raise FileNotFoundError(f"PDF가 존재하지 않습니다: {pdf_path}")
+            page_name = os.path.splitext(pdf_name)[0] + '.png'
+            return self.render_master_page(pdf_path, dpi, os.path.join(master_folder, page_name))
+
         if dept in ['3165', 'UTA']:
-            # 먼저 PNG 파일이 이미 있는지 확인
-            png_path = os.path.join(base_folder_ori, dept, 'Master', f"{serial}.png")
-            pdf_path = os.path.join(base_folder_ori, dept, 'Master', f"{serial}.pdf")
-            
+            png_path = os.path.join(master_folder_ori, f"{serial}.png")
+            pdf_path = os.path.join(master_folder_ori, f"{serial}.pdf")
+
             if os.path.exists(png_path):
-                # PNG 파일이 이미 있으면 직접 사용
-                images = [Image.open(png_path)]
+                # 이미 변환된 PNG가 있으면 직접 사용
+                page_path, page = png_path, PageImage.read(png_path)
             elif os.path.exists(pdf_path):
-                # PDF 파일만 있으면 변환
-                images = convert_from_path(pdf_path, dpi=150)
+                page_path, page = master_page(f"{serial}.pdf", self.MASTER_RENDER_DPI['UTA'])
             else:
                 raise FileNotFoundError(f"PNG 또는 PDF 파일이 존재하지 않습니다: {serial}")
 
-            # 결과 저장 경로 리스트
-            saved_paths = []
-
-            # 1) UTA 처리
-            
-            # UTA는 n페이지 모두 split
-            page_index = 0
-            for pil_img in images:
-                # 페이지 임시 저장
-                page_jpg_path = os.path.join(base_folder, dept, 'Master', f"{serial}.png")
-                pil_img.save(page_jpg_path, 'png')
-                # split
-                splitted = ImageProcessor.split_image_by_horizontal_lines(page_jpg_path, serial, page_index, dept=dept)
-                saved_paths.extend(splitted)
-                page_index += 1
-
-            return saved_paths
+            return ImageProcessor.split_image_by_horizontal_lines(
+                page_path, serial, 0, dept=dept, image=page, output_folder=process_folder,
+                storage_mode=self.storage_mode)
 
         # 2) JUXTA 처리
         elif dept in ['3186', 'JUXTA']:
             saved_paths = []
-        
+            dpi = self.MASTER_RENDER_DPI['JUXTA']
+
             # 공정 04: serial_0.pdf 사용 (split하지 않음)
-            pdf_path = os.path.join(base_folder_ori, dept, 'Master', f"{serial}_0.pdf")
-            if not os.path.exists(pdf_path):
-                raise FileNotFoundError(f"PDF가 존재하지 않습니다: {pdf_path}")
-            # PDF → PIL 이미지 변환
-            images = convert_from_path(pdf_path, dpi=180)
-            
-            # 첫 번째 페이지만 사용하고 split하지 않음
-            if images:
-                temp_jpg_path =  os.path.join(base_folder, dept, 'Master', f"{serial}_0.png")
-                # 이미지 저장 (split하지 않고 그대로)
-                images[0].save(temp_jpg_path, 'PNG')
-                splitted = ImageProcessor.split_image_by_horizontal_lines(
-                    temp_jpg_path,
-                    base_serial=serial,
-                    start_index=0,
-                    dept=dept,
-                    model=model)
-
-            pdf_path = os.path.join(base_folder_ori, dept, 'Master', f"{serial}_1.pdf")
-            if not os.path.exists(pdf_path):
-                raise FileNotFoundError(f"PDF가 존재하지 않습니다: {pdf_path}")
-            # PDF → PIL 이미지 변환
-            images = convert_from_path(pdf_path, dpi=180)
-            # 이미지를 jpg로 임시 저장한 후 split 적용
-            if images:
-                temp_jpg_path = os.path.join(base_folder, dept, 'Master', f"{serial}_1.png")
-                images[0].save(temp_jpg_path, 'PNG')
-                # split 적용 (인덱스 1부터 시작)
-                splitted = ImageProcessor.split_image_by_horizontal_lines(
-                    temp_jpg_path,
-                    base_serial=serial,
-                    start_index=1,
-                    dept=dept,
-                    model=model
-                )
-                saved_paths.extend(splitted)
+            page_path, page = master_page(f"{serial}_0.pdf", dpi)
+            ImageProcessor.split_image_by_horizontal_lines(
+                page_path,
+                base_serial=serial,
+                start_index=0,
+                dept=dept,
+                model=model,
+                image=page,
+                output_folder=process_folder,
+                storage_mode=self.storage_mode)
+
+            page_path, page = master_page(f"{serial}_1.pdf", dpi)
+            # split 적용 (인덱스 1부터 시작)
+            splitted = ImageProcessor.split_image_by_horizontal_lines(
+                page_path,
+                base_serial=serial,
+                start_index=1,
+                dept=dept,
+                model=model,
+                image=page,
+                output_folder=process_folder,
+                storage_mode=self.storage_mode
+            )
+            saved_paths.extend(splitted)
 
             return saved_paths
         # 2) NEWSC 처리
         elif dept in ['3188', 'NEW SC']:
             saved_paths = []
+            dpi = self.MASTER_RENDER_DPI['NEW SC']
         
-            # 첫 번째 PDF 처리 - 분할
-            pdf_path = os.path.join(base_folder_ori, dept, 'Master', f"{serial}_0.pdf")
-            if not os.path.exists(pdf_path):
-                raise FileNotFoundError(f"PDF가 존재하지 않습니다: {pdf_path}")
-            # PDF → PIL 이미지 변환
-            images = convert_from_path(pdf_path, dpi=180)
-            if images:
-                temp_jpg_path =  os.path.join(base_folder, dept, 'Master', f"{serial}_0.png")
-                # 이미지 저장
-                images[0].save(temp_jpg_path, 'PNG')
-                # 첫 번째 PDF는 분할하여 0, 1, 2.png 등으로 저장
-                splitted = ImageProcessor.split_image_by_horizontal_lines(
-                    temp_jpg_path,
-                    base_serial=serial,
-                    start_index=0,
-                    dept=dept,
-                    model=model)
-                saved_paths.extend(splitted)
-
-            # 두 번째 PDF 처리 - 분할하지 않고 그대로 사용
-            pdf_path = os.path.join(base_folder_ori, dept, 'Master', f"{serial}_1.pdf")
-            if not os.path.exists(pdf_path):
-                raise FileNotFoundError(f"PDF가 존재하지 않습니다: {pdf_path}")
-            # PDF → PIL 이미지 변환
-            images = convert_from_path(pdf_path, dpi=180)
-            if images:
-                temp_jpg_path = os.path.join(base_folder, dept, 'Master', f"{serial}_1.png")
-                images[0].save(temp_jpg_path, 'PNG')
-                # 첫 번째 PDF의 분할 개수를 파악하여 다음 번호로 저장
-                next_index = len(saved_paths)  # 첫 번째 PDF에서 생성된 파일 개수
-                # 두 번째 PDF는 분할하지 않고 그대로 사용 (start_index를 다음 번호로 설정)
-                splitted = ImageProcessor.split_image_by_horizontal_lines(
-                    temp_jpg_path,
-                    base_serial=serial,
-                    start_index=next_index,  # 첫 번째 PDF 분할 개수만큼 시작 인덱스 설정
-                    dept=dept,
-                    model=model
-                )
-                saved_paths.extend(splitted)
+            # 첫 번째 PDF 처리 - 분할하여 0, 1, 2.png 등으로 저장
+            page_path, page = master_page(f"{serial}_0.pdf", dpi)
+            splitted = ImageProcessor.split_image_by_horizontal_lines(
+                page_path,
+                base_serial=serial,
+                start_index=0,
+                dept=dept,
+                model=model,
+                image=page,
+                output_folder=process_folder,
+                storage_mode=self.storage_mode)
+            saved_paths.extend(splitted)
+
+            # 두 번째 PDF 처리 - 첫 번째 PDF의 분할 개수를 파악하여 다음 번호로 저장
+            page_path, page = master_page(f"{serial}_1.pdf", dpi)
+            next_index = len(saved_paths)  # 첫 번째 PDF에서 생성된 파일 개수
+            splitted = ImageProcessor.split_image_by_horizontal_lines(
+                page_path,
+                base_serial=serial,
+                start_index=next_index,  # 첫 번째 PDF 분할 개수만큼 시작 인덱스 설정
+                dept=dept,
+                model=model,
+                image=page,
+                output_folder=process_folder,
+                storage_mode=self.storage_mode
+            )
+            saved_paths.extend(splitted)
 
             return saved_paths
 
@@ -0,0 +1,369 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:  # watchdog이 없으면 주기 스캔만 사용
+    Observer = None
+    FileSystemEventHandler = object
+
+
+class _MasterEventHandler(FileSystemEventHandler):
+    """Master 폴더에 PDF가 생기거나 옮겨지면 watcher에 알림"""
+
+    def __init__(self, watcher, dept, base_folder):
+        self.watcher = watcher
+        self.dept = dept
+        self.base_folder = base_folder
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.watcher.notify(self.dept, event.src_path, self.base_folder)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.watcher.notify(self.dept, event.dest_path, self.base_folder)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.watcher.notify(self.dept, event.src_path, self.base_folder)
+
+
+class MasterWatcher:
+    """
+    Master PDF 도착 시 Process 이미지를 미리 만들어 두는 백그라운드 작업
+    - UPLOAD_FOLDER/<dept>/Master는 watchdog(inotify)으로 감시 (설치되어 있을 때)
+    - scan()은 스케줄러에서 주기적으로 호출되어 로컬 Master 폴더 전체와
+      네트워크(CIFS) Master 폴더에서 지난 스캔 이후 바뀐 PDF만 훑음 (네트워크 폴더는 보관소 전체이므로)
+    - 변환 완료 기록은 done_store(SQLiteCacheStore)에 남겨 재시작 후에도 다시 변환하지 않음
+    - 변환은 작업 스레드 풀에서 실행, 같은 시리얼은 lock_for(serial)로 한 번에 하나만 변환
+    - request_render()는 페이지 요청용 작업(job)을 만들어 바로 반환 (요청 스레드는 기다리지 않음)
+      작업 상태: waiting(PDF 도착 대기) → rendering → done / failed
+    """
+
+    DEPTS = ('3165', '3186', '3188')
+    # 2개 PDF로 나뉘는 부서 (serial_0.pdf, serial_1.pdf가 모두 있어야 변환)
+    SPLIT_MASTER_DEPTS = ('3186', '3188')
+    LAST_SCAN_KEY = '__last_scan__'
+    # 네트워크 서버와 시계가 어긋나도 놓치지 않도록 지난 스캔보다 이만큼(초) 앞부터 확인
+    SCAN_OVERLAP_SECONDS = 300
+
+    def __init__(self, image_processor, upload_folder, network_path=None, model_resolver=None,
+                 workers=2, settle_seconds=2, wait_timeout=10, job_ttl=300, done_store=None):
+        self.image_processor = image_processor
+        self.upload_folder = upload_folder
+        self.network_path = network_path
+        self.model_resolver = model_resolver  # serial → 제품 모델 (JUXTA VJ77 분할 규칙에 필요)
+        self.settle_seconds = float(settle_seconds)  # 복사 중인 파일을 피하기 위해 크기 변화를 기다리는 시간
+        self._executor = ThreadPoolExecutor(max_workers=max(int(workers), 1), thread_name_prefix='master-render')
+        self._observer = None
+        self._lock = threading.Lock()
+        self._serial_locks = {}
+        self._pending = set()
+        self._done = {}  # (dept, serial) → 변환한 Master PDF 서명
+        self.done_store = done_store
+        stored_scan = done_store.get(self.LAST_SCAN_KEY) if done_store is not None else None
+        # 네트워크 Master는 이 시각 이후 바뀐 PDF만 스캔 (기록이 없으면 시작 시각부터)
+        self._last_scan = float(stored_scan) if stored_scan else time.time()
+        self.wait_timeout = float(wait_timeout)  # Master PDF 도착을 기다리는 최대 시간(초)
+        self.job_ttl = float(job_ttl)  # 끝난 작업 상태를 보관하는 시간(초)
+        self._jobs = {}  # job_id → 작업 상태
+        self._job_keys = {}  # (dept, serial) → job_id
+        self.rendered = 0
+        self.skipped = 0
+        self.failed = 0
+
+    def start(self):
+        """로컬 Master 폴더 감시를 시작합니다. watchdog이 없으면 주기 스캔만 사용합니다."""
+        if Observer is None:
+            logging.info("watchdog 미설치 - Master 폴더는 주기 스캔으로만 확인합니다.")
+            return False
+        observer = Observer()
+        for dept in self.DEPTS:
+            master_folder = os.path.join(self.upload_folder, dept, 'Master')
+            os.makedirs(master_folder, exist_ok=True)
+            observer.schedule(_MasterEventHandler(self, dept, self.upload_folder), master_folder, recursive=False)
+        observer.daemon = True
+        observer.start()
+        self._observer = observer
+        logging.info("Master 폴더 감시 시작")
+        return True
+
+    def stop(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+        self._executor.shutdown(wait=False)
+
+    def lock_for(self, serial):
+        """시리얼별 변환 잠금 (요청 처리 중 변환과 백그라운드 변환이 겹치지 않도록)"""
+        with self._lock:
+            lock = self._serial_locks.get(serial)
+            if lock is None:
+                lock = self._serial_locks[serial] = threading.Lock()
+            return lock
+
+    @classmethod
+    def serial_from_pdf(cls, dept, filename):
+        """Master PDF 파일명에서 시리얼을 구합니다. Master PDF가 아니면 None"""
+        name, extension = os.path.splitext(filename)
+        if extension.lower() != '.pdf':
+            return None
+        if dept in cls.SPLIT_MASTER_DEPTS:
+            if not (name.endswith('_0') or name.endswith('_1')):
+                return None
+            return name[:-2]
+        return name
+
+    def master_pdfs(self, dept, serial, base_folder):
+        master_folder = os.path.join(base_folder, dept, 'Master')
+        if dept in self.SPLIT_MASTER_DEPTS:
+            names = [f"{serial}_0.pdf", f"{serial}_1.pdf"]
+        else:
+            names = [f"{serial}.pdf"]
+        return [os.path.join(master_folder, name) for name in names]
+
+    def _signature(self, pdf_paths):
+        try:
+            return tuple((os.path.getmtime(path), os.path.getsize(path)) for path in pdf_paths)
+        except OSError:
+            return None
+
+    def _base_folders(self):
+        return [self.upload_folder] + ([self.network_path] if self.network_path else [])
+
+    def _process_images_ready(self, dept, serial, signature=None):
+        """
+        Process 폴더(로컬 → 네트워크)에 Master PDF보다 새 이미지가 있으면 이미 변환된 것으로 봅니다.
+        signature가 없으면 이미지가 있는지만 확인 (정리 작업으로 지워졌는지 확인용)
+        """
+        for base_folder in self._base_folders():
+            process_folder = os.path.join(base_folder, dept, 'Process', serial)
+            try:
+                with os.scandir(process_folder) as entries:
+                    newest = max((entry.stat().st_mtime for entry in entries
+                                  if entry.is_file() and entry.name.endswith('.png')), default=None)
+            except OSError:
+                continue
+            if newest is not None and (signature is None or newest >= max(mtime for mtime, _ in signature)):
+                return True
+        return False
+
+    @staticmethod
+    def _done_key(key):
+        return f"{key[0]}|{key[1]}"
+
+    def _done_signature(self, key):
+        """변환 완료 기록의 Master PDF 서명 (메모리 → done_store 순). 없으면 None"""
+        signature = self._done.get(key)
+        if signature is None and self.done_store is not None:
+            stored = self.done_store.get(self._done_key(key))
+            if stored:
+                signature = self._done[key] = tuple(tuple(item) for item in stored)
+        return signature
+
+    def _mark_done(self, key, signature):
+        self._done[key] = signature
+        if self.done_store is not None:
+            self.done_store.set(self._done_key(key), [list(item) for item in signature])
+
+    def _forget_done(self, key):
+        self._done.pop(key, None)
+        if self.done_store is not None:
+            self.done_store.delete(self._done_key(key))
+
+    def notify(self, dept, pdf_path, base_folder):
+        """PDF 경로 하나에 대해 변환 작업을 등록합니다."""
+        serial = self.serial_from_pdf(dept, os.path.basename(pdf_path))
+        if serial:
+            self.submit(dept, serial, base_folder)
+
+    def submit(self, dept, serial, base_folder):
+        key = (dept, serial)
+        with self._lock:
+            if key in self._pending:
+                return False
+            self._pending.add(key)
+        self._executor.submit(self._render, dept, serial, base_folder)
+        return True
+
+    def _render(self, dept, serial, base_folder):
+        key = (dept, serial)
+        try:
+            pdf_paths = self.master_pdfs(dept, serial, base_folder)
+            signature = self._signature(pdf_paths)
+            if signature is None:
+                return  # 나머지 PDF가 아직 도착하지 않음
+            self._update_job(key, 'rendering')
+            # 복사가 끝날 때까지 대기 (크기가 그대로인지 확인)
+            if self.settle_seconds > 0:
+                time.sleep(self.settle_seconds)
+                if self._signature(pdf_paths) != signature:
+                    self._executor.submit(self._retry, dept, serial, base_folder)
+                    return
+            if self._process_images_ready(dept, serial, signature):
+                self._mark_done(key, signature)
+                self.skipped += 1
+                self._update_job(key, 'done')
+                return
+            # 완료 기록이 있어도 Process 이미지가 없으면(정리 작업으로 삭제) 다시 변환
+            self._forget_done(key)
+
+            model = self.model_resolver(serial) if self.model_resolver else None
+            started = time.perf_counter()
+            with self.lock_for(serial):
+                self.image_processor.convert_pdf_to_process_images(
+                    dept, None, serial, base_folder=self.upload_folder, model=model, base_folder_ori=base_folder)
+            self._mark_done(key, signature)
+            self.rendered += 1
+            self._update_job(key, 'done')
+            logging.info(f"Process 이미지 사전 생성: {dept}/{serial} "
+                         f"({(time.perf_counter() - started) * 1000:.0f}ms)")
+        except Exception as e:
+            self.failed += 1
+            self._update_job(key, 'failed', str(e))
+            logging.error(f"Process 이미지 사전 생성 오류 ({dept}/{serial}): {str(e)}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def _retry(self, dept, serial, base_folder):
+        # _render의 finally에서 pending이 풀린 뒤 다시 등록
+        time.sleep(self.settle_seconds)
+        self.submit(dept, serial, base_folder)
+
+    def _find_master(self, dept, serial):
+        """로컬 → 네트워크 순으로 Master PDF가 모두 있는 기준 폴더를 찾습니다. 없으면 None"""
+        for base_folder in self._base_folders():
+            if all(os.path.exists(path) for path in self.master_pdfs(dept, serial, base_folder)):
+                return base_folder
+        return None
+
+    def _update_job(self, key, status, error=None):
+        with self._lock:
+            job = self._jobs.get(self._job_keys.get(key))
+            if job is not None and job['status'] not in ('done', 'failed'):
+                job['status'] = status
+                job['error'] = error
+                job['updated_at'] = time.time()
+
+    def _expire_jobs(self):
+        # self._lock 안에서 호출
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            if job['status'] in ('done', 'failed') and job['updated_at'] + self.job_ttl < now:
+                del self._jobs[job_id]
+                if self._job_keys.get((job['dept'], job['serial'])) == job_id:
+                    del self._job_keys[(job['dept'], job['serial'])]
+
+    def request_render(self, dept, serial):
+        """
+        페이지 요청에서 Process 이미지 생성을 요청합니다. 같은 시리얼의 진행 중인 작업이 있으면 그 작업을 반환합니다.
+        Master PDF가 아직 없으면 waiting 상태로 두고 도착(감시 이벤트 또는 job_status 확인) 시 변환합니다.
+
+        :return: 작업 상태 dict 복사본
+        """
+        key = (dept, serial)
+        with self._lock:
+            self._expire_jobs()
+            job = self._jobs.get(self._job_keys.get(key))
+            if job is not None:
+                if job['status'] != 'done' or self._process_images_ready(dept, serial):
+                    return dict(job)
+                # 끝난 작업이지만 Process 이미지가 지워졌으면(정리 작업) 새 작업으로 다시 변환
+                del self._jobs[job['job_id']]
+                del self._job_keys[key]
+                self._forget_done(key)
+            job = {
+                'job_id': uuid.uuid4().hex,
+                'dept': dept,
+                'serial': serial,
+                'status': 'waiting',
+                'error': None,
+                'created_at': time.time(),
+                'updated_at': time.time(),
+            }
+            self._jobs[job['job_id']] = job
+            self._job_keys[key] = job['job_id']
+        self._check_waiting(job)
+        return self.job_status(job['job_id'])
+
+    def _check_waiting(self, job):
+        """waiting 작업의 Master PDF 도착 여부를 확인해 변환을 시작하거나 시간 초과로 실패 처리합니다."""
+        if job['status'] != 'waiting':
+            return
+        base_folder = self._find_master(job['dept'], job['serial'])
+        if base_folder is not None:
+            self.submit(job['dept'], job['serial'], base_folder)
+        elif job['created_at'] + self.wait_timeout < time.time():
+            self._update_job((job['dept'], job['serial']), 'failed', 'Requested master PDF does not exist.')
+
+    def job_status(self, job_id):
+        """작업 상태를 반환합니다. 없는 작업이면 None"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        # 네트워크(CIFS) 폴더는 감시 이벤트가 없으므로 상태 확인 시 도착 여부를 확인
+        self._check_waiting(job)
+        with self._lock:
+            return dict(job)
+
+    def scan(self):
+        """
+        Master 폴더를 훑어 아직 변환되지 않은 시리얼을 등록합니다.
+        로컬은 전체, 네트워크는 지난 스캔 시작 이후 수정된 PDF만 확인
+        (보관된 시리얼은 페이지 요청 시 request_render로 변환)
+        """
+        started = time.time()
+        since = self._last_scan - self.SCAN_OVERLAP_SECONDS
+        submitted = 0
+        seen = set()
+        for base_folder in self._base_folders():
+            is_local = base_folder == self.upload_folder
+            for dept in self.DEPTS:
+                master_folder = os.path.join(base_folder, dept, 'Master')
+                try:
+                    with os.scandir(master_folder) as entries:
+                        names = [entry.name for entry in entries
+                                 if entry.is_file() and (is_local or entry.stat().st_mtime >= since)]
+                except OSError:
+                    continue
+                for name in names:
+                    serial = self.serial_from_pdf(dept, name)
+                    # 로컬에 있는 시리얼은 로컬 PDF를 우선 사용
+                    if not serial or (dept, serial) in seen:
+                        continue
+                    signature = self._signature(self.master_pdfs(dept, serial, base_folder))
+                    if signature is None:
+                        continue
+                    seen.add((dept, serial))
+                    if self._done_signature((dept, serial)) == signature:
+                        continue
+                    if self.submit(dept, serial, base_folder):
+                        submitted += 1
+        self._last_scan = started
+        if self.done_store is not None:
+            self.done_store.set(self.LAST_SCAN_KEY, started)
+        if submitted:
+            logging.info(f"Master 스캔: 변환 대기 {submitted}건 등록")
+        return submitted
+
+    def get_stats(self):
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            'name': 'master_watcher',
+            'watching': self._observer is not None,
+            'pending': pending,
+            'jobs': len(self._jobs),
+            'rendered': self.rendered,
+            'skipped': self.skipped,
+            'failed': self.failed,
+        }
@@ -0,0 +1,310 @@
+import os
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from PageImage import PageImage
+
+
+class MergeLayout:
+    """
+    부서/모델별 Merged 체크시트 배치 정의와 합성기
+    - 열(column)마다 슬롯(slot)을 위에서 아래로 쌓고, 열들을 왼쪽부터 나란히 배치
+    - 슬롯은 후보 (폴더, 파일 접미사)를 우선순위대로 나열, 처음 있는 파일 하나를 사용
+      접미사 FIRST: 아직 쓰지 않은 serial*.png 중 이름순 첫 파일, REST: 쓰지 않은 나머지 전부
+    - 열 옵션: width(이 너비로 맞춤, 없으면 가장 넓은 이미지), fit_height(첫 열 높이에 맞춤)
+    - alone_width: 첫 열만 남았을 때 그 열을 맞출 너비 (없으면 원래 크기)
+    - 폴더(Checked/Process)는 시리얼당 scandir 한 번으로 확인, 색 오버레이(PageImage) 파일은 후보에서 제외
+    """
+
+    FIRST = '*'
+    REST = '**'
+
+    DEPT_ALIASES = {'UTA': '3165', 'JUXTA': '3186', 'NEW SC': '3188'}
+
+    # (부서, 모델) → 배치, 모델별 배치가 없으면 (부서, None) 사용
+    LAYOUTS = {
+        # UTA: Checked 전체(부품SET 08 제외)를 너비 800으로 세로로
+        ('3165', None): {
+            'columns': [
+                {'slots': [[('Checked', REST)]], 'width': 800},
+            ],
+            'exclude': ('_08',),
+        },
+        # JUXTA: 왼쪽 = 04 공정(Checked 04 → Process 0 → Checked 첫 파일) 원본 크기,
+        #        오른쪽 = 나머지 Checked를 세로로 쌓아 왼쪽 높이에 맞춤
+        ('3186', None): {
+            'columns': [
+                {'slots': [[('Checked', '_04'), ('Process', '_0'), ('Checked', FIRST)]]},
+                {'slots': [[('Checked', REST)]], 'fit_height': True},
+            ],
+        },
+        # JUXTA VJ77: 04 공정 페이지가 없으므로 Checked 첫 파일이 왼쪽
+        ('3186', 'VJ77'): {
+            'columns': [
+                {'slots': [[('Checked', FIRST)]]},
+                {'slots': [[('Checked', REST)]], 'fit_height': True},
+            ],
+        },
+        # NEW SC: 왼쪽 = Process 0, 06 공정, Process 2 / 오른쪽 = 09 공정 (왼쪽 높이에 맞춤)
+        #         오른쪽이 없으면 왼쪽만 너비 800으로
+        ('3188', None): {
+            'columns': [
+                {'slots': [
+                    [('Process', '_0')],
+                    [('Checked', '_06'), ('Checked', '_1'), ('Process', '_1')],
+                    [('Process', '_2')],
+                ]},
+                {'slots': [[('Checked', '_09'), ('Checked', '_3'), ('Process', '_3')]], 'fit_height': True},
+            ],
+            'alone_width': 800,
+        },
+    }
+
+    def __init__(self, columns, exclude=(), alone_width=None):
+        self.columns = columns
+        self.exclude = tuple(exclude)
+        self.alone_width = alone_width
+
+    @classmethod
+    def for_dept(cls, dept, model=None):
+        """부서/모델의 배치를 반환합니다. 정의가 없으면 None"""
+        dept = cls.DEPT_ALIASES.get(dept, dept)
+        spec = cls.LAYOUTS.get((dept, model)) or cls.LAYOUTS.get((dept, None))
+        return cls(**spec) if spec else None
+
+    @staticmethod
+    def _list_pngs(folder):
+        try:
+            with os.scandir(folder) as entries:
+                return {entry.name for entry in entries
+                        if entry.name.endswith('.png') and not PageImage.is_overlay(entry.name) and entry.is_file()}
+        except OSError:
+            return set()
+
+    def resolve(self, dept_folder, serial):
+        """
+        배치의 슬롯을 실제 파일로 정합니다.
+
+        :param dept_folder: UPLOAD_FOLDER/<dept>
+        :return: 합성기(compose)에 넘길 열 목록 [{'paths', 'width', 'fit_height'}, ...] (빈 열 제외)
+        """
+        folders = {}
+        used = set()
+
+        def names(folder):
+            if folder not in folders:
+                folders[folder] = self._list_pngs(os.path.join(dept_folder, folder, serial))
+            return folders[folder]
+
+        def unused(folder):
+            return sorted(
+                name for name in names(folder)
+                if name.startswith(serial) and (folder, name) not in used
+                and not any(name.endswith(f"{suffix}.png") for suffix in self.exclude)
+            )
+
+        columns = []
+        for index, column in enumerate(self.columns):
+            paths = []
+            for slot in column['slots']:
+                for folder, suffix in slot:
+                    if suffix == self.REST:
+                        found = unused(folder)
+                    elif suffix == self.FIRST:
+                        found = unused(folder)[:1]
+                    else:
+                        name = f"{serial}{suffix}.png"
+                        found = [name] if name in names(folder) and (folder, name) not in used else []
+                    if found:
+                        used.update((folder, name) for name in found)
+                        paths.extend(os.path.join(dept_folder, folder, serial, name) for name in found)
+                        break
+            if not paths and index == 0:
+                return []  # 첫 열(높이 기준)이 없으면 합치지 않음
+            if paths:
+                columns.append({
+                    'paths': paths,
+                    'width': column.get('width'),
+                    'fit_height': column.get('fit_height', False),
+                })
+
+        if len(columns) == 1 and len(self.columns) > 1 and self.alone_width:
+            columns[0]['width'] = self.alone_width
+        return columns
+
+    @staticmethod
+    def image_size(path):
+        """이미지 헤더만 읽어 (width, height)를 반환합니다. 읽을 수 없으면 None"""
+        try:
+            with Image.open(path) as img:
+                return img.size
+        except Exception as e:
+            print(f"이미지를 불러오는 중 오류 발생: {path}, 오류: {e}")
+            return None
+
+    @staticmethod
+    def column_layout(sizes, width=None, height=None):
+        """
+        세로로 쌓을 이미지들의 배치를 미리 계산합니다. (이미지를 읽기 전에 최종 크기 결정)
+        - width: 모든 이미지를 이 너비로 맞춤 (없으면 가장 넓은 이미지 너비)
+        - height: 쌓은 결과를 이 높이로 맞춤 (열 너비도 같은 비율로 조정)
+
+        :param sizes: [(width, height), ...]
+        :return: (열 너비, 열 높이, [(y_start, y_end), ...])
+        """
+        if width is None:
+            width = max(w for w, h in sizes)
+        heights = [h if w == width else int(h * (width / float(w))) for w, h in sizes]
+        bounds = np.concatenate(([0], np.cumsum(heights)))
+        total = int(bounds[-1])
+        if height is None or height == total:
+            return width, total, [(int(bounds[i]), int(bounds[i + 1])) for i in range(len(heights))]
+
+        scale = height / float(total)
+        bounds = np.rint(bounds * scale).astype(int)
+        bounds[-1] = height
+        return int(width * scale), height, [(int(bounds[i]), int(bounds[i + 1])) for i in range(len(heights))]
+
+    @staticmethod
+    def paste_resized(view, img):
+        """
+        이미지를 캔버스 영역(view) 크기에 맞춰 축소/확대해 그 자리에 씁니다.
+        그레이스케일 이미지는 한 채널로 리사이즈한 뒤 BGR 캔버스의 세 채널에 그대로 복사
+        """
+        target_h, target_w = view.shape[:2]
+        if target_h == 0 or target_w == 0:
+            return
+        if img.shape[:2] != (target_h, target_w):
+            # 축소는 INTER_AREA, 확대는 INTER_CUBIC
+            interpolation = cv2.INTER_AREA if target_h < img.shape[0] else cv2.INTER_CUBIC
+            img = cv2.resize(img, (target_w, target_h), interpolation=interpolation)
+        view[:] = img[:, :, None] if img.ndim == 2 else img
+
+    @staticmethod
+    def plan(columns):
+        """
+        열 목록의 최종 배치를 계산합니다. (이미지 헤더만 읽음)
+
+        :return: (캔버스 (높이, 너비), [{'path', 'x', 'y0', 'y1', 'w'}, ...])
+                 - 첫 열(높이 기준)의 이미지를 하나도 읽지 못하면 (None, []) (다음 열이 기준이 되어 배치가 밀리지 않도록)
+        """
+        placed = []
+        base_height = None
+        for index, column in enumerate(columns):
+            entries = []
+            for path in column['paths']:
+                size = MergeLayout.image_size(path)
+                if size:
+                    entries.append((path, size))
+            if not entries:
+                if index == 0:
+                    print(f"기준 이미지를 읽을 수 없습니다: {column['paths']}")
+                    return None, []
+                continue
+            fit = base_height if column.get('fit_height') and base_height is not None else None
+            width, height, rows = MergeLayout.column_layout(
+                [size for _, size in entries], width=column.get('width'), height=fit)
+            if base_height is None:
+                base_height = height
+            placed.append(([path for path, _ in entries], width, height, rows))
+
+        if not placed:
+            return None, []
+
+        slots = []
+        x = 0
+        for paths, width, _, rows in placed:
+            for path, (y_start, y_end) in zip(paths, rows):
+                slots.append({'path': path, 'x': x, 'y0': y_start, 'y1': y_end, 'w': width})
+            x += width
+        return (max(p[2] for p in placed), x), slots
+
+    @staticmethod
+    def _signature(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    @staticmethod
+    def _changed_slots(manifest, canvas_size, slots, output_path):
+        """
+        이전 배치 기록과 비교해 다시 그릴 슬롯 번호를 반환합니다.
+        배치가 달라졌거나 Merged 이미지가 기록 이후 바뀌었으면 None (전체 다시 합성)
+        """
+        if not manifest or manifest.get('canvas') != list(canvas_size):
+            return None
+        if manifest.get('merged') is None or manifest.get('merged') != MergeLayout._signature(output_path):
+            return None
+        previous = manifest.get('slots', [])
+        placement = ('path', 'x', 'y0', 'y1', 'w')
+        if len(previous) != len(slots) or any(
+                tuple(old[k] for k in placement) != tuple(new[k] for k in placement)
+                for old, new in zip(previous, slots)):
+            return None
+        return [index for index, (old, new) in enumerate(zip(previous, slots)) if old.get('src') != new['src']]
+
+    @staticmethod
+    def _write(output_path, canvas):
+        # PNG로 저장 시 무손실, JPG로 저장 시 품질 95
+        ext = os.path.splitext(output_path)[1].lower()
+        if ext in [".jpg", ".jpeg"]:
+            return cv2.imwrite(output_path, canvas, [cv2.IMWRITE_JPEG_QUALITY, 95])
+        return cv2.imwrite(output_path, canvas)
+
+    @staticmethod
+    def compose(columns, output_path, manifest_store=None):
+        """
+        열 목록을 하나의 이미지로 합성해 저장합니다.
+        헤더로 최종 크기를 먼저 계산해 캔버스를 한 번만 만들고, 이미지는 한 장씩 읽어 제자리에 씁니다.
+        manifest_store(SQLiteCacheStore)를 주면 output_path별로 슬롯 배치와 원본 파일 서명을 기록해 두고,
+        다음 합성 때 배치가 같으면 기존 Merged 이미지를 읽어 바뀐 슬롯만 다시 그립니다. (공정 하나만 다시 저장한 경우)
+        기록은 Merged 폴더 밖(캐시 DB)에 두어 파일 이동(move_old_files)이나 목록 조회에 섞이지 않음
+
+        :param columns: [{'paths', 'width'(선택), 'fit_height'(선택)}, ...] - 첫 열이 높이 기준
+        :return: 저장 여부 - 읽지 못한 이미지가 있으면 Merged 이미지와 배치 기록을 쓰지 않고 False
+        """
+        canvas_size, slots = MergeLayout.plan(columns)
+        if not slots:
+            print("합칠 이미지가 없습니다.")
+            return False
+        for slot in slots:
+            slot['src'] = MergeLayout._signature(slot['path'])
+
+        canvas = None
+        dirty = None
+        # 부분 갱신은 무손실(PNG) 결과에서만 (JPG는 다시 저장할 때마다 화질이 떨어짐)
+        if manifest_store is not None and os.path.splitext(output_path)[1].lower() == '.png':
+            dirty = MergeLayout._changed_slots(manifest_store.get(output_path), canvas_size, slots, output_path)
+            if dirty == []:
+                print(f"Merged 이미지 변경 없음: {output_path}")
+                return True
+            if dirty is not None:
+                canvas = cv2.imread(output_path, cv2.IMREAD_COLOR)
+                if canvas is None or canvas.shape[:2] != tuple(canvas_size):
+                    canvas, dirty = None, None
+        if canvas is None:
+            canvas = np.zeros((canvas_size[0], canvas_size[1], 3), dtype=np.uint8)
+            dirty = range(len(slots))
+        else:
+            print(f"Merged 이미지 부분 갱신: {[os.path.basename(slots[i]['path']) for i in dirty]}")
+
+        for index in dirty:
+            slot = slots[index]
+            img = PageImage.read(slot['path'])
+            if img is None:
+                # 빈(검은) 영역이 있는 Merged 이미지를 남기지 않도록 저장하지 않고 실패 처리 (병합 작업 큐에서 재시도)
+                print(f"이미지 로드 실패, 병합 중단: {slot['path']}")
+                return False
+            MergeLayout.paste_resized(canvas[slot['y0']:slot['y1'], slot['x']:slot['x'] + slot['w']], img)
+            del img
+
+        if not MergeLayout._write(output_path, canvas):
+            return False
+        if manifest_store is not None:
+            manifest_store.set(output_path, {
+                'canvas': list(canvas_size), 'merged': MergeLayout._signature(output_path), 'slots': slots})
+        return True
@@ -0,0 +1,238 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+
+class MergeWorker:
+    """
+    Merged 체크시트 생성 작업 큐 (요청 밖에서 실행)
+    - 작업은 SQLite에 저장되어 서버 재시작 후에도 이어서 처리
+      (stale_seconds 넘게 running인 작업은 중단된 것으로 보고 다시 대기열로)
+    - 여러 프로세스가 같은 큐 파일을 써도 작업은 조건부 UPDATE로 한 곳에서만 가져감
+    - 작업 스레드 workers개가 대기열을 처리, 실패 시 retry_seconds * 2^(시도-1) 후 재시도
+    - max_attempts번 실패하면 failed로 남김
+    작업 상태: queued → running → done / failed
+    """
+
+    def __init__(self, handler, path, workers=1, max_attempts=3, retry_seconds=30, poll_seconds=5,
+                 stale_seconds=600):
+        self.handler = handler  # handler(dept_code, serial_no, model) - 실제 병합 함수
+        self.path = path
+        self.workers = max(int(workers), 1)
+        self.max_attempts = max(int(max_attempts), 1)
+        self.retry_seconds = float(retry_seconds)
+        self.poll_seconds = float(poll_seconds)
+        self.stale_seconds = float(stale_seconds)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._threads = []
+        self.processed = 0
+        self.failed = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS merge_jobs ('
+                'job_id TEXT PRIMARY KEY, dept_code TEXT NOT NULL, serial_no TEXT NOT NULL, model TEXT, '
+                'status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, last_error TEXT, '
+                'created_at REAL NOT NULL, updated_at REAL NOT NULL, next_run_at REAL NOT NULL)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS merge_jobs_status ON merge_jobs (status, next_run_at)')
+            self._conn.commit()
+
+    def start(self):
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f'merge-worker-{index}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logging.info(f"병합 작업 스레드 시작: {self.workers}개")
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+
+    def enqueue(self, dept_code, serial_no, model=None):
+        """
+        병합 작업을 등록하고 작업 ID를 반환합니다.
+        같은 시리얼의 대기 중인 작업이 있으면 새로 만들지 않고 그 작업을 사용합니다.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT job_id FROM merge_jobs WHERE dept_code = ? AND serial_no = ? AND status = 'queued'",
+                (dept_code, serial_no)
+            ).fetchone()
+            if row:
+                job_id = row[0]
+                self._conn.execute(
+                    'UPDATE merge_jobs SET model = ?, updated_at = ?, next_run_at = ? WHERE job_id = ?',
+                    (model, now, now, job_id)
+                )
+            else:
+                job_id = uuid.uuid4().hex
+                self._conn.execute(
+                    'INSERT INTO merge_jobs (job_id, dept_code, serial_no, model, status, attempts, '
+                    "created_at, updated_at, next_run_at) VALUES (?, ?, ?, ?, 'queued', 0, ?, ?, ?)",
+                    (job_id, dept_code, serial_no, model, now, now, now)
+                )
+            self._conn.commit()
+        self._wakeup.set()
+        return job_id
+
+    def _requeue_stale(self, now):
+        # self._lock 안에서 호출 - 중단된 프로세스가 남긴 running 작업을 다시 대기열로
+        # (다른 프로세스가 처리 중인 작업은 stale_seconds 안에 끝나므로 건드리지 않음)
+        self._conn.execute(
+            "UPDATE merge_jobs SET status = 'queued', updated_at = ? WHERE status = 'running' AND updated_at < ?",
+            (now, now - self.stale_seconds)
+        )
+
+    def _claim(self):
+        """실행할 작업 하나를 running으로 바꾸고 반환합니다. 없으면 None"""
+        now = time.time()
+        with self._lock:
+            self._requeue_stale(now)
+            row = self._conn.execute(
+                "SELECT job_id, dept_code, serial_no, model, attempts FROM merge_jobs "
+                "WHERE status = 'queued' AND next_run_at <= ? "
+                # 같은 시리얼이 처리 중이면 끝난 뒤에 실행 (같은 Merged 파일을 동시에 쓰지 않도록)
+                "AND NOT EXISTS (SELECT 1 FROM merge_jobs r WHERE r.status = 'running' "
+                "AND r.dept_code = merge_jobs.dept_code AND r.serial_no = merge_jobs.serial_no) "
+                "ORDER BY next_run_at LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                self._conn.commit()
+                return None
+            # 조회와 변경 사이에 다른 프로세스가 가져갔으면 변경되는 행이 없음 → 이번에는 건너뜀
+            claimed = self._conn.execute(
+                "UPDATE merge_jobs SET status = 'running', attempts = attempts + 1, updated_at = ? "
+                "WHERE job_id = ? AND status = 'queued' "
+                "AND NOT EXISTS (SELECT 1 FROM merge_jobs r WHERE r.status = 'running' "
+                "AND r.dept_code = ? AND r.serial_no = ?)",
+                (now, row[0], row[1], row[2])
+            ).rowcount
+            self._conn.commit()
+            if claimed != 1:
+                return None
+        return {'job_id': row[0], 'dept_code': row[1], 'serial_no': row[2], 'model': row[3], 'attempts': row[4] + 1}
+
+    def _finish(self, job, error=None):
+        now = time.time()
+        with self._lock:
+            if error is None:
+                self._conn.execute(
+                    "UPDATE merge_jobs SET status = 'done', last_error = NULL, updated_at = ? WHERE job_id = ?",
+                    (now, job['job_id'])
+                )
+            elif job['attempts'] < self.max_attempts:
+                retry_at = now + self.retry_seconds * (2 ** (job['attempts'] - 1))
+                self._conn.execute(
+                    "UPDATE merge_jobs SET status = 'queued', last_error = ?, updated_at = ?, next_run_at = ? "
+                    "WHERE job_id = ?",
+                    (error, now, retry_at, job['job_id'])
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE merge_jobs SET status = 'failed', last_error = ?, updated_at = ? WHERE job_id = ?",
+                    (error, now, job['job_id'])
+                )
+            self._conn.commit()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                job = self._claim()
+            except sqlite3.Error as e:
+                logging.error(f"병합 작업 조회 오류: {str(e)}")
+                job = None
+            if job is None:
+                self._wakeup.wait(self.poll_seconds)
+                self._wakeup.clear()
+                continue
+
+            started = time.perf_counter()
+            try:
+                self.handler(job['dept_code'], job['serial_no'], job['model'])
+            except Exception as e:
+                self.failed += 1
+                logging.error(f"병합 작업 실패 ({job['dept_code']}/{job['serial_no']}, "
+                              f"{job['attempts']}/{self.max_attempts}회): {str(e)}")
+                self._finish(job, str(e))
+            else:
+                self.processed += 1
+                logging.info(f"병합 작업 완료: {job['dept_code']}/{job['serial_no']} "
+                             f"({(time.perf_counter() - started) * 1000:.0f}ms)")
+                self._finish(job)
+
+    def active_serials(self):
+        """대기 중이거나 처리 중인 작업의 (부서, 시리얼) 집합"""
+        with self._lock:
+            return set(self._conn.execute(
+                "SELECT dept_code, serial_no FROM merge_jobs WHERE status IN ('queued', 'running')"
+            ).fetchall())
+
+    @staticmethod
+    def read_active_serials(path):
+        """
+        작업 스레드를 띄우지 않고 큐 파일에서 대기/처리 중인 (부서, 시리얼) 집합을 읽습니다. (명령행 도구용)
+        큐 파일이 없으면 빈 집합
+        """
+        if not path or not os.path.exists(path):
+            return set()
+        conn = sqlite3.connect(path, timeout=10)
+        try:
+            return set(conn.execute(
+                "SELECT dept_code, serial_no FROM merge_jobs WHERE status IN ('queued', 'running')"
+            ).fetchall())
+        except sqlite3.Error as e:
+            logging.error(f"병합 작업 큐 조회 오류: {str(e)}")
+            return set()
+        finally:
+            conn.close()
+
+    def get_job(self, job_id):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT job_id, dept_code, serial_no, status, attempts, last_error, created_at, updated_at '
+                'FROM merge_jobs WHERE job_id = ?', (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'job_id': row[0],
+            'dept_code': row[1],
+            'serial_no': row[2],
+            'status': row[3],
+            'attempts': row[4],
+            'last_error': row[5],
+            'created_at': row[6],
+            'updated_at': row[7],
+        }
+
+    def prune(self, older_than):
+        """older_than(초)보다 오래된 done 작업을 삭제하고 삭제 건수를 반환합니다."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM merge_jobs WHERE status = 'done' AND updated_at < ?", (time.time() - older_than,)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def get_stats(self):
+        with self._lock:
+            counts = dict(self._conn.execute('SELECT status, COUNT(*) FROM merge_jobs GROUP BY status').fetchall())
+        return {
+            'name': 'merge_worker',
+            'workers': self.workers,
+            'queued': counts.get('queued', 0),
+            'running': counts.get('running', 0),
+            'failed_jobs': counts.get('failed', 0),
+            'processed': self.processed,
+            'failed': self.failed,
+        }
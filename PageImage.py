@@ -0,0 +1,96 @@
+import logging
+import os
+
+import cv2
+import numpy as np
+from PIL import Image
+
+
+class PageImage:
+    """
+    Process/Master 페이지 이미지 저장 형식
+    - rgb : 기존과 같이 24비트 BGR PNG
+    - gray: 8비트 그레이스케일 PNG + 색이 있는 픽셀(빨강/노랑 표시 등)만 담은 {이름}.overlay.png (RGBA)
+      회색 픽셀(R=G=B)은 그레이스케일 값이 원래 값과 같고, 색 픽셀은 오버레이에 원래 색을 그대로 보관 → 무손실
+    읽을 때는 오버레이가 없으면 그레이스케일 배열을 그대로 돌려주고, 있으면 BGR로 합성해서 돌려줌
+    """
+
+    MODES = ('rgb', 'gray')
+    OVERLAY_SUFFIX = '.overlay.png'
+
+    @staticmethod
+    def overlay_path(path):
+        return os.path.splitext(path)[0] + PageImage.OVERLAY_SUFFIX
+
+    @staticmethod
+    def is_overlay(name):
+        return name.endswith(PageImage.OVERLAY_SUFFIX)
+
+    @staticmethod
+    def _remove_overlay(path):
+        overlay_path = PageImage.overlay_path(path)
+        if os.path.exists(overlay_path):
+            os.remove(overlay_path)
+
+    @staticmethod
+    def write(path, image, mode='rgb', params=None):
+        """
+        페이지 이미지(BGR 또는 그레이스케일)를 저장 형식에 맞춰 저장합니다.
+        gray 형식이면 색 픽셀만 오버레이로 따로 저장하고, 색이 없으면 이전 오버레이를 지움
+        """
+        params = params or []
+        if mode == 'gray' and image.ndim == 3:
+            blue, green, red = cv2.split(image)
+            colour = (blue != green) | (green != red)
+            if colour.any():
+                overlay = np.zeros((image.shape[0], image.shape[1], 4), dtype=np.uint8)
+                overlay[colour, :3] = image[colour]
+                overlay[colour, 3] = 255
+                # 페이지보다 먼저 저장 (페이지가 보이면 오버레이도 준비된 상태)
+                if not cv2.imwrite(PageImage.overlay_path(path), overlay):
+                    return False
+            else:
+                PageImage._remove_overlay(path)
+            # 회색 픽셀은 BGR2GRAY 결과가 원래 값과 같음 (가중치 합이 정확히 1)
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        else:
+            PageImage._remove_overlay(path)
+        return cv2.imwrite(path, image, params)
+
+    @staticmethod
+    def read(path):
+        """
+        페이지 이미지를 읽습니다. 읽을 수 없으면 None
+
+        :return: 오버레이 없는 그레이스케일 페이지는 2차원 배열 그대로, 그 외에는 BGR 배열
+        """
+        page = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+        if page is None:
+            return None
+        if page.dtype != np.uint8:
+            page = cv2.convertScaleAbs(page, alpha=255.0 / 65535)
+        if page.ndim == 3:
+            return cv2.cvtColor(page, cv2.COLOR_BGRA2BGR) if page.shape[2] == 4 else page
+
+        overlay_path = PageImage.overlay_path(path)
+        if not os.path.exists(overlay_path):
+            return page
+        overlay = cv2.imread(overlay_path, cv2.IMREAD_UNCHANGED)
+        page = cv2.cvtColor(page, cv2.COLOR_GRAY2BGR)
+        if overlay is None or overlay.ndim != 3 or overlay.shape[:2] != page.shape[:2] or overlay.shape[2] != 4:
+            logging.warning(f"오버레이를 사용할 수 없습니다: {overlay_path}")
+            return page
+        colour = overlay[:, :, 3] > 0
+        page[colour] = overlay[colour, :3]
+        return page
+
+    @staticmethod
+    def to_bgr(image):
+        return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR) if image.ndim == 2 else image
+
+    @staticmethod
+    def to_pil(image):
+        """read() 결과를 그리기용 PIL RGB 이미지로 변환합니다."""
+        if image.ndim == 2:
+            return Image.fromarray(image, 'L').convert('RGB')
+        return Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
@@ -0,0 +1,178 @@
+import logging
+import os
+import time
+
+import numpy as np
+from PIL import Image
+
+from PageImage import PageImage
+
+
+class PngOptimizer:
+    """
+    저장된 PNG(Checked/Merged)를 무손실로 다시 압축하는 백그라운드 작업
+    - 색이 256개 이하면 팔레트(P), 회색조면 L, 그 외에는 원래 모드로 optimize 저장
+    - 새 파일을 다시 읽어 원본과 RGBA 픽셀이 모두 같을 때만 교체, 수정 시각은 원본 그대로 유지
+    - min_age_seconds보다 최근에 바뀐 파일은 건너뜀 (작성/병합 중인 파일 보호)
+    - 파일 사이에 throttle_seconds만큼 쉬어 네트워크(CIFS) 부하를 제한
+    - store(SQLiteCacheStore)에 처리한 파일을 기록해 다음 실행에서 다시 읽지 않음
+    - 병합 작업이 대기/처리 중인 시리얼(busy_serials)은 건너뛰고, 교체 직전에 원본이 바뀌었으면 교체하지 않음
+    """
+
+    FOLDERS = ('Checked', 'Merged')
+
+    def __init__(self, roots, store=None, throttle_seconds=0.05, min_age_seconds=86400, min_saving_ratio=0.02,
+                 busy_serials=None):
+        self.roots = [root for root in roots if root]
+        self.store = store
+        self.busy_serials = busy_serials  # () → 병합 작업 중인 {(부서, 시리얼)} (MergeWorker)
+        self.throttle_seconds = float(throttle_seconds)
+        self.min_age_seconds = float(min_age_seconds)
+        self.min_saving_ratio = float(min_saving_ratio)
+        self.last_report = None
+
+    @staticmethod
+    def _file_key(path, stat):
+        return f"{path}|{stat.st_mtime_ns}|{stat.st_size}"
+
+    @staticmethod
+    def _serial_of(path):
+        """파일 경로의 (부서, 시리얼) - <dept>/Merged/<serial>.png, <dept>/Checked/<serial>/<파일>.png"""
+        folder = os.path.dirname(path)
+        if os.path.basename(folder) == 'Merged':
+            return os.path.basename(os.path.dirname(folder)), os.path.splitext(os.path.basename(path))[0]
+        return os.path.basename(os.path.dirname(os.path.dirname(folder))), os.path.basename(folder)
+
+    def iter_files(self):
+        """roots/<dept>/(Checked|Merged)/ 아래 PNG 파일을 (경로, stat)으로 순회합니다."""
+        for root in self.roots:
+            try:
+                depts = [entry.path for entry in os.scandir(root) if entry.is_dir()]
+            except OSError as e:
+                logging.error(f"PNG 최적화 경로 확인 오류: {root}, {str(e)}")
+                continue
+            for dept_path in depts:
+                for folder in self.FOLDERS:
+                    yield from self._walk(os.path.join(dept_path, folder))
+
+    def _walk(self, folder):
+        try:
+            entries = list(os.scandir(folder))
+        except OSError:
+            return
+        for entry in entries:
+            if entry.is_dir():
+                yield from self._walk(entry.path)
+            elif entry.name.lower().endswith('.png') and not PageImage.is_overlay(entry.name):
+                yield entry.path, entry.stat()
+
+    @staticmethod
+    def _encode_candidate(image, path):
+        """무손실 후보 이미지를 path에 저장합니다."""
+        rgba = image.convert('RGBA')
+        pixels = np.asarray(rgba)
+        opaque = bool((pixels[:, :, 3] == 255).all())
+
+        if opaque:
+            rgb = pixels[:, :, :3]
+            codes = (rgb[:, :, 0].astype(np.uint32) << 16) | (rgb[:, :, 1].astype(np.uint32) << 8) | rgb[:, :, 2]
+            colors, indices = np.unique(codes.ravel(), return_inverse=True)
+            if len(colors) <= 256:
+                # 색 수가 적으면(거의 흑백인 체크시트) 정확한 팔레트로 저장 - 양자화 없음
+                candidate = Image.fromarray(indices.reshape(codes.shape).astype(np.uint8), 'P')
+                palette = np.stack(((colors >> 16) & 255, (colors >> 8) & 255, colors & 255), axis=1)
+                candidate.putpalette(palette.astype(np.uint8).ravel().tolist())
+            elif (rgb[:, :, 0] == rgb[:, :, 1]).all() and (rgb[:, :, 1] == rgb[:, :, 2]).all():
+                candidate = Image.fromarray(np.ascontiguousarray(rgb[:, :, 0]), 'L')
+            else:
+                candidate = Image.fromarray(np.ascontiguousarray(rgb), 'RGB')
+        else:
+            candidate = rgba
+        candidate.save(path, 'PNG', optimize=True, compress_level=9)
+        return pixels
+
+    def optimize_file(self, path, stat=None, dry_run=False):
+        """
+        PNG 하나를 다시 압축합니다.
+
+        :return: (이전 크기, 이후 크기) - 교체하지 않았으면 이후 크기 = 이전 크기
+        """
+        stat = stat or os.stat(path)
+        temp_path = f"{path}.opt.tmp"
+        try:
+            with Image.open(path) as image:
+                image.load()
+                pixels = self._encode_candidate(image, temp_path)
+            new_size = os.path.getsize(temp_path)
+            if new_size > stat.st_size * (1 - self.min_saving_ratio):
+                return stat.st_size, stat.st_size
+
+            # 다시 읽어 픽셀이 모두 같은지 확인
+            with Image.open(temp_path) as check:
+                if not np.array_equal(np.asarray(check.convert('RGBA')), pixels):
+                    logging.error(f"PNG 최적화 결과 픽셀 불일치, 원본 유지: {path}")
+                    return stat.st_size, stat.st_size
+            if dry_run:
+                return stat.st_size, new_size
+
+            # 인코딩 중에 다시 저장(체크시트 재저장, 병합)되었으면 새 이미지를 덮어쓰지 않음
+            current = os.stat(path)
+            if current.st_mtime_ns != stat.st_mtime_ns or current.st_size != stat.st_size:
+                logging.info(f"PNG 최적화 중 원본 변경, 교체하지 않음: {path}")
+                return stat.st_size, stat.st_size
+            os.utime(temp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            os.replace(temp_path, path)
+            return stat.st_size, new_size
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def run(self, max_files=None, dry_run=False):
+        """
+        대상 폴더의 PNG를 최적화하고 결과 보고를 반환합니다.
+
+        :param max_files: 이번 실행에서 최적화를 시도할 최대 파일 수 (없으면 전체)
+        """
+        started = time.time()
+        report = {'scanned': 0, 'attempted': 0, 'optimized': 0, 'errors': 0, 'busy': 0,
+                  'bytes_before': 0, 'bytes_after': 0, 'dry_run': dry_run}
+        busy = self.busy_serials() if self.busy_serials else set()
+        for path, stat in self.iter_files():
+            report['scanned'] += 1
+            if stat.st_mtime > started - self.min_age_seconds:
+                continue
+            if busy and self._serial_of(path) in busy:
+                report['busy'] += 1
+                continue
+            key = self._file_key(path, stat)
+            if self.store is not None and self.store.get(key):
+                continue
+            if max_files is not None and report['attempted'] >= max_files:
+                break
+
+            report['attempted'] += 1
+            try:
+                before, after = self.optimize_file(path, stat, dry_run=dry_run)
+            except Exception as e:
+                report['errors'] += 1
+                logging.error(f"PNG 최적화 오류: {path}, {str(e)}")
+                continue
+            report['bytes_before'] += before
+            report['bytes_after'] += after
+            if after < before:
+                report['optimized'] += 1
+            if self.store is not None and not dry_run:
+                # 교체된 파일은 크기가 바뀌므로 새 크기로 기록 (수정 시각은 유지됨)
+                self.store.set(self._file_key(path, os.stat(path)), 1)
+            if self.throttle_seconds > 0:
+                time.sleep(self.throttle_seconds)
+
+        report['bytes_saved'] = report['bytes_before'] - report['bytes_after']
+        report['seconds'] = round(time.time() - started, 1)
+        self.last_report = report
+        logging.info(f"PNG 최적화 완료: 시도 {report['attempted']}개, 교체 {report['optimized']}개, "
+                     f"절감 {report['bytes_saved'] / 1024 / 1024:.1f}MB, 오류 {report['errors']}개")
+        return report
+
+    def get_stats(self):
+        return {'name': 'png_optimizer', 'last_report': self.last_report}
@@ -1,34 +1,160 @@
-from flask import render_template, request, jsonify, url_for, send_from_directory, redirect, session, send_file
+from flask import render_template, request, jsonify, url_for, send_from_directory, redirect, session, send_file, Response, stream_with_context
 import logging
 from werkzeug.utils import secure_filename, safe_join
 from datetime import datetime, time
 import os
-from pdf2image import convert_from_path
-from PIL import Image
 import base64
+import hashlib
 import io
-import numpy as np
 import socket
 from functools import wraps
 from PIL import ImageDraw
 from ImageProcessor import ImageProcessor
+from PageImage import PageImage
 import json
 from apscheduler.schedulers.background import BackgroundScheduler
 import shutil
 import pytz
 from SchedulerManager import SchedulerManager
+from StatementRegistry import StatementRegistry
+from CacheManager import TTLCache, SQLiteCacheStore
+from EmployeeDirectory import EmployeeDirectory
+from ImageEncoder import ImageEncoder
+from MasterWatcher import MasterWatcher
+from MergeWorker import MergeWorker
+from MergeLayout import MergeLayout
+from PngOptimizer import PngOptimizer
 
 class RouteHandler:
-    def __init__(self, app, db_manager_1, db_manager_2, image_processor):
+    # 부서별 완료 판단에 필요한 공정 (부품SET 제외)
+    REQUIRED_PROCESSES = {
+        '3165': ['06', '11', '15'],
+        '3186': ['07', '10', '11'],
+        '3188': ['06', '09']
+    }
+
+    def __init__(self, app, db_manager_1, db_manager_2, image_processor, statement_registry=None):
         # 클래스 초기화 메서드
         self.app = app
         self.db_manager_1 = db_manager_1
         self.db_manager_2 = db_manager_2
         self.image_processor = image_processor
+        self.statements = statement_registry or StatementRegistry()
+        # 완료 확인 SQL(dcs_status_for_completion)의 IN 목록보다 필수 공정이 많으면 바인드 수가 맞지 않으므로 시작 시 확인
+        if max(len(processes) for processes in self.REQUIRED_PROCESSES.values()) > \
+                StatementRegistry.COMPLETION_PROCESS_SLOTS:
+            raise ValueError(f"REQUIRED_PROCESSES의 공정 수가 완료 확인 SQL의 자리 수"
+                             f"({StatementRegistry.COMPLETION_PROCESS_SLOTS})를 넘습니다.")
         self.settings_path = 'Settings.json'  # settings.json 파일 경로 추가
+        # (인덱스, 부서, 시리얼)별 공정 완료 여부 캐시 - DCS_HISTORY 쓰기 시 무효화
+        self.completion_cache = TTLCache(ttl=app.config.get('COMPLETION_CACHE_TTL', 0), name='process_completion')
+        # 시리얼 → 제품 속성(MODEL 등) 캐시, 값이 바뀌지 않으므로 길게 유지하고 선택적으로 SQLite에 보관
+        product_cache_db = app.config.get('PRODUCT_CACHE_DB')
+        self.product_cache = TTLCache(
+            ttl=app.config.get('PRODUCT_CACHE_TTL', 86400),
+            maxsize=app.config.get('PRODUCT_CACHE_SIZE', 5000),
+            name='product_attributes',
+            store=SQLiteCacheStore(product_cache_db, table='product_attributes') if product_cache_db else None
+        )
+        # 인덱스 번호 → 제품 정보 캐시 (같은 지시서를 여러 공정에서 반복 스캔)
+        self.product_info_cache = TTLCache(
+            ttl=app.config.get('PRODUCT_INFO_CACHE_TTL', 300),
+            maxsize=app.config.get('PRODUCT_INFO_CACHE_SIZE', 2000),
+            name='product_info'
+        )
+        # 공정 페이지 응답 인코더 (Accept에 따라 PNG/WebP/JPEG)
+        self.image_encoder = ImageEncoder(
+            png_compression=app.config.get('IMAGE_PNG_COMPRESSION', 1),
+            jpeg_quality=app.config.get('IMAGE_JPEG_QUALITY', 90),
+            webp_enabled=app.config.get('IMAGE_WEBP_ENABLED', True)
+        )
+        # 렌더링한 공정 페이지 이미지 (upload_image에서 만들고 page_image에서 형식별로 인코딩해 응답)
+        self.page_image_cache = TTLCache(
+            ttl=app.config.get('PAGE_IMAGE_CACHE_TTL', 600),
+            maxsize=app.config.get('PAGE_IMAGE_CACHE_SIZE', 10),
+            name='page_image'
+        )
+        # Process 이미지별 체크박스 인식 결과 (UPLOAD_FOLDER 밖의 SQLite에 보관해 재시작 후에도 재사용)
+        checkbox_cache_db = app.config.get('CHECKBOX_CACHE_DB')
+        self.checkbox_cache = TTLCache(
+            ttl=app.config.get('CHECKBOX_CACHE_TTL', 604800),
+            maxsize=app.config.get('CHECKBOX_CACHE_SIZE', 500),
+            name='checkbox_detection',
+            store=SQLiteCacheStore(checkbox_cache_db, table='checkbox_detection',
+                                   ttl=app.config.get('CHECKBOX_CACHE_TTL', 604800)) if checkbox_cache_db else None
+        )
+        # 사원번호 → 이름/부서 디렉터리 (로그인, 이력 조회에서 사용)
+        self.employee_directory = EmployeeDirectory(db_manager_1, self.statements)
         
         # app 인스턴스를 직접 전달
-        self.scheduler_manager = SchedulerManager(app, db_manager_2)
+        self.scheduler_manager = SchedulerManager(app, db_manager_2, self.statements)
+        self.scheduler_manager.add_interval_job(
+            self.employee_directory.refresh,
+            minutes=app.config.get('EMP_DIRECTORY_REFRESH_MINUTES', 30),
+            job_id='employee_directory_refresh',
+            name='Employee Directory Refresh'
+        )
+        # Master PDF 도착 시 Process 이미지 사전 생성 (로컬 폴더 감시 + 네트워크 폴더 주기 스캔)
+        self.master_watcher = MasterWatcher(
+            image_processor,
+            upload_folder=app.config['UPLOAD_FOLDER'],
+            network_path=app.config.get('NETWORK_PATH'),
+            model_resolver=self._resolve_product_model,
+            workers=app.config.get('MASTER_RENDER_WORKERS', 2),
+            settle_seconds=app.config.get('MASTER_SETTLE_SECONDS', 2),
+            wait_timeout=app.config.get('MASTER_WAIT_TIMEOUT', 10),
+            # 변환 완료 기록은 마스터 렌더링 기록과 같은 SQLite 파일에 보관 (재시작 후 다시 변환하지 않도록)
+            done_store=SQLiteCacheStore(app.config['MASTER_RENDER_INDEX_DB'], table='master_done')
+            if app.config.get('MASTER_RENDER_INDEX_DB') else None
+        )
+        # Merged 이미지 슬롯 배치 기록 (부분 갱신용, Merged 폴더 밖의 SQLite에 보관)
+        merge_layout_db = app.config.get('MERGE_LAYOUT_DB')
+        self.merge_layout_store = SQLiteCacheStore(merge_layout_db, table='merge_layout') if merge_layout_db else None
+        # 모든 공정 완료 시 Merged 이미지 생성 작업 큐 (SQLite에 보관, 실패 시 재시도)
+        self.merge_worker = MergeWorker(
+            self.merge_serial_images,
+            path=app.config.get('MERGE_QUEUE_DB', 'cache/merge_queue.sqlite'),
+            workers=app.config.get('MERGE_WORKERS', 1),
+            max_attempts=app.config.get('MERGE_MAX_ATTEMPTS', 3),
+            retry_seconds=app.config.get('MERGE_RETRY_SECONDS', 30)
+        )
+        self.merge_worker.start()
+        self.scheduler_manager.add_interval_job(
+            lambda: self.merge_worker.prune(7 * 86400),
+            minutes=1440,
+            job_id='merge_queue_prune',
+            name='Merge Queue Prune'
+        )
+        if self.merge_layout_store is not None:
+            # Merged 이미지는 며칠 뒤 네트워크로 옮겨져 부분 갱신 대상이 아니므로 오래된 배치 기록 정리
+            self.scheduler_manager.add_interval_job(
+                lambda: self.merge_layout_store.prune(30 * 86400),
+                minutes=1440,
+                job_id='merge_layout_prune',
+                name='Merge Layout Prune'
+            )
+        # 저장된 Checked/Merged PNG 무손실 재압축 (PNG_OPTIMIZE_MINUTES가 0이면 등록하지 않음)
+        png_optimize_db = app.config.get('PNG_OPTIMIZE_DB')
+        self.png_optimizer = PngOptimizer(
+            [app.config.get('NETWORK_PATH'), app.config['UPLOAD_FOLDER']],
+            store=SQLiteCacheStore(png_optimize_db, table='png_optimized') if png_optimize_db else None,
+            throttle_seconds=app.config.get('PNG_OPTIMIZE_THROTTLE', 0.05),
+            busy_serials=self.merge_worker.active_serials
+        )
+        self.scheduler_manager.add_interval_job(
+            lambda: self.png_optimizer.run(max_files=app.config.get('PNG_OPTIMIZE_MAX_FILES', 2000)),
+            minutes=app.config.get('PNG_OPTIMIZE_MINUTES', 0),
+            job_id='png_optimize',
+            name='PNG Archive Optimize'
+        )
+        if app.config.get('MASTER_WATCH_ENABLED', True):
+            self.master_watcher.start()
+            self.scheduler_manager.add_interval_job(
+                self.master_watcher.scan,
+                minutes=app.config.get('MASTER_SCAN_MINUTES', 5),
+                job_id='master_scan',
+                name='Master PDF Scan'
+            )
         
         self.register_routes()
 
@@ -43,6 +169,9 @@ class RouteHandler:
             ('/checkSheet', self.checkSheet, ['GET']),
             ('/checksheet-history', self.checksheet_history, ['GET']),
             ('/upload_image/<serial_process>', self.upload_image, ['GET']),
+            ('/page_image/<serial_process>', self.page_image, ['GET']),
+            ('/render_job/<job_id>', self.render_job, ['GET']),
+            ('/merge_status/<job_id>', self.merge_status, ['GET']),
             ('/get_product_info', self.get_product_info, ['POST']),
             ('/search_history', self.search_history, ['POST']),
             ('/files/list/<path:directory>', self.list_files, ['GET']),
@@ -60,7 +189,10 @@ class RouteHandler:
             ('/update_and_insert_product_info', self.update_and_insert_product_info, ['POST']),
             ('/check_index_in_dcs_history', self.check_index_in_dcs_history, ['POST']),
             ('/check_dcs_history_status', self.check_dcs_history_status, ['POST']),
-            ('/insert_dcs_history',self.insert_dcs_history,['POST'])
+            ('/insert_dcs_history',self.insert_dcs_history,['POST']),
+            ('/db_pool_status', self.db_pool_status, ['GET']),
+            ('/statement_stats', self.statement_stats, ['GET']),
+            ('/cache_stats', self.cache_stats, ['GET'])
         ]
 
         # 라우트 등록 시 view_func를 데코레이터로 감싸서 등록
@@ -106,27 +238,44 @@ class RouteHandler:
         if not employee_id.isdigit():
             return jsonify({'error': '유효하지 않은 사원번호입니다.'}), 400
 
-        connection = self.db_manager_1.connect()
-        cursor = connection.cursor()
-        try:
-            # SQL 파일 읽기
-            with open('.\\sql\\EMP.sql', 'r', encoding='utf-8') as file:
-                sql = file.read().format(employee_id=employee_id)
-            cursor.execute(sql)
-            employee_info = cursor.fetchone()
-            if employee_info:
-                # 세션 정보 설정
-                session['logged_in'] = True
-                session['employee_name'] = employee_info[2] + ' ' + employee_info[3]
-                session['dept_info'] = employee_info[0] + ' ' + employee_info[1]
-                session.modified = True
-                logging.info(f"Session after login: {session}")
-                return jsonify({'employeeName': session['employee_name'], 'deptInfo': session['dept_info']})
-            else:
-                return jsonify({'error': '사원번호가 존재하지 않습니다.\n유저 등록 및 조회는 K-Prism에서 가능합니다.'}), 404
-        finally:
-            cursor.close()
-            self.db_manager_1.close()
+        employee_info = self.employee_directory.get_active(employee_id)
+        if employee_info:
+            # 세션 정보 설정
+            session['logged_in'] = True
+            session['employee_name'] = employee_info['emp_no'] + ' ' + employee_info['emp_name']
+            session['dept_info'] = employee_info['dept_code'] + ' ' + employee_info['dept_name']
+            session.modified = True
+            logging.info(f"Session after login: {session}")
+            return jsonify({'employeeName': session['employee_name'], 'deptInfo': session['dept_info']})
+        else:
+            return jsonify({'error': '사원번호가 존재하지 않습니다.\n유저 등록 및 조회는 K-Prism에서 가능합니다.'}), 404
+
+    def merge_serial_images(self, deptCode, serial_no, model=None):
+        """
+        모든 공정이 끝난 시리얼의 체크시트 이미지를 Merged/{serial}.png로 합칩니다. (병합 작업 큐에서 실행)
+        """
+        # Merged 폴더 경로 설정
+        merged_folder = os.path.join(self.app.config['UPLOAD_FOLDER'], deptCode, 'Merged')
+        if not os.path.exists(merged_folder):
+            os.makedirs(merged_folder)
+        
+        # 합쳐질 이미지의 경로 설정 (시리얼 번호로 저장)
+        merged_image_path = os.path.join(merged_folder, f"{serial_no}.png")
+
+        # 부서/모델별 배치(MergeLayout.LAYOUTS)에 따라 Checked/Process 폴더에서 이미지 선택
+        layout = MergeLayout.for_dept(deptCode, model)
+        if layout is None:
+            raise ValueError(f"지원하지 않는 부서코드: {deptCode}")
+        columns = layout.resolve(os.path.join(self.app.config['UPLOAD_FOLDER'], deptCode), serial_no)
+        if not columns:
+            logging.error(f"No valid images found to merge for {serial_no}")
+            return
+        logging.info(f"Merged images for {serial_no}: "
+                     f"{[[os.path.basename(path) for path in column['paths']] for column in columns]}")
+        # 슬롯 배치 기록(MERGE_LAYOUT_DB)이 있으면 다시 저장된 공정의 슬롯만 갱신
+        if not MergeLayout.compose(columns, merged_image_path, manifest_store=self.merge_layout_store):
+            # 실패 시 작업 큐에서 재시도
+            raise RuntimeError(f"Merged 이미지가 생성되지 않았습니다: {merged_image_path}")
 
     def save_checked_image(self):
         """
@@ -169,194 +318,42 @@ class RouteHandler:
                 # DB 저장 시도
                 connection = self.db_manager_2.connect()
                 cursor = connection.cursor()
-                sql_check = """
-                                SELECT RENEWAL_D
-                                FROM DCS_HISTORY
-                                WHERE INDEX_NO=:1 AND INDEX_NO_SFIX=:2
-                                AND SERIAL_NO=:3 AND DEPT_CODE=:4
-                                AND PROCESS_CODE=:5 AND DATA_ST='A'
-                            """
-                cursor.execute(sql_check, (indexNo, indexNo_sfix, serial_no, deptCode, process_code))
-                row = cursor.fetchone()
-                renewal_d_value = row[0] if row else None
-
-                sql_model = """
-                    SELECT T951.MODEL FROM TDSC951 T951, TDSC952 T952
-                    WHERE T951.PROD_NO = T952.PROD_NO 
-                    AND T952.SERIAL_NO =:1
-                    """
-                cursor.execute(sql_model, (serial_no,))
-                row = cursor.fetchone()
-                model = row[0] if row else None
+                self.statements.execute(cursor, 'dcs_renewal_by_key', (indexNo, indexNo_sfix, serial_no, deptCode, process_code))
+                dcs_row = cursor.fetchone()
+                renewal_d_value = dcs_row[0] if dcs_row else None
+
+                model = self.get_product_model(cursor, serial_no)
 
                 # 04번 공정의 경우 DCS_HISTORY에 레코드가 없을 수 있으므로 MERGE 사용
                 if process_code == '04' and deptCode == '3186':
-                    sql_merge = """
-                        MERGE INTO DCS_HISTORY
-                        USING DUAL
-                        ON (INDEX_NO = :1 AND INDEX_NO_SFIX = :2 AND SERIAL_NO = :3 
-                            AND DEPT_CODE = :4 AND PROCESS_CODE = :5 AND DATA_ST = 'A')
-                        WHEN MATCHED THEN
-                            UPDATE SET STATUS = :6, EMP_NO = :7, FINISH_D = :8, RENEWAL_BY = :9
-                        WHEN NOT MATCHED THEN
-                            INSERT (INDEX_NO, INDEX_NO_SFIX, SERIAL_NO, DEPT_CODE, PROCESS_CODE, 
-                                    STATUS, EMP_NO, FINISH_D, ENTRY_D, ENTRY_BY, DATA_ST)
-                            VALUES (:1, :2, :3, :4, :5, :6, :7, :8, :8, :9, 'A')
-                    """
                     params = (indexNo, indexNo_sfix, serial_no, deptCode, process_code, 
                              result, empNo, date_str, pc_name)
-                    cursor.execute(sql_merge, params)
-                elif renewal_d_value is None and row is not None:
-                    sql_update = """
-                        UPDATE DCS_HISTORY
-                        SET STATUS = :1, EMP_NO = :2, FINISH_D = :3
-                        WHERE INDEX_NO = :4 AND INDEX_NO_SFIX = :5 AND SERIAL_NO = :6 AND DEPT_CODE = :7 AND PROCESS_CODE = :8 AND DATA_ST = 'A'
-                    """
+                    self.statements.execute(cursor, 'dcs_merge_status', params)
+                elif renewal_d_value is None and dcs_row is not None:
                     params = (result, empNo, date_str, indexNo, indexNo_sfix, serial_no, deptCode, process_code)
-                    cursor.execute(sql_update, params)
-                elif row is not None:
+                    self.statements.execute(cursor, 'dcs_update_status', params)
+                elif dcs_row is not None:
                     # RENEWAL_D가 NULL이 아닐 경우
-                    sql_update = """
-                        UPDATE DCS_HISTORY
-                        SET STATUS = :1, EMP_NO = :2, RENEWAL_FINISH_D = :3, RENEWAL_BY = :4
-                        WHERE INDEX_NO = :4 AND INDEX_NO_SFIX = :5 AND SERIAL_NO = :6 AND DEPT_CODE = :7 AND PROCESS_CODE = :8 AND DATA_ST = 'A'
-                    """
                     params = (result, empNo, date_str, pc_name, indexNo, indexNo_sfix, serial_no, deptCode, process_code)
-                    cursor.execute(sql_update, params)
+                    self.statements.execute(cursor, 'dcs_update_status_renewal', params)
 
+                self.refresh_history_summary(cursor, serial_no)
                 connection.commit()
                 db_success = True
+                # NG 저장은 완료 상태를 되돌릴 수 있으므로 캐시 무효화 (OK 저장은 완료 상태를 깨지 않음)
+                if result != 1:
+                    self.completion_cache.invalidate((indexNo, deptCode, serial_no))
                 
+                merge_job_id = None
                 if db_success and file_success:
                     # 모든 공정이 완료되었는지 확인 (부품SET 제외)
                     if self.is_all_process_completed(indexNo, deptCode, serial_no):
-                        # Merged 폴더 경로 설정
-                        merged_folder = os.path.join(self.app.config['UPLOAD_FOLDER'], deptCode, 'Merged')
-                        if not os.path.exists(merged_folder):
-                            os.makedirs(merged_folder)
-                        
-                        # 합쳐질 이미지의 경로 설정 (시리얼 번호로 저장)
-                        merged_image_path = os.path.join(merged_folder, f"{serial_no}.png")
-                        if deptCode in ['3165','UTA']:
-                            # 모든 체크시트 이미지 경로 수집 (부품SET 제외)
-                            image_folder = os.path.join(self.app.config['UPLOAD_FOLDER'], deptCode, 'Checked', serial_no)
-                            image_files = sorted([
-                                os.path.join(image_folder, f) for f in os.listdir(image_folder)
-                                if f.startswith(serial_no) and f.endswith('.png') and not f.endswith('_08.png')
-                            ])
-                            
-                            # 이미지 합치기 실행
-                            ImageProcessor.merge_checksheet_images_uta(image_files, merged_image_path, target_width=800)
-                        elif deptCode in ['3186','JUXTA']:
-                            # 모든 체크시트 이미지 경로 수집 (부품SET 제외)
-                            image_folder = os.path.join(self.app.config['UPLOAD_FOLDER'], deptCode, 'Checked', serial_no)
-                            image_files = sorted([
-                                os.path.join(image_folder, f) for f in os.listdir(image_folder)
-                                if f.startswith(serial_no) and f.endswith('.png')
-                            ])
-                            if model != 'VJ77':
-                                # 먼저 Checked 폴더에 04번 이미지가 있는지 확인
-                                checked_04_path = os.path.join(
-                                    self.app.config['UPLOAD_FOLDER'],
-                                    deptCode,
-                                    'Checked',
-                                    serial_no,
-                                    f'{serial_no}_04.png'
-                                )
-                                # Process 폴더의 _0.png 경로
-                                process_0_path = os.path.join(
-                                    self.app.config['UPLOAD_FOLDER'],
-                                    deptCode,
-                                    'Process',
-                                    serial_no,
-                                    f'{serial_no}_0.png'
-                                )
-                                
-                                # Checked에 04번이 있으면 그것을 사용, 없으면 Process의 0번 사용
-                                if os.path.exists(checked_04_path):
-                                    # 이미 image_files에 포함되어 있으므로 추가 작업 불필요
-                                    logging.info(f"Using checked 04 image for merge: {checked_04_path}")
-                                elif os.path.exists(process_0_path):
-                                    # Process 폴더의 0번 이미지를 맨 앞에 추가
-                                    image_files.insert(0, process_0_path)
-                                    logging.info(f"Using process 0 image for merge: {process_0_path}")
-                                else:
-                                    logging.warning(f"Neither checked 04 nor process 0 image found for {serial_no}")
-                            # 이미지 합치기 실행
-                            ImageProcessor.merge_checksheet_images_juxta(image_files, merged_image_path, target_width=800)
-                        elif deptCode in ['3188','NEW SC']:
-                            # Process 폴더와 Checked 폴더에서 이미지 수집
-                            process_folder = os.path.join(self.app.config['UPLOAD_FOLDER'], deptCode, 'Process', serial_no)
-                            checked_folder = os.path.join(self.app.config['UPLOAD_FOLDER'], deptCode, 'Checked', serial_no)
-                            
-                            # 3188의 특별한 병합 규칙:
-                            # 좌: serial_0.png(process), serial_06.png(checked), serial_2.png(process)
-                            # 우: serial_09.png(checked)
-                            
-                            left_images = []  # 왼쪽에 들어갈 이미지들 (순서대로)
-                            right_image = None  # 오른쪽에 들어갈 이미지
-                            
-                            # 0번 이미지 (Process 폴더)
-                            img_0 = os.path.join(process_folder, f"{serial_no}_0.png")
-                            if os.path.exists(img_0):
-                                left_images.append(img_0)
-                            else:
-                                logging.warning(f"0번 이미지를 찾을 수 없습니다: {img_0}")
-                            
-                            # 06 공정 이미지 (Checked 폴더)
-                            img_06 = os.path.join(checked_folder, f"{serial_no}_06.png")
-                            if os.path.exists(img_06):
-                                left_images.append(img_06)
-                            else:
-                                # Checked에 없으면 1번 이미지로 대체 (06 공정은 1번 인덱스 사용)
-                                img_1 = os.path.join(checked_folder, f"{serial_no}_1.png")
-                                if os.path.exists(img_1):
-                                    left_images.append(img_1)
-                                else:
-                                    # Checked에 없으면 Process에서 찾기
-                                    img_1_process = os.path.join(process_folder, f"{serial_no}_1.png")
-                                    if os.path.exists(img_1_process):
-                                        left_images.append(img_1_process)
-                                    else:
-                                        logging.warning(f"06 공정 이미지를 찾을 수 없습니다")
-                            
-                            # 2번 이미지 (Process 폴더)
-                            img_2 = os.path.join(process_folder, f"{serial_no}_2.png")
-                            if os.path.exists(img_2):
-                                left_images.append(img_2)
-                            else:
-                                logging.warning(f"2번 이미지를 찾을 수 없습니다: {img_2}")
-                            
-                            # 09 공정 이미지 (Checked 폴더)
-                            img_09 = os.path.join(checked_folder, f"{serial_no}_09.png")
-                            if os.path.exists(img_09):
-                                right_image = img_09
-                            else:
-                                # Checked에 없으면 3번 이미지로 대체 (09 공정은 3번 인덱스 사용)
-                                img_3 = os.path.join(checked_folder, f"{serial_no}_3.png")
-                                if os.path.exists(img_3):
-                                    right_image = img_3
-                                else:
-                                    # Checked에 없으면 Process에서 찾기
-                                    img_3_process = os.path.join(process_folder, f"{serial_no}_3.png")
-                                    if os.path.exists(img_3_process):
-                                        right_image = img_3_process
-                                    else:
-                                        logging.warning(f"09 공정 이미지를 찾을 수 없습니다")
-                            
-                            # NEW SC 전용 병합 함수 사용
-                            if left_images and right_image:
-                                ImageProcessor.merge_checksheet_images_newsc(left_images, right_image, merged_image_path)
-                                logging.info(f"NEW SC merged images for {serial_no}: Left={[os.path.basename(img) for img in left_images]}, Right={os.path.basename(right_image)}")
-                            elif left_images:
-                                # 오른쪽 이미지가 없는 경우 왼쪽 이미지들만 세로로 합치기
-                                ImageProcessor.merge_checksheet_images_uta(left_images, merged_image_path, target_width=800)
-                                logging.info(f"NEW SC merged only left images for {serial_no}")
-                            else:
-                                logging.error(f"No valid images found to merge for {serial_no}")
+                        # Merged 이미지는 병합 작업 큐에서 생성 (저장 응답은 DB 커밋 후 바로 반환)
+                        merge_job_id = self.merge_worker.enqueue(deptCode, serial_no, model)
                     return jsonify({
                         'success': True,
-                        'message': '체크시트가 성공적으로 저장되었습니다.'
+                        'message': '체크시트가 성공적으로 저장되었습니다.',
+                        'merge_job_id': merge_job_id
                     })
             else:
                 return jsonify({
@@ -410,6 +407,29 @@ class RouteHandler:
         pen_cursor_url = url_for('static', filename='icon/pen-tool.png')
         return render_template('checkSheet.html', employee_name=employee_name, dept_info=dept_info, pen_cursor_url=pen_cursor_url)
 
+    def get_product_attributes(self, cursor, serial_no):
+        """
+        시리얼의 변하지 않는 제품 속성(MODEL, PROD_NO)을 반환합니다.
+        메모리(LRU/TTL) → SQLite → DB 순으로 조회하며, 없는 시리얼은 캐시하지 않습니다.
+        """
+        attributes = self.product_cache.get(serial_no)
+        if attributes is None:
+            self.statements.execute(cursor, 'product_attributes_by_serial', (serial_no,))
+            row = cursor.fetchone()
+            if row:
+                attributes = {'MODEL': row[0], 'PROD_NO': row[1]}
+                self.product_cache.set(serial_no, attributes)
+        return attributes
+
+    def get_product_model(self, cursor, serial_no):
+        attributes = self.get_product_attributes(cursor, serial_no)
+        return attributes['MODEL'] if attributes else None
+
+    def _resolve_product_model(self, serial_no):
+        """요청 밖(백그라운드 변환)에서 시리얼의 제품 모델을 조회합니다."""
+        with self.db_manager_2.cursor() as (connection, cursor):
+            return self.get_product_model(cursor, serial_no)
+
     def _find_file_path(self, *paths):
         """여러 경로 중 첫 번째로 존재하는 파일 경로를 반환"""
         for path in paths:
@@ -417,8 +437,12 @@ class RouteHandler:
                 return path
         return None
     
-    @login_required
-    def upload_image(self, serial_process):
+    def _render_page_image(self, serial_process):
+        """
+        공정 페이지 이미지를 PNG로 만들고 체크박스 위치를 찾습니다.
+
+        :return: ({'image', 'version', 'encoded', 'checkboxes', 'is_checked_image'}, None) 또는 (None, 오류 응답)
+        """
         parts = serial_process.split('_')
         indexNo, dept, serial, process = parts[:4]
         index = int(parts[-1])
@@ -440,24 +464,10 @@ class RouteHandler:
         connection = self.db_manager_2.connect()
         cursor = connection.cursor()
         try:
-            cursor.execute("""
-                SELECT COUNT(*)
-                FROM CHECKBOX_STATES
-                WHERE SERIAL_NO = :1 
-                AND DEPT_CODE = :2 
-                AND PROCESS_CODE = :3
-                AND DATA_ST = 'A'
-            """, (serial, dept, process))
+            self.statements.execute(cursor, 'checkbox_count_by_process', (serial, dept, process))
             checkbox_count = cursor.fetchone()[0]
             is_checked_image = checkbox_count > 0
-            sql_model = """
-                SELECT T951.MODEL FROM TDSC951 T951, TDSC952 T952
-                WHERE T951.PROD_NO = T952.PROD_NO 
-                AND T952.SERIAL_NO =:1
-                """
-            cursor.execute(sql_model, (serial,))
-            row = cursor.fetchone()
-            model = row[0] if row else None
+            model = self.get_product_model(cursor, serial)
         finally:
             cursor.close()
             connection.close()
@@ -509,76 +519,45 @@ class RouteHandler:
             file_path = self._find_file_path(checked_file_path, network_checked_path, 
                                             process_file_path, network_process_path)
             if not file_path:
-                return jsonify({'error': 'Checked image not found'}), 404
+                return None, (jsonify({'error': 'Checked image not found'}), 404)
         else:
             # Process 이미지 사용
             file_path = self._find_file_path(process_file_path, network_process_path)
-        def safe_sleep(seconds):
-            """import 충돌 방지 sleep 헬퍼"""
-            import time
-            time.sleep(seconds)
-        # file_path가 여전히 None인 경우 Master PDF 처리
+        # file_path가 여전히 None인 경우 Master PDF에서 Process 이미지 생성
+        # 요청 스레드에서 기다리지 않고 작업을 등록한 뒤 202(작업 ID)로 응답 → /render_job/<job_id>로 확인 후 다시 요청
         if file_path is None:
-            # index가 0이고 Process 파일이 없는 경우 Master PDF 확인
-            if dept in ['3186', '3188']:
-                master_pdf_path = os.path.join(self.app.config['UPLOAD_FOLDER'], dept, 'Master', f'{serial}_0.pdf')
-                network_master_path = os.path.join(self.app.config['NETWORK_PATH'], dept, 'Master', f'{serial}_0.pdf')
-            else:
-                master_pdf_path = os.path.join(self.app.config['UPLOAD_FOLDER'], dept, 'Master', f'{serial}.pdf')
-                network_master_path = os.path.join(self.app.config['NETWORK_PATH'], dept, 'Master', f'{serial}.pdf')
-            for attempt in range(5):
-                if os.path.exists(master_pdf_path):
-                    master_path = master_pdf_path
-                    base_folder_ori = self.app.config['UPLOAD_FOLDER']
-                    break
-                elif os.path.exists(network_master_path):
-                    master_path = network_master_path
-                    base_folder_ori = self.app.config['NETWORK_PATH']
-                    break
-                if attempt < 16:
-                    safe_sleep(2)
-                else:
-                    return jsonify({'error': 'Requested master PDF does not exist.'}), 404
-
-            # Master PDF를 이미지로 변환
-            images = convert_from_path(master_path, dpi=150)
-            if dept in ['3186', '3188']:
-                master_jpg_path = os.path.join(self.app.config['UPLOAD_FOLDER'], dept, 'Master', f'{serial}_0.png')
-                images[0].save(master_jpg_path, 'PNG')
-            else:
-                master_jpg_path = os.path.join(self.app.config['UPLOAD_FOLDER'], dept, 'Master', f'{serial}.png')
-                images[0].save(master_jpg_path, 'PNG')
-            self.image_processor.convert_pdf_to_process_images(dept, process, serial, base_folder=self.app.config['UPLOAD_FOLDER'], model=model, base_folder_ori=base_folder_ori)
-            
-            if os.path.exists(process_file_path):
+            job = self.master_watcher.request_render(dept, serial)
+            if job['status'] == 'done':
+                if not os.path.exists(process_file_path):
+                    return None, (jsonify({'error': 'Failed to create process image from master PDF.'}), 500)
                 file_path = process_file_path
+            elif job['status'] == 'failed':
+                return None, self._render_job_error(job)
             else:
-                return jsonify({'error': 'Failed to create process image from master PDF.'}), 500
+                return None, self._render_job_pending(job)
 
         if file_path is None or not os.path.exists(file_path):
             logging.error(f'Image not found: {file_path}')
-            return jsonify({'error': 'Requested image does not exist.'}), 404
+            return None, (jsonify({'error': 'Requested image does not exist.'}), 404)
 
-        pil_image = Image.open(file_path)
-        if pil_image.mode != 'RGB':
-            pil_image = pil_image.convert('RGB')
+        # gray 저장 형식의 Process 이미지는 그레이스케일 그대로 읽음 (색 오버레이가 있으면 BGR로 합성)
+        page = PageImage.read(file_path)
+        if page is None:
+            logging.error(f'Image could not be read: {file_path}')
+            return None, (jsonify({'error': 'Requested image could not be read.'}), 500)
 
         if is_checked_image:
             # DB에서 체크박스 위치 불러오기
             connection = self.db_manager_2.connect()
             cursor = connection.cursor()
             try:
-                cursor.execute("""
-                    SELECT CHECKBOX_INDEX, X_POSITION, Y_POSITION, WIDTH, HEIGHT
-                    FROM CHECKBOX_STATES
-                    WHERE INDEX_NO = :1 AND INDEX_NO_SFIX = :2 AND SERIAL_NO = :3 AND DEPT_CODE = :4 AND PROCESS_CODE = :5
-                    ORDER BY TO_NUMBER(CHECKBOX_INDEX)
-                """, (indexNo[:8], indexNo[8:], serial, dept, process))
+                self.statements.execute(cursor, 'checkbox_positions', (indexNo[:8], indexNo[8:], serial, dept, process))
                 checkbox_positions = cursor.fetchall()
             finally:
                 cursor.close()
                 connection.close()
 
+            pil_image = PageImage.to_pil(page)
             draw = ImageDraw.Draw(pil_image)
             merged_boxes = []
             for box in checkbox_positions:
@@ -594,49 +573,140 @@ class RouteHandler:
                     'height': height
                 })
         else:
-            # Process 내의 파일에서 사각형 인식
-            numpy_image = np.array(pil_image)
-            numpy_image = numpy_image[:, :, [2, 1, 0]]
-            # process 코드를 전달하여 체크박스 찾기
-            result_pil_image, boxes = self.image_processor.find_checkboxes(numpy_image, process, model=model, dept=dept)
-            # 비슷한 위치의 박스를 통합하는 함수
-            def merge_similar_boxes(boxes, threshold=20):
-                merged_boxes = []
-                for box in boxes:
-                    if not merged_boxes:
-                        merged_boxes.append(box)
-                    else:
-                        merged = False
-                        for i, merged_box in enumerate(merged_boxes):
-                            if (abs(box['x'] - merged_box['x']) < threshold and
-                                abs(box['y'] - merged_box['y']) < threshold):
-                                # 비슷한 위치의 박스를 발견하면 평균값으로 통합
-                                merged_boxes[i] = {
-                                    'x': (box['x'] + merged_box['x']) // 2,
-                                    'y': (box['y'] + merged_box['y']) // 2,
-                                    'width': max(box['width'], merged_box['width']),
-                                    'height': max(box['height'], merged_box['height'])
-                                }
-                                merged = True
-                                break
-                        if not merged:
-                            merged_boxes.append(box)
-                return merged_boxes
-            # 박스 통합 적용
-            merged_boxes = merge_similar_boxes(boxes)
+            # 같은 파일/공정/모델/부서의 인식 결과가 있으면 OpenCV를 건너뜀
+            detection_key = self._checkbox_detection_key(file_path, process, model, dept)
+            detection = self.checkbox_cache.get(detection_key)
+            if detection is not None:
+                pil_image = PageImage.to_pil(page)
+                draw = ImageDraw.Draw(pil_image)
+                for box in detection['boxes']:
+                    draw.rectangle([box['x'], box['y'], box['x'] + box['width'], box['y'] + box['height']], outline='red')
+                merged_boxes = detection['merged']
+            else:
+                # Process 내의 파일에서 사각형 인식 (읽은 BGR/그레이스케일 배열을 그대로 전달)
+                # process 코드를 전달하여 체크박스 찾기
+                result_pil_image, boxes = self.image_processor.find_checkboxes(page, process, model=model, dept=dept)
+                # 비슷한 위치의 박스 통합
+                merged_boxes = self.image_processor.merge_similar_boxes(boxes)
+                self.checkbox_cache.set(detection_key, {'boxes': boxes, 'merged': merged_boxes})
             
-            pil_image = result_pil_image
-        # 이미지 저장   
-        img_io = io.BytesIO()
-        pil_image.save(img_io, 'PNG', quality=70)
-        img_io.seek(0)
-        encoded_img_data = base64.b64encode(img_io.getvalue()).decode('utf-8')
-
-        return jsonify({
-            'image_url': 'data:image/png;base64,' + encoded_img_data,
+                pil_image = result_pil_image
+        # 인코딩은 요청 형식(Accept)에 맞춰 page_image에서 수행
+        image = ImageEncoder.from_pil(pil_image)
+
+        return {
+            'image': image,
+            'version': hashlib.sha1(image.tobytes()).hexdigest(),
+            'encoded': {},
             'checkboxes': merged_boxes,
             'is_checked_image': is_checked_image
+        }, None
+
+    def _render_job_pending(self, job):
+        """Process 이미지 생성 중 응답 (202 + 작업 확인 URL)"""
+        response = jsonify({
+            'status': job['status'],
+            'job_id': job['job_id'],
+            'poll_url': url_for('render_job', job_id=job['job_id']),
+            'retry_after': self.app.config.get('RENDER_JOB_POLL_SECONDS', 1)
         })
+        response.status_code = 202
+        response.headers['Retry-After'] = str(self.app.config.get('RENDER_JOB_POLL_SECONDS', 1))
+        return response
+
+    @staticmethod
+    def _render_job_error(job):
+        if job['error'] == 'Requested master PDF does not exist.':
+            return jsonify({'error': job['error']}), 404
+        return jsonify({'error': 'Failed to create process image from master PDF.', 'detail': job['error']}), 500
+
+    @login_required
+    def render_job(self, job_id):
+        """
+        Process 이미지 생성 작업 상태 조회
+        - waiting/rendering: 202, done: 200 (upload_image를 다시 요청), failed: 404/500
+        """
+        job = self.master_watcher.job_status(job_id)
+        if job is None:
+            return jsonify({'error': 'Unknown render job.'}), 404
+        if job['status'] == 'done':
+            return jsonify({'status': 'done', 'job_id': job_id})
+        if job['status'] == 'failed':
+            return self._render_job_error(job)
+        return self._render_job_pending(job)
+
+    @login_required
+    def merge_status(self, job_id):
+        """ Merged 이미지 생성 작업 상태 조회 (queued/running/done/failed) """
+        job = self.merge_worker.get_job(job_id)
+        if job is None:
+            return jsonify({'error': 'Unknown merge job.'}), 404
+        return jsonify(job)
+
+    @staticmethod
+    def _checkbox_detection_key(file_path, process, model, dept):
+        """
+        체크박스 인식 결과 캐시 키
+        - 파일 이름/수정 시각/크기로 이미지를 식별 (스케줄러가 네트워크 경로로 옮겨도 그대로 적중)
+        - 인식 로직이 바뀌면 ImageProcessor.CHECKBOX_DETECTION_VERSION을 올려 기존 결과를 무시
+        """
+        stat = os.stat(file_path)
+        return (f"{os.path.basename(file_path)}|{stat.st_mtime_ns}|{stat.st_size}|"
+                f"{process}|{model}|{dept}|v{ImageProcessor.CHECKBOX_DETECTION_VERSION}")
+
+    @login_required
+    def upload_image(self, serial_process):
+        """
+        공정 페이지 메타데이터(JSON) 조회
+        - 이미지는 base64로 싣지 않고 image_url(/page_image)로 따로 받음
+        - 만든 PNG는 page_image_cache에 보관해 이미지 요청 시 다시 만들지 않음
+        """
+        rendered, error = self._render_page_image(serial_process)
+        if error:
+            return error
+        self.page_image_cache.set(serial_process, rendered)
+
+        return jsonify({
+            'image_url': url_for('page_image', serial_process=serial_process, v=rendered['version']),
+            'image_etag': rendered['version'],
+            'checkboxes': rendered['checkboxes'],
+            'is_checked_image': rendered['is_checked_image']
+        })
+
+    @login_required
+    def page_image(self, serial_process):
+        """
+        공정 페이지 이미지 바이너리 응답 (PNG/무손실 WebP/미리보기용 JPEG)
+        - ETag/If-None-Match로 바뀌지 않은 이미지는 304 응답
+        - 메타데이터의 image_url(?v=ETag)로 요청하면 브라우저가 캐시에서 바로 사용
+        """
+        rendered = self.page_image_cache.get(serial_process)
+        if rendered is None:
+            rendered, error = self._render_page_image(serial_process)
+            if error:
+                return error
+            self.page_image_cache.set(serial_process, rendered)
+
+        # 형식은 Accept로 결정 (?preview=1이면 JPEG 허용), 형식별 ETag 사용
+        fmt = self.image_encoder.negotiate(request.headers.get('Accept'), preview=request.args.get('preview') == '1')
+        etag = f"{rendered['version']}-{fmt}"
+        versioned = request.args.get('v') == rendered['version']
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            encoded = rendered['encoded'].get(fmt)
+            if encoded is None:
+                encoded = self.image_encoder.encode(rendered['image'], fmt)
+                rendered['encoded'][fmt] = encoded
+            data, mimetype = encoded
+            response = Response(data, mimetype=mimetype)
+        response.set_etag(etag)
+        response.vary.add('Accept')
+        # 같은 공정도 체크 저장 후 이미지가 바뀌므로, 버전 없는 URL은 매번 ETag로 재검증
+        response.headers['Cache-Control'] = (
+            f"private, max-age={self.app.config.get('PAGE_IMAGE_MAX_AGE', 3600)}" if versioned else 'private, no-cache'
+        )
+        return response
 
     @login_required
     def insert_dcs_history(self):
@@ -660,20 +730,12 @@ class RouteHandler:
             connection = self.db_manager_2.connect()
             cursor = connection.cursor()
             try:
-                sql = """
-                    MERGE INTO DCS_HISTORY USING dual
-                    ON (INDEX_NO = :1 AND INDEX_NO_SFIX = :2 AND SERIAL_NO = :3 AND DEPT_CODE = :4 AND PROCESS_CODE = :5)
-                    WHEN MATCHED THEN
-                        UPDATE SET EMP_NO = :6, RENEWAL_D = :7, RENEWAL_BY = :8
-                    WHEN NOT MATCHED THEN
-                        INSERT (INDEX_NO, INDEX_NO_SFIX, SERIAL_NO, DEPT_CODE, PROCESS_CODE, EMP_NO, ENTRY_D, ENTRY_BY, DATA_ST)
-                        VALUES (:1, :2, :3, :4, :5, :6, :7, :8, 'A')
-                """
-                
                 params = (indexNo, indexNo_sfix, serial_no, deptCode, process_code, empNo, date_str, pc_name)
                 
-                cursor.execute(sql, params)
+                self.statements.execute(cursor, 'dcs_merge_entry', params)
+                self.refresh_history_summary(cursor, serial_no)
                 connection.commit()
+                self.completion_cache.invalidate((indexNo, deptCode, serial_no))
                 return jsonify({'message': 'DCS_HISTORY 저장(병합) 완료'}), 200
             
             except Exception as e:
@@ -704,45 +766,71 @@ class RouteHandler:
             index_no = index_no_str.zfill(10)[:-2]
             index_no_sfix = index_no_str[-2:]
 
-            connection = self.db_manager_2.connect()
-            cursor = connection.cursor()
-            try:
-                # SQL 파일 읽기
-                with open('.\\sql\\join_prod_info_by_index.sql', 'r', encoding='utf-8') as file:
-                    sql = file.read().format(index_no=index_no, index_no_sfix=index_no_sfix)
-                cursor.execute(sql)
-                product_info = cursor.fetchone()
+            # 같은 지시서를 여러 공정에서 스캔하므로 인덱스별 제품 정보를 캐시
+            cache_key = (index_no, index_no_sfix)
+            product_info = self.product_info_cache.get(cache_key)
+            if product_info is None:
+                connection = self.db_manager_2.connect()
+                cursor = connection.cursor()
+                try:
+                    self.statements.execute(cursor, 'product_info_by_index',
+                                            {'index_no': index_no, 'index_no_sfix': index_no_sfix})
+                    product_info = cursor.fetchone()
+                finally:
+                    cursor.close()
+                    connection.close()
                 if product_info:
-                    # 디버깅 로그 추가
-                    logging.info(f"Product info fetched - Total columns: {len(product_info)}")
-                    logging.info(f"DeptCode received: '{dept_code}'")
-                    if len(product_info) > 15:
-                        logging.info(f"SEQ field (index 15): {product_info[15]}")
-                    logging.info(f"START_NO field (index 9): {product_info[9]}")
-                    
-                    # dept_code가 3186일 때 SEQ를 construction_No로 사용
-                    if dept_code == '3186' or 'JUXTA' in dept_code:
-                        construction_no = product_info[15] if len(product_info) > 15 else product_info[9]
-                        logging.info(f"Using SEQ for JUXTA: {construction_no}")
-                    else:
-                        construction_no = product_info[9]  # 기존 START_NO 필드
-                        logging.info(f"Using START_NO for non-JUXTA: {construction_no}")
-                    
-                    return jsonify({
-                        'MS_CODE': product_info[10],
-                        'Serial_No': product_info[6], 
-                        'Index_No': index_no + index_no_sfix,
-                        'construction_No': construction_no,
-                        'MODEL': product_info[12]  # MODEL 정보 추가
-                    })
+                    self.product_info_cache.set(cache_key, product_info)
+
+            if product_info:
+                # 디버깅 로그 추가
+                logging.info(f"Product info fetched - Total columns: {len(product_info)}")
+                logging.info(f"DeptCode received: '{dept_code}'")
+                if len(product_info) > 15:
+                    logging.info(f"SEQ field (index 15): {product_info[15]}")
+                logging.info(f"START_NO field (index 9): {product_info[9]}")
+                
+                # dept_code가 3186일 때 SEQ를 construction_No로 사용
+                if dept_code == '3186' or 'JUXTA' in dept_code:
+                    construction_no = product_info[15] if len(product_info) > 15 else product_info[9]
+                    logging.info(f"Using SEQ for JUXTA: {construction_no}")
                 else:
-                    return jsonify({'error': 'DB에 없는 제품 정보입니다.'}), 404
-            finally:
-                cursor.close()
-                connection.close()
+                    construction_no = product_info[9]  # 기존 START_NO 필드
+                    logging.info(f"Using START_NO for non-JUXTA: {construction_no}")
+                
+                return jsonify({
+                    'MS_CODE': product_info[10],
+                    'Serial_No': product_info[6], 
+                    'Index_No': index_no + index_no_sfix,
+                    'construction_No': construction_no,
+                    'MODEL': product_info[12]  # MODEL 정보 추가
+                })
+            else:
+                return jsonify({'error': 'DB에 없는 제품 정보입니다.'}), 404
 
-    @login_required
-    def search_history(self):
+    def refresh_history_summary(self, cursor, *serial_nos):
+        """
+        DCS_HISTORY를 변경한 트랜잭션 안에서 해당 시리얼의 요약 행을 다시 집계합니다.
+        요약 갱신 실패는 기록만 하고 본 작업은 계속 진행합니다. (다음 저장이나 백필에서 복구)
+        """
+        if not self.app.config.get('HISTORY_SUMMARY_ENABLED', False):
+            return
+        for serial_no in dict.fromkeys(serial_nos):
+            try:
+                self.statements.execute(cursor, 'dcs_summary_refresh', {'serial_no': serial_no})
+            except Exception as e:
+                logging.error(f"이력 요약 갱신 실패 ({serial_no}): {str(e)}")
+
+    def _build_history_query(self, after_serial=None, fetch_rows=None):
+        """
+        이력 검색 폼으로 피벗 SQL과 바인드 값을 만듭니다.
+
+        :param after_serial: 키셋 페이지네이션 - 이 시리얼 번호 이후부터 조회
+        :param fetch_rows: 최대 조회 행 수 (None이면 전체)
+        :return: (statement_name, sql, params, process_codes)
+        """
+        # 요약 테이블을 쓰면 라인 코드 일치 조건(인덱스 범위 검색)으로 조회
+        use_summary = self.app.config.get('HISTORY_SUMMARY_ENABLED', False)
         start_date = request.form.get('startDate')
         end_date = request.form.get('endDate')
         serial_number = request.form.get('serialNumber', '').strip()
@@ -751,97 +839,197 @@ class RouteHandler:
 
         logging.info(f"검색 파라미터: serial={serial_number}, dept={deptCode}, process_codes={process_codes_str}")
 
-        # 두 데이터베이스 연결
-        connection1 = self.db_manager_1.connect()
-        connection2 = self.db_manager_2.connect()
-        cursor1 = connection1.cursor()
-        cursor2 = connection2.cursor()
-        
-        try:
-            case_statements = []
-            process_codes = {code.split(':')[0]: code.split(':')[1] for code in process_codes_str.split(',') if code}
-            
-            # 먼저 DCS_HISTORY에서 작업자 번호 목록을 가져옴
-            emp_no_sql = f"""
-            SELECT DISTINCT h.EMP_NO
-            FROM DCS_HISTORY h
-            WHERE h.DEPT_CODE LIKE :dept_code
-            AND h.EMP_NO IS NOT NULL
-            """
-            cursor2.execute(emp_no_sql, {'dept_code': f"%{deptCode}%"})
-            emp_nos = [row[0] for row in cursor2.fetchall()]
-
-            # EMPM에서 작업자 정보를 가져와 딕셔너리로 저장
-            emp_info = {}
-            if emp_nos:
-                emp_list = ",".join(f"'{no}'" for no in emp_nos)
-                emp_sql = f"SELECT EMP_NO, EMP_NAMEK FROM EMPM WHERE EMP_NO IN ({emp_list})"
-                cursor1.execute(emp_sql)
-                emp_info = {row[0]: row[1] for row in cursor1.fetchall()}
-
-            for code, name in process_codes.items():
-                case_statements.append(f"MAX(CASE WHEN PROCESS_CODE = '{code}' THEN '{name}' END) AS \"{name}\"")
-                case_statements.append(f"MAX(CASE WHEN PROCESS_CODE = '{code}' THEN COALESCE(TO_CHAR(RENEWAL_D, 'Dy, dd Mon yyyy hh24:mi:ss'), TO_CHAR(ENTRY_D, 'Dy, dd Mon yyyy hh24:mi:ss')) END) AS \"{name} 시간\"")
-                case_statements.append(f"MAX(CASE WHEN PROCESS_CODE = '{code}' THEN STATUS END) AS \"{name} 상태\"")
-                case_statements.append(f"MAX(CASE WHEN PROCESS_CODE = '{code}' THEN h.EMP_NO END) AS \"{name} 작업자 번호\"")
-
-            # 서브쿼리로 날짜 조건에 맞는 시리얼 번호를 먼저 찾습니다
+        case_statements = []
+        process_codes = {code.split(':')[0]: code.split(':')[1] for code in process_codes_str.split(',') if code}
+
+        if use_summary:
+            time_expr = "TO_CHAR(EVENT_D, 'Dy, dd Mon yyyy hh24:mi:ss')"
+        else:
+            time_expr = "COALESCE(TO_CHAR(RENEWAL_D, 'Dy, dd Mon yyyy hh24:mi:ss'), TO_CHAR(ENTRY_D, 'Dy, dd Mon yyyy hh24:mi:ss'))"
+
+        for code, name in process_codes.items():
+            case_statements.append(f"MAX(CASE WHEN PROCESS_CODE = '{code}' THEN '{name}' END) AS \"{name}\"")
+            case_statements.append(f"MAX(CASE WHEN PROCESS_CODE = '{code}' THEN {time_expr} END) AS \"{name} 시간\"")
+            case_statements.append(f"MAX(CASE WHEN PROCESS_CODE = '{code}' THEN STATUS END) AS \"{name} 상태\"")
+            case_statements.append(f"MAX(CASE WHEN PROCESS_CODE = '{code}' THEN h.EMP_NO END) AS \"{name} 작업자 번호\"")
+
+        # 서브쿼리로 날짜 조건에 맞는 시리얼 번호를 먼저 찾습니다
+        entry_conditions = []
+        if start_date:
+            entry_conditions.append("ENTRY_D >= TO_DATE(:start_date, 'YYYY-MM-DD')")
+        if end_date:
+            entry_conditions.append("ENTRY_D <= TO_DATE(:end_date, 'YYYY-MM-DD') + 1")
+
+        if use_summary and entry_conditions:
+            # 요약 테이블의 최초/최근 등록일 범위로 후보를 좁힌 뒤, 기간 안에 실제 DCS_HISTORY 등록이 있는지 확인
+            # (범위만 겹치고 기간 안 등록이 없는 시리얼은 기존 검색과 같이 제외)
             date_conditions = []
             if start_date:
-                date_conditions.append("ENTRY_D >= TO_DATE(:start_date, 'YYYY-MM-DD')")
+                date_conditions.append("LAST_ENTRY_D >= TO_DATE(:start_date, 'YYYY-MM-DD')")
             if end_date:
-                date_conditions.append("ENTRY_D <= TO_DATE(:end_date, 'YYYY-MM-DD') + 1")
-
-            date_where_clause = " AND ".join(date_conditions) if date_conditions else "1=1"
-            
-            sql = f"""
-            WITH FILTERED_SERIALS AS (
-                SELECT DISTINCT SERIAL_NO
-                FROM DCS_HISTORY
-                WHERE DEPT_CODE LIKE :dept_code
-                AND {date_where_clause}
-                {f"AND SERIAL_NO LIKE :serial_number" if serial_number else ""}
+                date_conditions.append("FIRST_ENTRY_D <= TO_DATE(:end_date, 'YYYY-MM-DD') + 1")
+            date_conditions.append(
+                "EXISTS (SELECT 1 FROM DCS_HISTORY d WHERE d.SERIAL_NO = DCS_PROCESS_SUMMARY.SERIAL_NO "
+                "AND d.DEPT_CODE = DCS_PROCESS_SUMMARY.DEPT_CODE AND "
+                + " AND ".join(f"d.{condition}" for condition in entry_conditions) + ")"
             )
-            SELECT h.SERIAL_NO, {', '.join(case_statements)}
-            FROM DCS_HISTORY h
-            INNER JOIN FILTERED_SERIALS fs ON h.SERIAL_NO = fs.SERIAL_NO
-            WHERE h.DEPT_CODE LIKE :dept_code
-            GROUP BY h.SERIAL_NO
-            """
-
-            params = {'dept_code': f"%{deptCode}%"}
-            if start_date:
-                params['start_date'] = start_date
-            if end_date:
-                params['end_date'] = end_date
-            if serial_number:
-                params['serial_number'] = f"%{serial_number}%"
+        else:
+            date_conditions = entry_conditions
+
+        date_where_clause = " AND ".join(date_conditions) if date_conditions else "1=1"
+
+        serial_clause = "AND SERIAL_NO LIKE :serial_number" if serial_number else ""
+        if after_serial:
+            serial_clause += " AND SERIAL_NO > :after_serial"
+
+        statement_name = 'dcs_summary_pivot' if use_summary else 'dcs_history_pivot'
+        sql = self.statements.sql(statement_name).format(
+            date_where_clause=date_where_clause,
+            serial_clause=serial_clause,
+            case_statements=', '.join(case_statements),
+            fetch_clause="FETCH FIRST :fetch_rows ROWS ONLY" if fetch_rows else ""
+        )
+
+        params = {'dept_code': deptCode if use_summary else f"%{deptCode}%"}
+        if start_date:
+            params['start_date'] = start_date
+        if end_date:
+            params['end_date'] = end_date
+        if serial_number:
+            params['serial_number'] = f"%{serial_number}%"
+        if after_serial:
+            params['after_serial'] = after_serial
+        if fetch_rows:
+            params['fetch_rows'] = fetch_rows
+        return statement_name, sql, params, process_codes
+
+    def _format_history_row(self, columns, row, process_codes):
+        """피벗 결과 한 행을 화면용 딕셔너리로 변환합니다."""
+        result_dict = dict(zip(columns, row))
+        for process in process_codes.values():
+            if result_dict[f"{process} 시간"] is None:
+                result_dict[f"{process} 상태"] = 0
+                result_dict[f"{process} 시간"] = "-"
+                result_dict[f"{process} 작업자 번호"] = "-"
+                result_dict[f"{process} 작업자 이름"] = "-"
+            else:
+                emp_no = result_dict[f"{process} 작업자 번호"]
+                result_dict[f"{process} 작업자 이름"] = self.employee_directory.get_name(emp_no)
+        return result_dict
 
-            cursor2.execute(sql, params)
-            results = cursor2.fetchall()
-            formatted_results = []
-            
-            for result in results:
-                result_dict = dict(zip([key[0] for key in cursor2.description], result))
-                for process in process_codes.values():
-                    if result_dict[f"{process} 시간"] is None:
-                        result_dict[f"{process} 상태"] = 0
-                        result_dict[f"{process} 시간"] = "-"
-                        result_dict[f"{process} 작업자 번호"] = "-"
-                        result_dict[f"{process} 작업자 이름"] = "-"
-                    else:
-                        emp_no = result_dict[f"{process} 작업자 번호"]
-                        result_dict[f"{process} 작업자 이름"] = emp_info.get(emp_no, "-") if emp_no else "-"
-                formatted_results.append(result_dict)
-            return jsonify(formatted_results)
+    @staticmethod
+    def _encode_history_cursor(serial_no):
+        return base64.urlsafe_b64encode(serial_no.encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def _decode_history_cursor(token):
+        return base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8')
+
+    def _prepare_history_cursor(self, cursor):
+        # 한 번의 왕복으로 가져올 행 수 (스트리밍 시 메모리 사용량과 왕복 횟수의 균형)
+        cursor.arraysize = self.app.config.get('HISTORY_FETCH_ARRAYSIZE', 500)
+        cursor.prefetchrows = cursor.arraysize + 1
+
+    @login_required
+    def search_history(self):
+        """
+        공정 이력 검색
+        - 기본: 전체 결과를 JSON 배열로 반환 (기존 방식)
+        - pageSize 지정: {'rows': [...], 'nextCursor': 토큰 또는 None} 형태로 한 페이지씩 반환,
+          다음 페이지는 cursor에 nextCursor 값을 넣어 요청 (SERIAL_NO 기준 키셋 페이지네이션)
+        - mode=ndjson: 한 줄에 한 행씩 스트리밍 (application/x-ndjson)
+          pageSize/cursor도 함께 적용되며, pageSize를 지정하면 마지막 줄에 {'nextCursor': 토큰 또는 None}을 보냄
+        """
+        page_size = request.form.get('pageSize', type=int)
+        cursor_token = request.form.get('cursor')
+        mode = request.form.get('mode', 'json')
+
+        after_serial = None
+        if cursor_token:
+            try:
+                after_serial = self._decode_history_cursor(cursor_token)
+            except (ValueError, UnicodeDecodeError):
+                return jsonify({'error': '유효하지 않은 cursor 값입니다.'}), 400
+
+        fetch_rows = None
+        if page_size:
+            page_size = max(1, min(page_size, self.app.config.get('HISTORY_PAGE_SIZE_MAX', 1000)))
+            fetch_rows = page_size + 1  # 다음 페이지 존재 여부 확인용으로 한 행 더 조회
+
+        statement_name, sql, params, process_codes = self._build_history_query(after_serial, fetch_rows)
+
+        if mode == 'ndjson':
+            return self._stream_history(statement_name, sql, params, process_codes, page_size)
+
+        connection2 = self.db_manager_2.connect()
+        cursor2 = connection2.cursor()
+        
+        try:
+            self._prepare_history_cursor(cursor2)
+            self.statements.execute(cursor2, statement_name, params, sql=sql)
+            columns = [key[0] for key in cursor2.description]
+            formatted_results = [self._format_history_row(columns, result, process_codes) for result in cursor2]
+
+            if not page_size:
+                return jsonify(formatted_results)
+
+            next_cursor = None
+            if len(formatted_results) > page_size:
+                formatted_results = formatted_results[:page_size]
+                next_cursor = self._encode_history_cursor(formatted_results[-1]['SERIAL_NO'])
+            return jsonify({'rows': formatted_results, 'nextCursor': next_cursor})
         except Exception as e:
             return jsonify({'error': str(e)}), 500
         finally:
-            cursor1.close()
             cursor2.close()
-            connection1.close()
             connection2.close()
 
+    def _stream_history(self, statement_name, sql, params, process_codes, page_size=None):
+        """
+        검색 결과를 NDJSON으로 스트리밍합니다. 세션은 응답이 끝날 때 풀로 반환됩니다.
+        page_size가 있으면 page_size개까지만 보내고 마지막 줄에 다음 페이지 cursor를 보냄
+        (쿼리는 다음 페이지 확인용으로 page_size + 1행을 조회)
+        """
+        def generate():
+            connection2 = self.db_manager_2.connect()
+            cursor2 = connection2.cursor()
+            try:
+                self._prepare_history_cursor(cursor2)
+                self.statements.execute(cursor2, statement_name, params, sql=sql)
+                columns = [key[0] for key in cursor2.description]
+                sent = 0
+                last_serial = None
+                has_more = False
+                while True:
+                    rows = cursor2.fetchmany()
+                    if not rows:
+                        break
+                    if page_size:
+                        if sent + len(rows) > page_size:
+                            has_more = True
+                            rows = rows[:page_size - sent]
+                        sent += len(rows)
+                    if rows:
+                        last_serial = rows[-1][0]  # 첫 열은 SERIAL_NO
+                        yield ''.join(
+                            json.dumps(self._format_history_row(columns, row, process_codes),
+                                       ensure_ascii=False, default=str) + '\n'
+                            for row in rows
+                        )
+                    if has_more:
+                        break
+                if page_size:
+                    next_cursor = self._encode_history_cursor(last_serial) if has_more and last_serial else None
+                    yield json.dumps({'nextCursor': next_cursor}) + '\n'
+            except Exception as e:
+                logging.error(f"이력 스트리밍 중 오류: {str(e)}")
+                yield json.dumps({'error': str(e)}, ensure_ascii=False) + '\n'
+            finally:
+                cursor2.close()
+                connection2.close()
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
     @login_required
     def checksheet_history(self):
         if 'employee_name' not in session or 'dept_info' not in session:
@@ -868,7 +1056,8 @@ class RouteHandler:
             if os.path.exists(network_path):
                 files.update(os.listdir(network_path))
                 
-            return jsonify(list(files))
+            # 페이지의 색 오버레이(PageImage)는 페이지 파일이 아니므로 목록에서 제외
+            return jsonify([name for name in files if not PageImage.is_overlay(name)])
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -925,24 +1114,23 @@ class RouteHandler:
         # print(checkbox_states)
         # print(checkbox_positions)
         try:
-            for index, state in checkbox_states.items():
+            # 체크박스 수와 관계없이 한 번의 왕복으로 저장하도록 배열 바인딩 사용
+            checkbox_indexes = list(checkbox_states.keys())
+            rows = []
+            for index in checkbox_indexes:
                 position = checkbox_positions[index]
-                cursor.execute("""
-                    MERGE INTO CHECKBOX_STATES cs
-                    USING (SELECT :1 AS INDEX_NO, :2 AS INDEX_NO_SFIX, :3 AS SERIAL_NO, 
-                                :4 AS DEPT_CODE, :5 AS PROCESS_CODE, :6 AS CHECKBOX_INDEX FROM DUAL) src
-                    ON (cs.INDEX_NO = src.INDEX_NO AND cs.INDEX_NO_SFIX = src.INDEX_NO_SFIX 
-                        AND cs.SERIAL_NO = src.SERIAL_NO AND cs.DEPT_CODE = src.DEPT_CODE 
-                        AND cs.PROCESS_CODE = src.PROCESS_CODE AND cs.CHECKBOX_INDEX = src.CHECKBOX_INDEX)
-                    WHEN MATCHED THEN
-                        UPDATE SET cs.STATE = :7, cs.X_POSITION = :8, cs.Y_POSITION = :9, 
-                                cs.WIDTH = :10, cs.HEIGHT = :11, cs.RENEWAL_D = CURRENT_TIMESTAMP, cs.RENEWAL_BY = :12
-                    WHEN NOT MATCHED THEN
-                        INSERT (INDEX_NO, INDEX_NO_SFIX, SERIAL_NO, DEPT_CODE, PROCESS_CODE, CHECKBOX_INDEX, 
-                                STATE, X_POSITION, Y_POSITION, WIDTH, HEIGHT, ENTRY_BY, RENEWAL_BY, DATA_ST)
-                        VALUES (:1, :2, :3, :4, :5, :6, :7, :8, :9, :10, :11, :12, :12, 'A')
-                """, (index_no, index_no_sfix, serial_no, dept_code, process_code, index, 
-                    state, position['x'], position['y'], position['width'], position['height'], pc_name))
+                rows.append((index_no, index_no_sfix, serial_no, dept_code, process_code, index,
+                    checkbox_states[index], position['x'], position['y'], position['width'], position['height'], pc_name))
+            if rows:
+                self.statements.executemany(cursor, 'checkbox_merge_state', rows, batcherrors=True)
+                batch_errors = cursor.getbatcherrors()
+                if batch_errors:
+                    # 실패한 체크박스가 하나라도 있으면 전체 롤백
+                    connection.rollback()
+                    failed = [{'checkboxIndex': checkbox_indexes[error.offset], 'error': error.message}
+                              for error in batch_errors]
+                    logging.error(f"체크박스 상태 저장 실패 ({serial_no}/{process_code}): {failed}")
+                    return jsonify({'error': 'Failed to save some checkbox states', 'failed': failed}), 500
             # 데이터베이스에 정보 삽입
             connection.commit()
             return jsonify({'message': 'Checkbox states and positions saved successfully'})
@@ -963,16 +1151,9 @@ class RouteHandler:
 
         connection = self.db_manager_2.connect()
         cursor = connection.cursor()
-        # SQL 쿼리 생성 - Y_POSITION으로 먼저 렬하고, 같은 Y값을 가진 항목들은 X_POSITION으로 정렬
-        sql = """
-            SELECT CHECKBOX_INDEX, STATE 
-            FROM CHECKBOX_STATES
-            WHERE INDEX_NO = :1 AND INDEX_NO_SFIX = :2 AND SERIAL_NO = :3 AND DEPT_CODE = :4 AND PROCESS_CODE = :5 AND DATA_ST = 'A'
-            ORDER BY TO_NUMBER(CHECKBOX_INDEX)
-        """
 
         try:
-            cursor.execute(sql, (index_no, index_no_sfix, serial_no, dept_code, process_code))
+            self.statements.execute(cursor, 'checkbox_states_by_process', (index_no, index_no_sfix, serial_no, dept_code, process_code))
             results = cursor.fetchall()
             checkbox_states = {str(row[0]): row[1] for row in results}
             return jsonify(checkbox_states)
@@ -1023,16 +1204,7 @@ class RouteHandler:
             cursor = connection.cursor()
             
             # 이전 공정의 완료 상태 확인
-            sql = """
-                SELECT STATUS 
-                FROM DCS_HISTORY
-                WHERE SERIAL_NO = :1 
-                  AND DEPT_CODE = :2 
-                  AND PROCESS_CODE = :3
-                  AND DATA_ST = 'A'
-            """
-            
-            cursor.execute(sql, (serial_no, dept_code, previous_process))
+            self.statements.execute(cursor, 'dcs_status_by_process', (serial_no, dept_code, previous_process))
             result = cursor.fetchone()
             
             # 이전 공정이 완료되지 않았거나 데이터가 없는 경우
@@ -1044,6 +1216,34 @@ class RouteHandler:
             cursor.close()
             connection.close()
 
+    @login_required
+    def db_pool_status(self):
+        """ ORA7/NEURON 세션 풀 상태 및 통계 조회 """
+        return jsonify({
+            'ORA7': dict(self.db_manager_1.get_pool_stats(), healthy=self.db_manager_1.ping()),
+            'NEURON': dict(self.db_manager_2.get_pool_stats(), healthy=self.db_manager_2.ping())
+        })
+
+    @login_required
+    def statement_stats(self):
+        """ 등록된 SQL별 prepare/실행 통계 조회 """
+        return jsonify(self.statements.get_stats())
+
+    @login_required
+    def cache_stats(self):
+        """ 메모리/디스크 캐시 적중 통계 조회 """
+        return jsonify([
+            self.completion_cache.get_stats(),
+            self.product_cache.get_stats(),
+            self.product_info_cache.get_stats(),
+            self.page_image_cache.get_stats(),
+            self.checkbox_cache.get_stats(),
+            self.employee_directory.get_stats(),
+            self.master_watcher.get_stats(),
+            self.merge_worker.get_stats(),
+            self.png_optimizer.get_stats()
+        ])
+
     def refresh_session(self):
         if 'logged_in' in session and session['logged_in']:
             session.modified = True
@@ -1056,7 +1256,7 @@ class RouteHandler:
         actual_path = os.path.join(self.app.config['NETWORK_PATH'], directory)
         try:
             files = os.listdir(actual_path)
-            return jsonify(files)
+            return jsonify([name for name in files if not PageImage.is_overlay(name)])
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -1080,54 +1280,54 @@ class RouteHandler:
     def is_all_process_completed(self, indexNo, deptCode, serial_no):
         """
         모든 공정이 완료되었는지 확인하는 함수 (부품SET 제외)
+        필수 공정 상태를 한 번의 GROUP BY 조회로 가져오며, 완료 결과는 짧은 시간 캐시합니다.
         
         :param indexNo: 인덱스 번호
         :param deptCode: 부서 코드
         :param serial_no: 시리얼 번호
         :return: 모든 공정이 완료되었으면 True, 아니면 False
         """
-
+        # 각 필수 공정별 상태 확인
+        required_processes = self.REQUIRED_PROCESSES.get(deptCode)
+        if required_processes is None:
+            # 그 외 부서코드는 처리 대상 외
+            print(f"알 수 없는 부서 코드: {deptCode}, 공정 완료 체크 로직 없음.")
+            return True  # 혹은 False
+
+        cache_key = (indexNo, deptCode, serial_no)
+        if self.completion_cache.get(cache_key):
+            return True
+
+        connection = None
+        cursor = None
         try:
             connection = self.db_manager_2.connect()
             cursor = connection.cursor()
-            
-            # 각 필수 공정별 상태 확인
-            required_processes = []
-            if deptCode == '3165':
-                required_processes = ['06','11','15']
-            elif deptCode == '3186':
-                required_processes = ['07','10','11']
-            elif deptCode == '3188' :
-                required_processes = ['06', '09']
-            else:
-                # 그 외 부서코드는 처리 대상 외
-                print(f"알 수 없는 부서 코드: {deptCode}, 공정 완료 체크 로직 없음.")
-                return True  # 혹은 False
-            sql = """
-                SELECT PROCESS_CODE, STATUS 
-                FROM DCS_HISTORY
-                WHERE INDEX_NO = :1 
-                  AND SERIAL_NO = :2 
-                  AND DEPT_CODE = :3
-                  AND PROCESS_CODE = :4
-                  AND DATA_ST = 'A'
-            """
-            
-            # 각 필수 공정에 대해 상태 확인
+
+            # IN 목록 자리 수에 맞춰 SQL 문장이 하나로 유지되도록 함 (NULL은 일치하지 않음)
+            padded = list(required_processes) + \
+                [None] * (StatementRegistry.COMPLETION_PROCESS_SLOTS - len(required_processes))
+            self.statements.execute(cursor, 'dcs_status_for_completion', [indexNo, serial_no, deptCode] + padded)
+            # PROCESS_CODE -> (전체 건수, STATUS 1 건수)
+            counts = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+
             for process in required_processes:
-                cursor.execute(sql, (indexNo, serial_no, deptCode, process))
-                result = cursor.fetchone()
-                if not result or result[1] != 1:  # 공정이 없거나 STATUS가 1이 아닌 경우
+                total, ok = counts.get(process, (0, 0))
+                if total == 0 or total != ok:  # 공정이 없거나 STATUS가 1이 아닌 경우
                     return False
-                    
-            return True  # 모든 필수 공정이 STATUS 1로 확인된 경우
+
+            # 모든 필수 공정이 STATUS 1로 확인된 경우
+            self.completion_cache.set(cache_key, True)
+            return True
             
         except Exception as e:
             print(f"모든 공정 완료 확인 중 오류 발생: {e}")
             return False
         finally:
-            cursor.close()
-            connection.close()
+            if cursor is not None:
+                cursor.close()
+            if connection is not None:
+                connection.close()
 
     def get_settings(self):
         """설정 파일을 읽어서 반환하는 메서드"""
@@ -1153,14 +1353,7 @@ class RouteHandler:
             connection = self.db_manager_2.connect()
             cursor = connection.cursor()
             
-            sql = """
-                SELECT COUNT(*)
-                FROM DCS_HISTORY
-                WHERE SERIAL_NO = :1
-                  AND PROCESS_CODE = :2
-                  AND DATA_ST = 'A'
-            """
-            cursor.execute(sql, (serial_no, process_code))
+            self.statements.execute(cursor, 'dcs_count_by_serial_process', (serial_no, process_code))
             result = cursor.fetchone()
             
             return result[0] > 0
@@ -1195,95 +1388,33 @@ class RouteHandler:
             # 트랜잭션 시작
             connection.begin()
 
-            # DCS_HISTORY 테이블 업데이트: DATA_ST을 'D'로 변경
-            update_dcs_history_sql = """
-                UPDATE DCS_HISTORY
-                SET DATA_ST = 'D'
-                WHERE SERIAL_NO = :1 AND PROCESS_CODE = :2
-            """
-            cursor.execute(update_dcs_history_sql, (serialNo, processCode))
-
-            # CHECKBOX_STATES 테이블 업데이트: DATA_ST을 'D'로 변경
-            update_checkbox_states_sql = """
-                UPDATE CHECKBOX_STATES
-                SET DATA_ST = 'D'
-                WHERE SERIAL_NO = :1 AND PROCESS_CODE = :2
-            """
-            cursor.execute(update_checkbox_states_sql, (serialNo, processCode))
-
-            # 새로운 레코드 삽입 - processCode는 현재 선택된 공정 코드 사용
-            insert_dcs_history_sql = """
-                INSERT INTO DCS_HISTORY (
-                    INDEX_NO, INDEX_NO_SFIX, SERIAL_NO, DEPT_CODE, PROCESS_CODE, STATUS,
-                    EMP_NO, PREV_INDEX_NO, PREV_INDEX_NO_SFIX, ENTRY_D, ENTRY_BY
-                ) VALUES (
-                    :1, :2, :3, :4, :5, :6,
-                    :7, :8, :9, :10, :11
-                )
-            """
-            cursor.execute(insert_dcs_history_sql, (
-                indexNo, indexNo_sfix, dcsData['serialNo'], dcsData['deptCode'],  # SERIAL_NO, DEPT_CODE
-                processCode, dcsData['status'],  # processCode, STATUS
-                dcsData['empNo'], dcsData['indexNo'][:-2],  # EMP_NO, PREV_INDEX_NO
-                dcsData['indexNo'][-2:], date_str, pc_name  # PREV_INDEX_NO_SFIX, ENTRY_D, ENTRY_BY
-            ))
-
-            select_checkbox_states_sql = """
-                WITH RANKED_STATES AS (
-                    SELECT a.*, 
-                           RANK() OVER (
-                               PARTITION BY CHECKBOX_INDEX
-                               ORDER BY 
-                                   CASE WHEN PROCESS_CODE = :1 THEN 0 ELSE 1 END,
-                                   TO_NUMBER(INDEX_NO || INDEX_NO_SFIX) DESC
-                           ) as RNK
-                    FROM CHECKBOX_STATES a
-                    WHERE SERIAL_NO = :2
-                )
-                SELECT 
-                    INDEX_NO, INDEX_NO_SFIX, SERIAL_NO, DEPT_CODE, PROCESS_CODE,
-                    CHECKBOX_INDEX, STATE,
-                    X_POSITION, Y_POSITION, WIDTH, HEIGHT, PREV_INDEX_NO, PREV_INDEX_NO_SFIX, DATA_ST
-                FROM RANKED_STATES
-                WHERE RNK = 1
-                ORDER BY TO_NUMBER(CHECKBOX_INDEX)
-            """
-            cursor.execute(select_checkbox_states_sql, (processCode, serialNo))
-            checkbox_results = cursor.fetchall()  # fetchone() 대신 fetchall() 사용
-
-            # 체크박스 상태 데이터 삽입
-            insert_checkbox_states_sql = """
-                INSERT INTO CHECKBOX_STATES (
-                    INDEX_NO, INDEX_NO_SFIX, SERIAL_NO, DEPT_CODE, PROCESS_CODE,
-                    CHECKBOX_INDEX, STATE, X_POSITION, Y_POSITION, WIDTH, HEIGHT,
-                    PREV_INDEX_NO, PREV_INDEX_NO_SFIX, ENTRY_D, ENTRY_BY
-                ) VALUES (
-                    :1, :2, :3, :4, :5,
-                    :6, :7, :8, :9, :10, :11,
-                    :12, :13, :14, :15
-                )
-            """
-            
-            for checkbox_result in checkbox_results:
-                cursor.execute(insert_checkbox_states_sql, (
-                    indexNo, indexNo_sfix,
-                    checkbox_result[2],  # SERIAL_NO
-                    checkbox_result[3],  # DEPT_CODE
-                    checkbox_result[4],  # PROCESS_CODE
-                    checkbox_result[5],  # CHECKBOX_INDEX
-                    checkbox_result[6],  # STATE
-                    checkbox_result[7],  # X_POSITION
-                    checkbox_result[8],  # Y_POSITION
-                    checkbox_result[9],  # WIDTH
-                    checkbox_result[10], # HEIGHT
-                    checkbox_result[0],  # PREV_INDEX_NO (이전 데이터의 INDEX_NO)
-                    checkbox_result[1],  # PREV_INDEX_NO_SFIX (이전 데이터의 INDEX_NO_SFIX)
-                    date_str,           # ENTRY_D (현재 시간)
-                    pc_name             # ENTRY_BY (PC 이름)
-                ))
+            # 기존 DCS_HISTORY/CHECKBOX_STATES 비활성화(DATA_ST='D'), 새 DCS_HISTORY 등록,
+            # 체크박스 상태 복사(INSERT ... SELECT)를 한 번의 왕복으로 실행
+            copied = cursor.var(int)
+            self.statements.execute(cursor, 'product_reissue', {
+                'serial_no': serialNo,
+                'process_code': processCode,  # processCode는 현재 선택된 공정 코드 사용
+                'index_no': indexNo,
+                'index_no_sfix': indexNo_sfix,
+                'dcs_serial_no': dcsData['serialNo'],
+                'dcs_dept_code': dcsData['deptCode'],
+                'status': dcsData['status'],
+                'emp_no': dcsData['empNo'],
+                'prev_index_no': prev_index_no,
+                'prev_index_no_sfix': prev_index_no_sfix,
+                'entry_d': date_str,
+                'entry_by': pc_name,
+                'copied': copied
+            })
+            logging.info(f"인덱스 재발행 {serialNo}/{processCode}: 체크박스 {copied.getvalue()}개 복사")
+            self.refresh_history_summary(cursor, serialNo, dcsData['serialNo'])
 
             # 트랜잭션 커밋
             connection.commit()
+            # 해당 시리얼의 이력이 재발행되었으므로 완료 캐시 제거
+            # 비활성화는 serial_no, 새 행은 dcs_serial_no 기준이므로 두 시리얼 모두 무효화
+            reissued_serials = {serialNo, dcsData['serialNo']}
+            self.completion_cache.discard_if(lambda key: key[2] in reissued_serials)
 
             return jsonify({'message': '제품 정보가 성공적으로 업데이트되었습니다.'}), 200
 
@@ -1314,30 +1445,7 @@ class RouteHandler:
             connection = self.db_manager_2.connect()
             cursor = connection.cursor()
 
-            check_sql = """
-                SELECT DISTINCT
-                    a.INDEX_NO, 
-                    a.INDEX_NO_SFIX, 
-                    a.SERIAL_NO,
-                    b.MS_CODE,
-                    a.DATA_ST,
-                    c.START_NO
-                FROM DCS_HISTORY a
-                JOIN TDSC952 c ON a.INDEX_NO = c.INDEX_NO 
-                    AND a.INDEX_NO_SFIX = c.INDEX_NO_SFIX
-                JOIN TDSC951 b ON c.PROD_NO = b.PROD_NO 
-                    AND c.PROD_INST_SHEET_REV_NO = b.PROD_INST_SHEET_REV_NO
-                    AND c.PROD_INST_REV_NO = b.PROD_INST_REV_NO
-                    AND c.PROD_ITEM_REV_NO = b.PROD_ITEM_REV_NO
-                    AND c.ORDER_NO = b.ORDER_NO
-                    AND c.ITEM_NO = b.ITEM_NO
-                    AND b.CANCEL_D IS NULL
-                WHERE a.INDEX_NO = :1 
-                    AND a.INDEX_NO_SFIX = :2 
-                    AND a.DEPT_CODE = :3
-                AND ROWNUM = 1
-            """
-            cursor.execute(check_sql, (index_no, index_no_sfix, dept_code))
+            self.statements.execute(cursor, 'dcs_index_lookup', (index_no, index_no_sfix, dept_code))
             result = cursor.fetchone()
 
             if result:
@@ -1377,20 +1485,7 @@ class RouteHandler:
             cursor = connection.cursor()
 
             # DCS_HISTORY 레코드 조회
-            select_dcs_history_sql = """
-                SELECT INDEX_NO, INDEX_NO_SFIX, SERIAL_NO, DEPT_CODE, PROCESS_CODE, STATUS,
-                       EMP_NO, ENTRY_BY, PREV_INDEX_NO, PREV_INDEX_NO_SFIX, DATA_ST
-                FROM (
-                    SELECT *
-                    FROM DCS_HISTORY
-                    WHERE SERIAL_NO = :1
-                    ORDER BY 
-                        CASE WHEN PROCESS_CODE = :2 THEN 0 ELSE 1 END,
-                        TO_NUMBER(INDEX_NO || INDEX_NO_SFIX) DESC
-                )
-                WHERE ROWNUM = 1
-            """
-            cursor.execute(select_dcs_history_sql, (serialNo, processCode))
+            self.statements.execute(cursor, 'dcs_latest_by_serial', (serialNo, processCode))
             dcs_result = cursor.fetchone()
 
             if dcs_result:
@@ -7,6 +7,8 @@ import logging
 from datetime import datetime, timedelta
 import atexit
 import json
+from StatementRegistry import StatementRegistry
+from PageImage import PageImage
 
 class SchedulerManager:
     _instance = None
@@ -19,7 +21,7 @@ class SchedulerManager:
             cls._instance = super().__new__(cls)
         return cls._instance
 
-    def __init__(self, app, db_manager_2):
+    def __init__(self, app, db_manager_2, statement_registry=None):
         if self._initialized:
             return
 
@@ -33,6 +35,7 @@ class SchedulerManager:
 
         self.app = app
         self.db_manager_2 = db_manager_2
+        self.statements = statement_registry or StatementRegistry()
 
         self.logger.info("로깅 설정 완료")  # 추가된 디버깅 출력
 
@@ -85,6 +88,23 @@ class SchedulerManager:
             self.logger.error(f"스케줄러 설정 중 오류 발생: {str(e)}")
             raise
             
+    def add_interval_job(self, func, minutes, job_id, name=None):
+        """일정 간격(분)으로 반복 실행할 작업을 등록합니다. minutes가 0 이하이면 등록하지 않습니다."""
+        minutes = int(minutes)
+        if minutes <= 0:
+            self.logger.info(f"주기 작업 비활성화: {job_id}")
+            return None
+        job = self.scheduler.add_job(
+            func=func,
+            trigger='interval',
+            minutes=minutes,
+            id=job_id,
+            name=name or job_id,
+            replace_existing=True
+        )
+        self.logger.info(f"주기 작업 등록: {job_id} ({minutes}분 간격)")
+        return job
+
     def get_next_run_time(self):
         """다음 실행 시간을 반환합니다."""
         job = self.scheduler.get_job('cleanup_job')
@@ -128,29 +148,7 @@ class SchedulerManager:
                         start_date = (datetime.now() - timedelta(days=90)).strftime('%Y%m%d')
                         self.logger.info(f"정기 실행: {start_date}부터 조회")
 
-                    select_sql = f"""
-                    SELECT DISTINCT
-                    LIKP.WADAT AS Actual_Goods_Issue_Date,
-                    LIPS.POSNR AS Delivery_Item,
-                    LIPS.MATNR AS Material,
-                    VBAP.VBELN AS Sales_Order,
-                    VBAP.POSNR AS Sales_Order_Item,
-                    VBAP.KWMENG AS Ordered_Quantity,
-                    TDSJ201.FINISH_D,
-                    TDSJ201.ORDER_NO,
-                    TDSJ201.ITEM_NO,
-                    TDSJ201.SERIAL_NO,
-                    TDSJ201.FINISH_QTY,
-                    VBAP.VBELN || VBAP.POSEX AS ORDER_NO_16
-                    FROM sap.LIKP LIKP, sap.LIPS LIPS, sap.VBAP VBAP, sap.TDSJ201 TDSJ201
-                    WHERE LIKP.VBELN = LIPS.VBELN
-                    AND LIPS.VGBEL = VBAP.VBELN
-                    AND LIKP.WADAT IS NOT NULL
-                    AND VBAP.VBELN = TDSJ201.ORDER_NO
-                    AND LPAD (VBAP.POSNR, 6, '0') = TDSJ201.ITEM_NO--5679224
-                    AND LIKP.WADAT BETWEEN '{start_date}' AND TO_CHAR(SYSDATE, 'YYYYMMDD')
-                    """
-                    cursor.execute(select_sql)
+                    self.statements.execute(cursor, 'shipped_serials', {'start_date': start_date})
                     results = cursor.fetchall()
 
                     # Serial 번호 리스트 추출 (DISTINCT로 이미 중복 제거됨)
@@ -290,6 +288,9 @@ class SchedulerManager:
             # 파일 처리
             for root, _, files in os.walk(local_base):
                 for file in files:
+                    # 색 오버레이는 페이지와 함께 이동 (따로 옮기면 페이지만 네트워크로 가서 색 표시가 빠짐)
+                    if PageImage.is_overlay(file):
+                        continue
                     try:
                         file_path = os.path.join(root, file)
                         file_time = datetime.fromtimestamp(os.path.getmtime(file_path))
@@ -309,6 +310,13 @@ class SchedulerManager:
                             if not os.path.exists(target_path):
                                 self.logger.info(f"파일 이동: {file_path} -> {target_path}")
                                 shutil.move(file_path, target_path)
+                                overlay_path = PageImage.overlay_path(file_path)
+                                target_overlay_path = PageImage.overlay_path(target_path)
+                                if os.path.exists(overlay_path):
+                                    shutil.move(overlay_path, target_overlay_path)
+                                elif os.path.exists(target_overlay_path):
+                                    # 다른 페이지의 오래된 오버레이가 남아 있으면 잘못 합성되므로 삭제
+                                    os.remove(target_overlay_path)
                                 self.logger.info(f"파일 이동 완료: {file}")
                             else:
                                 self.logger.info(f"대상 파일이 이미 존재하여 건너뜀: {target_path}")
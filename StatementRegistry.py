@@ -0,0 +1,389 @@
+import logging
+import os
+import threading
+import time
+
+
+class StatementRegistry:
+    """
+    RouteHandler / SchedulerManager에서 사용하는 SQL을 한 곳에서 관리합니다.
+    - 풀 세션이 새로 생성될 때 statement cache 크기를 설정하고 정적 SQL을 미리 prepare
+    - 문장별 prepare/실행 횟수와 누적 실행 시간을 집계
+    """
+
+    # dcs_status_for_completion의 PROCESS_CODE IN 목록 자리 수 (:4, :5, :6) - 바꾸면 SQL도 함께 수정
+    COMPLETION_PROCESS_SLOTS = 3
+
+    # 이름: (대상 DB, SQL, 동적 여부)
+    # 동적 SQL은 format()으로 완성되는 템플릿이므로 미리 prepare하지 않음
+    STATEMENTS = {
+        # ---------------------------------------------------------------- NEURON
+        'product_attributes_by_serial': ('NEURON', """
+            SELECT T951.MODEL, T952.PROD_NO FROM TDSC951 T951, TDSC952 T952
+            WHERE T951.PROD_NO = T952.PROD_NO
+            AND T952.SERIAL_NO = :1
+        """, False),
+        'dcs_renewal_by_key': ('NEURON', """
+            SELECT RENEWAL_D
+            FROM DCS_HISTORY
+            WHERE INDEX_NO = :1 AND INDEX_NO_SFIX = :2
+            AND SERIAL_NO = :3 AND DEPT_CODE = :4
+            AND PROCESS_CODE = :5 AND DATA_ST = 'A'
+        """, False),
+        # 04번 공정의 경우 DCS_HISTORY에 레코드가 없을 수 있으므로 MERGE 사용
+        'dcs_merge_status': ('NEURON', """
+            MERGE INTO DCS_HISTORY
+            USING DUAL
+            ON (INDEX_NO = :1 AND INDEX_NO_SFIX = :2 AND SERIAL_NO = :3
+                AND DEPT_CODE = :4 AND PROCESS_CODE = :5 AND DATA_ST = 'A')
+            WHEN MATCHED THEN
+                UPDATE SET STATUS = :6, EMP_NO = :7, FINISH_D = :8, RENEWAL_BY = :9
+            WHEN NOT MATCHED THEN
+                INSERT (INDEX_NO, INDEX_NO_SFIX, SERIAL_NO, DEPT_CODE, PROCESS_CODE,
+                        STATUS, EMP_NO, FINISH_D, ENTRY_D, ENTRY_BY, DATA_ST)
+                VALUES (:1, :2, :3, :4, :5, :6, :7, :8, :8, :9, 'A')
+        """, False),
+        'dcs_update_status': ('NEURON', """
+            UPDATE DCS_HISTORY
+            SET STATUS = :1, EMP_NO = :2, FINISH_D = :3
+            WHERE INDEX_NO = :4 AND INDEX_NO_SFIX = :5 AND SERIAL_NO = :6 AND DEPT_CODE = :7 AND PROCESS_CODE = :8 AND DATA_ST = 'A'
+        """, False),
+        # RENEWAL_D가 NULL이 아닐 경우
+        'dcs_update_status_renewal': ('NEURON', """
+            UPDATE DCS_HISTORY
+            SET STATUS = :1, EMP_NO = :2, RENEWAL_FINISH_D = :3, RENEWAL_BY = :4
+            WHERE INDEX_NO = :4 AND INDEX_NO_SFIX = :5 AND SERIAL_NO = :6 AND DEPT_CODE = :7 AND PROCESS_CODE = :8 AND DATA_ST = 'A'
+        """, False),
+        'dcs_merge_entry': ('NEURON', """
+            MERGE INTO DCS_HISTORY USING dual
+            ON (INDEX_NO = :1 AND INDEX_NO_SFIX = :2 AND SERIAL_NO = :3 AND DEPT_CODE = :4 AND PROCESS_CODE = :5)
+            WHEN MATCHED THEN
+                UPDATE SET EMP_NO = :6, RENEWAL_D = :7, RENEWAL_BY = :8
+            WHEN NOT MATCHED THEN
+                INSERT (INDEX_NO, INDEX_NO_SFIX, SERIAL_NO, DEPT_CODE, PROCESS_CODE, EMP_NO, ENTRY_D, ENTRY_BY, DATA_ST)
+                VALUES (:1, :2, :3, :4, :5, :6, :7, :8, 'A')
+        """, False),
+        'dcs_status_by_process': ('NEURON', """
+            SELECT STATUS
+            FROM DCS_HISTORY
+            WHERE SERIAL_NO = :1
+              AND DEPT_CODE = :2
+              AND PROCESS_CODE = :3
+              AND DATA_ST = 'A'
+        """, False),
+        # 필수 공정(최대 COMPLETION_PROCESS_SLOTS개)의 상태를 한 번에 집계 - 남는 자리는 NULL로 채움
+        'dcs_status_for_completion': ('NEURON', """
+            SELECT PROCESS_CODE, COUNT(*), COUNT(CASE WHEN STATUS = 1 THEN 1 END)
+            FROM DCS_HISTORY
+            WHERE INDEX_NO = :1
+              AND SERIAL_NO = :2
+              AND DEPT_CODE = :3
+              AND PROCESS_CODE IN (:4, :5, :6)
+              AND DATA_ST = 'A'
+            GROUP BY PROCESS_CODE
+        """, False),
+        'dcs_count_by_serial_process': ('NEURON', """
+            SELECT COUNT(*)
+            FROM DCS_HISTORY
+            WHERE SERIAL_NO = :1
+              AND PROCESS_CODE = :2
+              AND DATA_ST = 'A'
+        """, False),
+        'dcs_index_lookup': ('NEURON', """
+            SELECT DISTINCT
+                a.INDEX_NO,
+                a.INDEX_NO_SFIX,
+                a.SERIAL_NO,
+                b.MS_CODE,
+                a.DATA_ST,
+                c.START_NO
+            FROM DCS_HISTORY a
+            JOIN TDSC952 c ON a.INDEX_NO = c.INDEX_NO
+                AND a.INDEX_NO_SFIX = c.INDEX_NO_SFIX
+            JOIN TDSC951 b ON c.PROD_NO = b.PROD_NO
+                AND c.PROD_INST_SHEET_REV_NO = b.PROD_INST_SHEET_REV_NO
+                AND c.PROD_INST_REV_NO = b.PROD_INST_REV_NO
+                AND c.PROD_ITEM_REV_NO = b.PROD_ITEM_REV_NO
+                AND c.ORDER_NO = b.ORDER_NO
+                AND c.ITEM_NO = b.ITEM_NO
+                AND b.CANCEL_D IS NULL
+            WHERE a.INDEX_NO = :1
+                AND a.INDEX_NO_SFIX = :2
+                AND a.DEPT_CODE = :3
+            AND ROWNUM = 1
+        """, False),
+        'dcs_latest_by_serial': ('NEURON', """
+            SELECT INDEX_NO, INDEX_NO_SFIX, SERIAL_NO, DEPT_CODE, PROCESS_CODE, STATUS,
+                   EMP_NO, ENTRY_BY, PREV_INDEX_NO, PREV_INDEX_NO_SFIX, DATA_ST
+            FROM (
+                SELECT *
+                FROM DCS_HISTORY
+                WHERE SERIAL_NO = :1
+                ORDER BY
+                    CASE WHEN PROCESS_CODE = :2 THEN 0 ELSE 1 END,
+                    TO_NUMBER(INDEX_NO || INDEX_NO_SFIX) DESC
+            )
+            WHERE ROWNUM = 1
+        """, False),
+        # {case_statements}, {date_where_clause}, {serial_clause}, {fetch_clause}는 search_history에서 채움
+        'dcs_history_pivot': ('NEURON', """
+            WITH FILTERED_SERIALS AS (
+                SELECT DISTINCT SERIAL_NO
+                FROM DCS_HISTORY
+                WHERE DEPT_CODE LIKE :dept_code
+                AND {date_where_clause}
+                {serial_clause}
+            )
+            SELECT h.SERIAL_NO, {case_statements}
+            FROM DCS_HISTORY h
+            INNER JOIN FILTERED_SERIALS fs ON h.SERIAL_NO = fs.SERIAL_NO
+            WHERE h.DEPT_CODE LIKE :dept_code
+            GROUP BY h.SERIAL_NO
+            ORDER BY h.SERIAL_NO
+            {fetch_clause}
+        """, True),
+        # 요약 테이블(DCS_PROCESS_SUMMARY)용 피벗 - 공정명/상태/작업자는 dcs_history_pivot과 같음
+        # 시간 열은 최근 작업 시각(EVENT_D, 날짜 기준 MAX)을 표시 (기존 피벗은 문자열 기준 MAX라 다를 수 있음)
+        'dcs_summary_pivot': ('NEURON', """
+            WITH FILTERED_SERIALS AS (
+                SELECT DISTINCT SERIAL_NO
+                FROM DCS_PROCESS_SUMMARY
+                WHERE LINE_CODE = :dept_code
+                AND {date_where_clause}
+                {serial_clause}
+            )
+            SELECT h.SERIAL_NO, {case_statements}
+            FROM DCS_PROCESS_SUMMARY h
+            INNER JOIN FILTERED_SERIALS fs ON h.SERIAL_NO = fs.SERIAL_NO
+            WHERE h.LINE_CODE = :dept_code
+            GROUP BY h.SERIAL_NO
+            ORDER BY h.SERIAL_NO
+            {fetch_clause}
+        """, True),
+        # 한 시리얼의 DCS_HISTORY를 다시 집계해 요약 테이블에 반영 (쓰기 경로와 백필에서 사용)
+        'dcs_summary_refresh': ('NEURON', """
+            MERGE INTO DCS_PROCESS_SUMMARY s
+            USING (
+                SELECT SERIAL_NO, DEPT_CODE, PROCESS_CODE,
+                       CASE WHEN DEPT_CODE LIKE '%3165%' THEN '3165'
+                            WHEN DEPT_CODE LIKE '%3186%' THEN '3186'
+                            WHEN DEPT_CODE LIKE '%3188%' THEN '3188'
+                            ELSE DEPT_CODE END AS LINE_CODE,
+                       MAX(STATUS) AS STATUS,
+                       MAX(EMP_NO) AS EMP_NO,
+                       MAX(COALESCE(RENEWAL_D, ENTRY_D)) AS EVENT_D,
+                       MIN(ENTRY_D) AS FIRST_ENTRY_D,
+                       MAX(ENTRY_D) AS LAST_ENTRY_D
+                FROM DCS_HISTORY
+                WHERE SERIAL_NO = :serial_no
+                GROUP BY SERIAL_NO, DEPT_CODE, PROCESS_CODE
+            ) h
+            ON (s.SERIAL_NO = h.SERIAL_NO AND s.DEPT_CODE = h.DEPT_CODE AND s.PROCESS_CODE = h.PROCESS_CODE)
+            WHEN MATCHED THEN
+                UPDATE SET s.LINE_CODE = h.LINE_CODE, s.STATUS = h.STATUS, s.EMP_NO = h.EMP_NO,
+                           s.EVENT_D = h.EVENT_D, s.FIRST_ENTRY_D = h.FIRST_ENTRY_D,
+                           s.LAST_ENTRY_D = h.LAST_ENTRY_D, s.UPDATED_D = SYSDATE
+            WHEN NOT MATCHED THEN
+                INSERT (SERIAL_NO, DEPT_CODE, PROCESS_CODE, LINE_CODE, STATUS, EMP_NO,
+                        EVENT_D, FIRST_ENTRY_D, LAST_ENTRY_D, UPDATED_D)
+                VALUES (h.SERIAL_NO, h.DEPT_CODE, h.PROCESS_CODE, h.LINE_CODE, h.STATUS, h.EMP_NO,
+                        h.EVENT_D, h.FIRST_ENTRY_D, h.LAST_ENTRY_D, SYSDATE)
+        """, False),
+        # 백필 대상 시리얼 (since 이후 변경분, NULL이면 전체)
+        'dcs_summary_backfill_serials': ('NEURON', """
+            SELECT DISTINCT SERIAL_NO
+            FROM DCS_HISTORY
+            WHERE :since IS NULL OR COALESCE(RENEWAL_D, ENTRY_D) >= TO_DATE(:since, 'YYYY-MM-DD')
+        """, False),
+        'checkbox_count_by_process': ('NEURON', """
+            SELECT COUNT(*)
+            FROM CHECKBOX_STATES
+            WHERE SERIAL_NO = :1
+            AND DEPT_CODE = :2
+            AND PROCESS_CODE = :3
+            AND DATA_ST = 'A'
+        """, False),
+        'checkbox_positions': ('NEURON', """
+            SELECT CHECKBOX_INDEX, X_POSITION, Y_POSITION, WIDTH, HEIGHT
+            FROM CHECKBOX_STATES
+            WHERE INDEX_NO = :1 AND INDEX_NO_SFIX = :2 AND SERIAL_NO = :3 AND DEPT_CODE = :4 AND PROCESS_CODE = :5
+            ORDER BY TO_NUMBER(CHECKBOX_INDEX)
+        """, False),
+        'checkbox_merge_state': ('NEURON', """
+            MERGE INTO CHECKBOX_STATES cs
+            USING (SELECT :1 AS INDEX_NO, :2 AS INDEX_NO_SFIX, :3 AS SERIAL_NO,
+                        :4 AS DEPT_CODE, :5 AS PROCESS_CODE, :6 AS CHECKBOX_INDEX FROM DUAL) src
+            ON (cs.INDEX_NO = src.INDEX_NO AND cs.INDEX_NO_SFIX = src.INDEX_NO_SFIX
+                AND cs.SERIAL_NO = src.SERIAL_NO AND cs.DEPT_CODE = src.DEPT_CODE
+                AND cs.PROCESS_CODE = src.PROCESS_CODE AND cs.CHECKBOX_INDEX = src.CHECKBOX_INDEX)
+            WHEN MATCHED THEN
+                UPDATE SET cs.STATE = :7, cs.X_POSITION = :8, cs.Y_POSITION = :9,
+                        cs.WIDTH = :10, cs.HEIGHT = :11, cs.RENEWAL_D = CURRENT_TIMESTAMP, cs.RENEWAL_BY = :12
+            WHEN NOT MATCHED THEN
+                INSERT (INDEX_NO, INDEX_NO_SFIX, SERIAL_NO, DEPT_CODE, PROCESS_CODE, CHECKBOX_INDEX,
+                        STATE, X_POSITION, Y_POSITION, WIDTH, HEIGHT, ENTRY_BY, RENEWAL_BY, DATA_ST)
+                VALUES (:1, :2, :3, :4, :5, :6, :7, :8, :9, :10, :11, :12, :12, 'A')
+        """, False),
+        # Y_POSITION으로 먼저 정렬하고, 같은 Y값을 가진 항목들은 X_POSITION으로 정렬
+        'checkbox_states_by_process': ('NEURON', """
+            SELECT CHECKBOX_INDEX, STATE
+            FROM CHECKBOX_STATES
+            WHERE INDEX_NO = :1 AND INDEX_NO_SFIX = :2 AND SERIAL_NO = :3 AND DEPT_CODE = :4 AND PROCESS_CODE = :5 AND DATA_ST = 'A'
+            ORDER BY TO_NUMBER(CHECKBOX_INDEX)
+        """, False),
+        # 인덱스 재발행: 기존 이력 비활성화 + 새 이력 등록 + 체크박스 상태 복사를 한 번의 왕복으로 처리
+        # 체크박스는 CHECKBOX_INDEX별로 현재 공정 우선, 최신 인덱스 순으로 순위를 매겨 1순위만 서버에서 복사
+        'product_reissue': ('NEURON', """
+            BEGIN
+                UPDATE DCS_HISTORY
+                SET DATA_ST = 'D'
+                WHERE SERIAL_NO = :serial_no AND PROCESS_CODE = :process_code;
+
+                UPDATE CHECKBOX_STATES
+                SET DATA_ST = 'D'
+                WHERE SERIAL_NO = :serial_no AND PROCESS_CODE = :process_code;
+
+                INSERT INTO DCS_HISTORY (
+                    INDEX_NO, INDEX_NO_SFIX, SERIAL_NO, DEPT_CODE, PROCESS_CODE, STATUS,
+                    EMP_NO, PREV_INDEX_NO, PREV_INDEX_NO_SFIX, ENTRY_D, ENTRY_BY
+                ) VALUES (
+                    :index_no, :index_no_sfix, :dcs_serial_no, :dcs_dept_code, :process_code, :status,
+                    :emp_no, :prev_index_no, :prev_index_no_sfix, :entry_d, :entry_by
+                );
+
+                INSERT INTO CHECKBOX_STATES (
+                    INDEX_NO, INDEX_NO_SFIX, SERIAL_NO, DEPT_CODE, PROCESS_CODE,
+                    CHECKBOX_INDEX, STATE, X_POSITION, Y_POSITION, WIDTH, HEIGHT,
+                    PREV_INDEX_NO, PREV_INDEX_NO_SFIX, ENTRY_D, ENTRY_BY
+                )
+                SELECT
+                    :index_no, :index_no_sfix, SERIAL_NO, DEPT_CODE, PROCESS_CODE,
+                    CHECKBOX_INDEX, STATE, X_POSITION, Y_POSITION, WIDTH, HEIGHT,
+                    INDEX_NO, INDEX_NO_SFIX, :entry_d, :entry_by
+                FROM (
+                    SELECT a.*,
+                           RANK() OVER (
+                               PARTITION BY CHECKBOX_INDEX
+                               ORDER BY
+                                   CASE WHEN PROCESS_CODE = :process_code THEN 0 ELSE 1 END,
+                                   TO_NUMBER(INDEX_NO || INDEX_NO_SFIX) DESC
+                           ) AS RNK
+                    FROM CHECKBOX_STATES a
+                    WHERE SERIAL_NO = :serial_no
+                )
+                WHERE RNK = 1;
+
+                :copied := SQL%ROWCOUNT;
+            END;
+        """, False),
+        # 출하된 시리얼 조회 (SchedulerManager)
+        'shipped_serials': ('NEURON', """
+            SELECT DISTINCT
+            LIKP.WADAT AS Actual_Goods_Issue_Date,
+            LIPS.POSNR AS Delivery_Item,
+            LIPS.MATNR AS Material,
+            VBAP.VBELN AS Sales_Order,
+            VBAP.POSNR AS Sales_Order_Item,
+            VBAP.KWMENG AS Ordered_Quantity,
+            TDSJ201.FINISH_D,
+            TDSJ201.ORDER_NO,
+            TDSJ201.ITEM_NO,
+            TDSJ201.SERIAL_NO,
+            TDSJ201.FINISH_QTY,
+            VBAP.VBELN || VBAP.POSEX AS ORDER_NO_16
+            FROM sap.LIKP LIKP, sap.LIPS LIPS, sap.VBAP VBAP, sap.TDSJ201 TDSJ201
+            WHERE LIKP.VBELN = LIPS.VBELN
+            AND LIPS.VGBEL = VBAP.VBELN
+            AND LIKP.WADAT IS NOT NULL
+            AND VBAP.VBELN = TDSJ201.ORDER_NO
+            AND LPAD (VBAP.POSNR, 6, '0') = TDSJ201.ITEM_NO
+            AND LIKP.WADAT BETWEEN :start_date AND TO_CHAR(SYSDATE, 'YYYYMMDD')
+        """, False),
+    }
+
+    # sql 폴더의 파일로 관리하는 SQL - 시작 시 한 번만 읽음
+    SQL_FILES = {
+        'product_info_by_index': ('NEURON', 'join_prod_info_by_index.sql'),
+        'emp_by_no': ('ORA7', 'EMP.sql'),
+        'emp_directory': ('ORA7', 'EMP_DIRECTORY.sql'),
+    }
+
+    SQL_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sql')
+
+    def __init__(self, stmt_cache_size=40):
+        self.stmt_cache_size = int(stmt_cache_size)
+        self._lock = threading.Lock()
+        self._statements = dict(self.STATEMENTS)
+        for name, (db, filename) in self.SQL_FILES.items():
+            with open(os.path.join(self.SQL_FOLDER, filename), 'r', encoding='utf-8') as file:
+                self._statements[name] = (db, file.read(), False)
+        self._stats = {
+            name: {'db': db, 'prepared': 0, 'executed': 0, 'elapsed_ms': 0.0}
+            for name, (db, _, _) in self._statements.items()
+        }
+
+    def sql(self, name):
+        """등록된 SQL(또는 동적 SQL 템플릿)을 반환합니다."""
+        return self._statements[name][1]
+
+    def statements_for(self, db_name):
+        """해당 DB에서 미리 prepare할 정적 SQL 목록을 반환합니다."""
+        return [
+            (name, sql) for name, (db, sql, dynamic) in self._statements.items()
+            if db == db_name and not dynamic
+        ]
+
+    def prepare_session(self, connection, db_name):
+        """
+        새로 생성된 풀 세션에 statement cache 크기를 설정하고 정적 SQL을 미리 prepare합니다.
+        prepare된 문장은 커서를 닫아도 세션의 statement cache에 남아 이후 실행 시 재파싱되지 않습니다.
+        """
+        connection.stmtcachesize = self.stmt_cache_size
+        prepared = []
+        for name, sql in self.statements_for(db_name):
+            cursor = connection.cursor()
+            try:
+                cursor.prepare(sql)
+                prepared.append(name)
+            except Exception as e:
+                logging.error(f"SQL prepare 실패 ({name}): {str(e)}")
+            finally:
+                cursor.close()
+        with self._lock:
+            for name in prepared:
+                self._stats[name]['prepared'] += 1
+        logging.info(f"[{db_name}] 새 세션에 SQL {len(prepared)}개 prepare 완료 (stmtcachesize={self.stmt_cache_size})")
+
+    def _record(self, name, started):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            stat = self._stats[name]
+            stat['executed'] += 1
+            stat['elapsed_ms'] += elapsed_ms
+
+    def execute(self, cursor, name, params=None, sql=None):
+        """
+        등록된 SQL을 실행하고 통계를 기록합니다.
+        동적 SQL은 템플릿을 완성한 문장을 sql로 전달합니다.
+        """
+        started = time.perf_counter()
+        cursor.execute(sql or self.sql(name), params if params is not None else [])
+        self._record(name, started)
+        return cursor
+
+    def executemany(self, cursor, name, rows, **kwargs):
+        """등록된 SQL을 배열 바인딩으로 한 번에 실행하고 통계를 기록합니다."""
+        started = time.perf_counter()
+        cursor.executemany(self.sql(name), rows, **kwargs)
+        self._record(name, started)
+        return cursor
+
+    def get_stats(self):
+        """문장별 prepare/실행 횟수를 반환합니다. (executions_after_prepare: 미리 prepare한 뒤 실행된 횟수)"""
+        with self._lock:
+            result = {}
+            for name, stat in self._stats.items():
+                result[name] = dict(stat)
+                result[name]['elapsed_ms'] = round(stat['elapsed_ms'], 2)
+                result[name]['executions_after_prepare'] = max(stat['executed'] - stat['prepared'], 0)
+            return result
@@ -19,34 +19,114 @@ class FlaskApp:
         self.app.config['NETWORK_PATH'] = os.getenv('NETWORK_PATH', './NetworkPath')  # 네트워크 경로 추가
         self.app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=8)  # 세션 유효 시간 설정
         self.app.config['SESSION_PERMANENT'] = True  # 영구 세션 활성화
+        # 공정 완료 여부 캐시 유지 시간(초), 0이면 사용 안 함
+        self.app.config['COMPLETION_CACHE_TTL'] = int(os.getenv('COMPLETION_CACHE_TTL', '30'))
+        # 시리얼 → 제품 속성 캐시 (PRODUCT_CACHE_DB를 비우면 디스크 캐시 사용 안 함)
+        self.app.config['PRODUCT_CACHE_TTL'] = int(os.getenv('PRODUCT_CACHE_TTL', '86400'))
+        self.app.config['PRODUCT_CACHE_SIZE'] = int(os.getenv('PRODUCT_CACHE_SIZE', '5000'))
+        self.app.config['PRODUCT_CACHE_DB'] = os.getenv('PRODUCT_CACHE_DB', '')
+        # 인덱스 번호 → 제품 정보 캐시 유지 시간(초)과 최대 항목 수
+        self.app.config['PRODUCT_INFO_CACHE_TTL'] = int(os.getenv('PRODUCT_INFO_CACHE_TTL', '300'))
+        self.app.config['PRODUCT_INFO_CACHE_SIZE'] = int(os.getenv('PRODUCT_INFO_CACHE_SIZE', '2000'))
+        # 사원 디렉터리(EMPM) 갱신 주기(분), 0이면 시작 후 최초 적재만 수행
+        self.app.config['EMP_DIRECTORY_REFRESH_MINUTES'] = int(os.getenv('EMP_DIRECTORY_REFRESH_MINUTES', '30'))
+        # 이력 검색: 한 번에 가져올 행 수와 페이지 크기 상한
+        self.app.config['HISTORY_FETCH_ARRAYSIZE'] = int(os.getenv('HISTORY_FETCH_ARRAYSIZE', '500'))
+        self.app.config['HISTORY_PAGE_SIZE_MAX'] = int(os.getenv('HISTORY_PAGE_SIZE_MAX', '1000'))
+        # 공정 페이지 이미지: 메모리 보관 시간(초)/개수, 버전(ETag) URL의 브라우저 캐시 시간(초)
+        self.app.config['PAGE_IMAGE_CACHE_TTL'] = int(os.getenv('PAGE_IMAGE_CACHE_TTL', '600'))
+        self.app.config['PAGE_IMAGE_CACHE_SIZE'] = int(os.getenv('PAGE_IMAGE_CACHE_SIZE', '10'))
+        self.app.config['PAGE_IMAGE_MAX_AGE'] = int(os.getenv('PAGE_IMAGE_MAX_AGE', '3600'))
+        # 공정 페이지 인코딩: PNG 압축 레벨(0~9), 미리보기 JPEG 품질, 무손실 WebP 사용 여부
+        self.app.config['IMAGE_PNG_COMPRESSION'] = int(os.getenv('IMAGE_PNG_COMPRESSION', '1'))
+        self.app.config['IMAGE_JPEG_QUALITY'] = int(os.getenv('IMAGE_JPEG_QUALITY', '90'))
+        self.app.config['IMAGE_WEBP_ENABLED'] = os.getenv('IMAGE_WEBP_ENABLED', '1') == '1'
+        # Process 이미지 체크박스 인식 결과 캐시 (유지 시간(초), 메모리 항목 수, SQLite 경로 - 비우면 메모리만)
+        self.app.config['CHECKBOX_CACHE_TTL'] = int(os.getenv('CHECKBOX_CACHE_TTL', '604800'))
+        self.app.config['CHECKBOX_CACHE_SIZE'] = int(os.getenv('CHECKBOX_CACHE_SIZE', '500'))
+        self.app.config['CHECKBOX_CACHE_DB'] = os.getenv('CHECKBOX_CACHE_DB', '')
+        # 이력 요약 테이블(DCS_PROCESS_SUMMARY) 사용 여부 - 테이블 생성 및 백필 후 1로 설정
+        self.app.config['HISTORY_SUMMARY_ENABLED'] = os.getenv('HISTORY_SUMMARY_ENABLED', '0') == '1'
+        # 마스터 PDF 렌더링 기록 (SQLite 경로 - 비우면 메모리만) 및 pdftocairo 스레드 수
+        self.app.config['MASTER_RENDER_INDEX_DB'] = os.getenv('MASTER_RENDER_INDEX_DB', '')
+        self.app.config['PDF_RENDER_THREADS'] = int(os.getenv('PDF_RENDER_THREADS', '2'))
+        # Process/Master 페이지 저장 형식 (rgb: 24비트 PNG, gray: 8비트 그레이스케일 PNG + 색 오버레이)
+        # 기본은 rgb, gray를 쓰려면 .env에서 PAGE_STORAGE_MODE=gray로 변경
+        # (새로 만드는 페이지부터 적용, 기존 rgb 페이지와 .overlay.png 파일은 어느 형식에서나 그대로 읽힘)
+        self.app.config['PAGE_STORAGE_MODE'] = os.getenv('PAGE_STORAGE_MODE', 'rgb')
+        # Master PDF 도착 시 Process 이미지 사전 생성 (감시 사용 여부, 작업 스레드 수, 네트워크 스캔 간격(분), 복사 완료 대기(초))
+        self.app.config['MASTER_WATCH_ENABLED'] = os.getenv('MASTER_WATCH_ENABLED', '1') == '1'
+        self.app.config['MASTER_RENDER_WORKERS'] = int(os.getenv('MASTER_RENDER_WORKERS', '2'))
+        self.app.config['MASTER_SCAN_MINUTES'] = int(os.getenv('MASTER_SCAN_MINUTES', '5'))
+        self.app.config['MASTER_SETTLE_SECONDS'] = float(os.getenv('MASTER_SETTLE_SECONDS', '2'))
+        # 페이지 요청 시 Master PDF 도착을 기다리는 최대 시간(초)과 클라이언트 작업 확인 간격(초)
+        self.app.config['MASTER_WAIT_TIMEOUT'] = float(os.getenv('MASTER_WAIT_TIMEOUT', '10'))
+        self.app.config['RENDER_JOB_POLL_SECONDS'] = int(os.getenv('RENDER_JOB_POLL_SECONDS', '1'))
+        # Merged 이미지 생성 작업 큐 (SQLite 경로, 작업 스레드 수, 최대 시도 횟수, 첫 재시도 대기(초))
+        self.app.config['MERGE_QUEUE_DB'] = os.getenv('MERGE_QUEUE_DB', 'cache/merge_queue.sqlite')
+        self.app.config['MERGE_WORKERS'] = int(os.getenv('MERGE_WORKERS', '1'))
+        self.app.config['MERGE_MAX_ATTEMPTS'] = int(os.getenv('MERGE_MAX_ATTEMPTS', '3'))
+        self.app.config['MERGE_RETRY_SECONDS'] = float(os.getenv('MERGE_RETRY_SECONDS', '30'))
+        # Merged 이미지 슬롯 배치 기록 (SQLite 경로 - 비우면 부분 갱신 없이 항상 전체 합성)
+        self.app.config['MERGE_LAYOUT_DB'] = os.getenv('MERGE_LAYOUT_DB', 'cache/merge_layout.sqlite')
+        # 저장된 PNG 무손실 재압축 (실행 간격(분) - 0이면 사용 안 함, 1회 최대 파일 수, 파일 간 대기(초), 처리 기록 SQLite)
+        self.app.config['PNG_OPTIMIZE_MINUTES'] = int(os.getenv('PNG_OPTIMIZE_MINUTES', '0'))
+        self.app.config['PNG_OPTIMIZE_MAX_FILES'] = int(os.getenv('PNG_OPTIMIZE_MAX_FILES', '2000'))
+        self.app.config['PNG_OPTIMIZE_THROTTLE'] = float(os.getenv('PNG_OPTIMIZE_THROTTLE', '0.05'))
+        self.app.config['PNG_OPTIMIZE_DB'] = os.getenv('PNG_OPTIMIZE_DB', 'cache/png_optimized.sqlite')
 
     def get_app(self):
         return self.app
 
 # dotenv가 로드된 후 데이터베이스 관리자, 이미지 프로세서 및 라우트 핸들러 가져오기
 from DatabaseManager import DatabaseManager
+from StatementRegistry import StatementRegistry
 from ImageProcessor import ImageProcessor
+from CacheManager import SQLiteCacheStore
 from RouteHandler import RouteHandler
 
 def create_app():
     flask_app = FlaskApp().get_app()
+    # 자주 쓰는 SQL 등록 및 세션별 statement cache 크기 설정
+    statement_registry = StatementRegistry(stmt_cache_size=os.getenv('DB_STMT_CACHE_SIZE', '40'))
     # 환경 변수의 데이터베이스 설정
     ora7_manager = DatabaseManager(
         user=os.getenv('ORA7_USER', 'default_user'),
         password=os.getenv('ORA7_PASSWORD', 'default_password'),
         host=os.getenv('ORA7_HOST', 'default_host'),
         port=os.getenv('ORA7_PORT', '1521'),
-        service_name=os.getenv('ORA7_SERVICE_NAME', 'default_service_name')
+        service_name=os.getenv('ORA7_SERVICE_NAME', 'default_service_name'),
+        pool_min=os.getenv('ORA7_POOL_MIN', '1'),
+        pool_max=os.getenv('ORA7_POOL_MAX', '4'),
+        pool_increment=os.getenv('ORA7_POOL_INCREMENT', '1'),
+        pool_timeout=os.getenv('DB_POOL_TIMEOUT', '300'),
+        pool_wait_timeout=os.getenv('DB_POOL_WAIT_TIMEOUT', '5000'),
+        pool_ping_interval=os.getenv('DB_POOL_PING_INTERVAL', '60'),
+        name='ORA7',
+        statement_registry=statement_registry
     )
     neuron_manager = DatabaseManager(
         user=os.getenv('NEURON_USER', 'default_user'),
         password=os.getenv('NEURON_PASSWORD', 'default_password'),
         host=os.getenv('NEURON_HOST', 'default_host'),
         port=os.getenv('NEURON_PORT', '1521'),
-        service_name=os.getenv('NEURON_SERVICE_NAME', 'default_service_name')
+        service_name=os.getenv('NEURON_SERVICE_NAME', 'default_service_name'),
+        pool_min=os.getenv('NEURON_POOL_MIN', '2'),
+        pool_max=os.getenv('NEURON_POOL_MAX', '10'),
+        pool_increment=os.getenv('NEURON_POOL_INCREMENT', '1'),
+        pool_timeout=os.getenv('DB_POOL_TIMEOUT', '300'),
+        pool_wait_timeout=os.getenv('DB_POOL_WAIT_TIMEOUT', '5000'),
+        pool_ping_interval=os.getenv('DB_POOL_PING_INTERVAL', '60'),
+        name='NEURON',
+        statement_registry=statement_registry
     )
-    image_processor = ImageProcessor()
-    route_handler = RouteHandler(flask_app, ora7_manager, neuron_manager, image_processor)
+    master_render_db = flask_app.config['MASTER_RENDER_INDEX_DB']
+    image_processor = ImageProcessor(
+        render_index=SQLiteCacheStore(master_render_db, table='master_render') if master_render_db else None,
+        pdf_render_threads=flask_app.config['PDF_RENDER_THREADS'],
+        storage_mode=flask_app.config['PAGE_STORAGE_MODE']
+    )
+    route_handler = RouteHandler(flask_app, ora7_manager, neuron_manager, image_processor, statement_registry)
     return flask_app
 
 app = create_app()
@@ -0,0 +1,72 @@
+"""
+DCS_PROCESS_SUMMARY 백필 스크립트
+
+사용법:
+    python backfill_history_summary.py                    # 전체 시리얼 재집계
+    python backfill_history_summary.py --since 2025-01-01 # 해당 일자 이후 변경된 시리얼만
+
+순서: sql/DCS_PROCESS_SUMMARY.sql로 테이블 생성 → 전체 백필 → HISTORY_SUMMARY_ENABLED=1로 서버 재시작
+→ 전환 사이에 저장된 이력을 --since로 한 번 더 반영
+"""
+import argparse
+import logging
+import os
+import time
+
+from dotenv import load_dotenv
+
+from DatabaseManager import DatabaseManager
+from StatementRegistry import StatementRegistry
+
+load_dotenv()
+
+
+def backfill(db_manager, statements, since=None, batch_size=500):
+    with db_manager.cursor() as (connection, cursor):
+        cursor.arraysize = 1000
+        statements.execute(cursor, 'dcs_summary_backfill_serials', {'since': since})
+        serials = [row[0] for row in cursor]
+    logging.info(f"백필 대상 시리얼: {len(serials)}개")
+
+    done = 0
+    with db_manager.cursor() as (connection, cursor):
+        for start in range(0, len(serials), batch_size):
+            batch = [{'serial_no': serial_no} for serial_no in serials[start:start + batch_size]]
+            statements.executemany(cursor, 'dcs_summary_refresh', batch)
+            connection.commit()
+            done += len(batch)
+            logging.info(f"백필 진행: {done}/{len(serials)}")
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DCS_PROCESS_SUMMARY 백필')
+    parser.add_argument('--since', help='YYYY-MM-DD 이후 변경된 시리얼만 재집계')
+    parser.add_argument('--batch-size', type=int, default=500, help='커밋 단위 시리얼 수')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    statements = StatementRegistry(stmt_cache_size=os.getenv('DB_STMT_CACHE_SIZE', '40'))
+    neuron_manager = DatabaseManager(
+        user=os.getenv('NEURON_USER', 'default_user'),
+        password=os.getenv('NEURON_PASSWORD', 'default_password'),
+        host=os.getenv('NEURON_HOST', 'default_host'),
+        port=os.getenv('NEURON_PORT', '1521'),
+        service_name=os.getenv('NEURON_SERVICE_NAME', 'default_service_name'),
+        pool_min=1,
+        pool_max=1,
+        name='NEURON',
+        statement_registry=statements
+    )
+
+    started = time.perf_counter()
+    try:
+        count = backfill(neuron_manager, statements, args.since, args.batch_size)
+        logging.info(f"백필 완료: {count}개 시리얼, {time.perf_counter() - started:.1f}초")
+    finally:
+        neuron_manager.close()
+
+
+if __name__ == '__main__':
+    main()
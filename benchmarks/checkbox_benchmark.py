@@ -0,0 +1,88 @@
+"""
+체크박스 인식(find_checkboxes) 벤치마크
+
+사용법:
+    python benchmarks/checkbox_benchmark.py                         # 부서별 크기의 합성 체크시트로 측정
+    python benchmarks/checkbox_benchmark.py 3186 11 VJ77 S123_2.png ...  # dept process model 이미지... 로 측정
+
+이전 방식(윤곽선마다 이미지 전체 크기 마스크)과 현재 방식(ROI 마스크 + 제외 영역 표)을
+같은 이미지에서 실행해 시간과 결과 일치 여부를 출력합니다.
+"""
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ImageProcessor import ImageProcessor  # noqa: E402
+from encode_benchmark import SHEET_SIZES, synthetic_sheet  # noqa: E402
+
+REPEAT = 3
+
+
+def legacy_find_boxes(image, process_code=None, model=None, dept=None):
+    """이전 find_checkboxes의 인식 부분 (결과 비교용)"""
+    gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    blurred = cv2.GaussianBlur(gray, (3, 3), 0)
+    edges = cv2.Canny(blurred, 50, 150)
+    contours, _ = cv2.findContours(edges, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+    zones = ImageProcessor.get_exclusion_zones(image.shape, process_code, model, dept)
+
+    boxes = []
+    for cnt in contours:
+        approx = cv2.approxPolyDP(cnt, 0.04 * cv2.arcLength(cnt, True), True)
+        if len(approx) == 4:
+            x, y, w, h = cv2.boundingRect(approx)
+            if 0.9 <= float(w) / h <= 1.13 and 7 <= w <= 25 and 7 <= h <= 25:
+                if any(x1 <= x <= x2 and y1 <= y <= y2 for x1, x2, y1, y2 in zones):
+                    continue
+                mask = np.zeros(gray.shape, np.uint8)
+                cv2.drawContours(mask, [cnt], 0, 255, -1)
+                mean, stddev = cv2.meanStdDev(gray, mask=mask)
+                if stddev[0][0] < 40:
+                    boxes.append({'x': x, 'y': y, 'width': w, 'height': h})
+    return boxes
+
+
+def measure(func):
+    timings = []
+    result = None
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000, result
+
+
+def run(label, image, process_code=None, model=None, dept=None):
+    legacy_ms, legacy_boxes = measure(lambda: legacy_find_boxes(image, process_code, model, dept))
+    current_ms, (_, current_boxes) = measure(
+        lambda: ImageProcessor.find_checkboxes(image, process_code, model=model, dept=dept))
+    same = legacy_boxes == current_boxes
+    print(f"[{label}] {image.shape[1]}x{image.shape[0]} 박스 {len(current_boxes)}개 | "
+          f"이전 {legacy_ms:8.1f} ms | 현재 {current_ms:8.1f} ms | "
+          f"x{legacy_ms / max(current_ms, 1e-6):.1f} | 결과 {'일치' if same else '불일치'}")
+    return same
+
+
+def main():
+    args = sys.argv[1:]
+    results = []
+    if len(args) >= 4:
+        dept, process_code, model = args[:3]
+        for path in args[3:]:
+            image = cv2.imread(path, cv2.IMREAD_COLOR)
+            if image is None:
+                print(f"이미지를 읽을 수 없습니다: {path}")
+                continue
+            results.append(run(os.path.basename(path), image, process_code, model, dept))
+    else:
+        for label, (height, width) in SHEET_SIZES.items():
+            results.append(run(label, synthetic_sheet(height, width), dept=label.split()[0]))
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+공정 페이지 인코딩 벤치마크 (인코딩 시간, 결과 크기)
+
+사용법:
+    python benchmarks/encode_benchmark.py                      # 부서별 크기의 합성 체크시트로 측정
+    python benchmarks/encode_benchmark.py CheckSheet/3186/Process/S123/S123_1.png ...  # 실제 이미지로 측정
+
+PIL PNG(현재 방식)와 OpenCV imencode(PNG 압축 레벨별, 무손실 WebP, JPEG)를 비교합니다.
+"""
+import base64
+import io
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ImageEncoder import ImageEncoder  # noqa: E402
+
+# 부서별 마스터 변환 DPI 기준 A4 페이지 크기 (UTA 150dpi, JUXTA/NEW SC 180dpi)
+SHEET_SIZES = {
+    '3165 (UTA, 150dpi)': (1754, 1240),
+    '3186 (JUXTA, 180dpi)': (2105, 1488),
+    '3188 (NEW SC, 180dpi)': (2105, 1488),
+}
+
+REPEAT = 5
+
+
+def synthetic_sheet(height, width, seed=0):
+    """표 선, 글자 모양 블록, 체크박스가 있는 흰 바탕 체크시트 이미지를 만듭니다."""
+    rng = np.random.default_rng(seed)
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+    for y in range(80, height - 80, 45):
+        cv2.line(image, (60, y), (width - 60, y), (0, 0, 0), 2)
+        for _ in range(int(rng.integers(3, 8))):
+            x = int(rng.integers(80, width - 300))
+            cv2.rectangle(image, (x, y + 10), (x + int(rng.integers(60, 240)), y + 30), (40, 40, 40), -1)
+        for x in (width - 200, width - 400, width - 600):
+            cv2.rectangle(image, (x, y + 12), (x + 18, y + 30), (0, 0, 0), 2)
+    for x in (60, width // 3, 2 * width // 3, width - 60):
+        cv2.line(image, (x, 80), (x, height - 80), (0, 0, 0), 2)
+    return image
+
+
+def measure(func):
+    timings = []
+    size = 0
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        size = len(func())
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000, size
+
+
+def pil_png(image):
+    buffer = io.BytesIO()
+    Image.fromarray(image[:, :, ::-1]).save(buffer, 'PNG', quality=70)
+    return buffer.getvalue()
+
+
+def run(label, image):
+    print(f"\n[{label}] {image.shape[1]}x{image.shape[0]}")
+    cases = [('PIL PNG (현재)', lambda: pil_png(image))]
+    for level in (1, 3, 6):
+        encoder = ImageEncoder(png_compression=level)
+        cases.append((f'cv2 PNG level {level}', lambda encoder=encoder: encoder.encode(image, 'png')[0]))
+    encoder = ImageEncoder()
+    cases.append(('cv2 WebP lossless', lambda: encoder.encode(image, 'webp')[0]))
+    cases.append((f'cv2 JPEG q{encoder.jpeg_quality}', lambda: encoder.encode(image, 'jpeg')[0]))
+    cases.append(('PIL PNG + base64 (이전 JSON)', lambda: base64.b64encode(pil_png(image))))
+
+    for name, func in cases:
+        elapsed, size = measure(func)
+        print(f"  {name:<28} {elapsed:8.1f} ms {size / 1024:10.1f} KB")
+
+
+def main():
+    paths = sys.argv[1:]
+    if paths:
+        for path in paths:
+            image = cv2.imread(path, cv2.IMREAD_COLOR)
+            if image is None:
+                print(f"이미지를 읽을 수 없습니다: {path}")
+                continue
+            run(os.path.basename(path), image)
+    else:
+        for label, (height, width) in SHEET_SIZES.items():
+            run(label, synthetic_sheet(height, width))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+merge_similar_boxes 동등성 확인 및 벤치마크
+
+사용법:
+    python benchmarks/merge_boxes_benchmark.py                              # 무작위 박스 묶음으로 확인
+    python benchmarks/merge_boxes_benchmark.py cache/checkbox_cache.sqlite  # 저장된 인식 결과로 확인
+
+이전 방식(upload_image 안의 이중 루프)과 ImageProcessor.merge_similar_boxes(격자 방식)의
+결과가 같은지 확인하고 실행 시간을 비교합니다. 결과가 하나라도 다르면 종료 코드 1을 반환합니다.
+"""
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ImageProcessor import ImageProcessor  # noqa: E402
+
+
+def legacy_merge_similar_boxes(boxes, threshold=20):
+    """이전 upload_image의 merge_similar_boxes (비교 기준)"""
+    merged_boxes = []
+    for box in boxes:
+        if not merged_boxes:
+            merged_boxes.append(box)
+        else:
+            merged = False
+            for i, merged_box in enumerate(merged_boxes):
+                if (abs(box['x'] - merged_box['x']) < threshold and
+                    abs(box['y'] - merged_box['y']) < threshold):
+                    merged_boxes[i] = {
+                        'x': (box['x'] + merged_box['x']) // 2,
+                        'y': (box['y'] + merged_box['y']) // 2,
+                        'width': max(box['width'], merged_box['width']),
+                        'height': max(box['height'], merged_box['height'])
+                    }
+                    merged = True
+                    break
+            if not merged:
+                merged_boxes.append(box)
+    return merged_boxes
+
+
+def random_box_sets(count=200, seed=0):
+    """체크박스 외곽/내곽이 겹쳐 인식되는 경우를 흉내 낸 박스 묶음"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        boxes = []
+        for _ in range(rng.randint(0, 400)):
+            x, y = rng.randint(0, 1500), rng.randint(0, 2100)
+            for _ in range(rng.randint(1, 3)):
+                boxes.append({'x': x + rng.randint(-25, 25), 'y': y + rng.randint(-25, 25),
+                              'width': rng.randint(7, 25), 'height': rng.randint(7, 25)})
+        rng.shuffle(boxes)
+        yield boxes
+
+
+def recorded_box_sets(path):
+    """checkbox_detection 캐시(SQLite)에 저장된 인식 결과"""
+    connection = sqlite3.connect(path)
+    try:
+        for (value,) in connection.execute('SELECT value FROM checkbox_detection'):
+            yield json.loads(value)['boxes']
+    finally:
+        connection.close()
+
+
+def main():
+    box_sets = list(recorded_box_sets(sys.argv[1]) if len(sys.argv) > 1 else random_box_sets())
+    legacy_total = current_total = 0.0
+    mismatches = 0
+    for boxes in box_sets:
+        started = time.perf_counter()
+        expected = legacy_merge_similar_boxes(boxes)
+        legacy_total += time.perf_counter() - started
+
+        started = time.perf_counter()
+        actual = ImageProcessor.merge_similar_boxes(boxes)
+        current_total += time.perf_counter() - started
+
+        if expected != actual:
+            mismatches += 1
+
+    print(f"박스 묶음 {len(box_sets)}개 | 이전 {legacy_total * 1000:.1f} ms | "
+          f"현재 {current_total * 1000:.1f} ms | 불일치 {mismatches}개")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+Merged 체크시트 병합 메모리/시간 벤치마크
+
+사용법:
+    python benchmarks/merge_memory_benchmark.py                # 부서별 크기의 합성 체크시트로 측정
+    python benchmarks/merge_memory_benchmark.py juxta a.png b.png c.png ...   # uta|juxta|newsc 와 실제 이미지로 측정
+                                                               # (newsc는 마지막 이미지가 오른쪽)
+
+이전 방식(전체 이미지 로드 → 크기 조정 복사 → np.concatenate 두 번)과
+현재 방식(최종 배치 계산 → 캔버스 한 번 할당 → 한 장씩 읽어 제자리에 씀)을
+각각 새 프로세스에서 실행해 최대 메모리(ru_maxrss 증가분, tracemalloc 최대값)와 시간을 비교합니다.
+"""
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ImageProcessor import ImageProcessor  # noqa: E402
+from encode_benchmark import synthetic_sheet  # noqa: E402
+
+
+def legacy_merge_uta(image_paths, output_path, target_width=800):
+    """이전 merge_checksheet_images_uta (PIL LANCZOS, 전체 이미지 보관)"""
+    images = []
+    for path in image_paths:
+        img = Image.open(path)
+        new_height = int(img.height * (target_width / img.width))
+        images.append(img.resize((target_width, new_height), Image.LANCZOS))
+    merged_image = Image.new('RGB', (target_width, sum(img.height for img in images)))
+    current_y = 0
+    for img in images:
+        merged_image.paste(img, (0, current_y))
+        current_y += img.height
+    merged_image.save(output_path)
+
+
+def legacy_stack(images):
+    max_width = max(img.shape[1] for img in images)
+    resized = []
+    for img in images:
+        h, w, _ = img.shape
+        if w != max_width:
+            new_h = int(h * (max_width / float(w)))
+            interpolation = cv2.INTER_CUBIC if new_h > h else cv2.INTER_AREA
+            img = cv2.resize(img, (max_width, new_h), interpolation=interpolation)
+        resized.append(img)
+    return np.concatenate(resized, axis=0)
+
+
+def legacy_fit_height(img, height):
+    h, w, _ = img.shape
+    if h == height:
+        return img
+    interpolation = cv2.INTER_AREA if height < h else cv2.INTER_CUBIC
+    return cv2.resize(img, (int(w * (height / float(h))), height), interpolation=interpolation)
+
+
+def legacy_merge_juxta(image_paths, output_path, target_width=800):
+    """이전 merge_checksheet_images_juxta (오른쪽 세로 합치기 → 전체 리사이즈 → 좌우 합치기)"""
+    img_left = cv2.imread(image_paths[0], cv2.IMREAD_COLOR)
+    right_images = [cv2.imread(path, cv2.IMREAD_COLOR) for path in image_paths[1:]]
+    big_right = legacy_fit_height(legacy_stack(right_images), img_left.shape[0])
+    cv2.imwrite(output_path, np.concatenate((img_left, big_right), axis=1))
+
+
+def legacy_merge_newsc(left_images, right_image, output_path):
+    """이전 merge_checksheet_images_newsc"""
+    merged_left = legacy_stack([cv2.imread(path, cv2.IMREAD_COLOR) for path in left_images])
+    img_right = legacy_fit_height(cv2.imread(right_image, cv2.IMREAD_COLOR), merged_left.shape[0])
+    cv2.imwrite(output_path, np.concatenate((merged_left, img_right), axis=1))
+
+
+MERGERS = {
+    'uta': (legacy_merge_uta, ImageProcessor.merge_checksheet_images_uta),
+    'juxta': (legacy_merge_juxta, ImageProcessor.merge_checksheet_images_juxta),
+    'newsc': (legacy_merge_newsc, ImageProcessor.merge_checksheet_images_newsc),
+}
+
+
+def max_rss_kb():
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage // 1024 if sys.platform == 'darwin' else usage
+
+
+def run_merge(kind, variant, paths, output_path, queue):
+    """새 프로세스에서 한 번 병합하고 (시간, ru_maxrss 증가분, tracemalloc 최대값)을 돌려줍니다."""
+    func = MERGERS[kind][0 if variant == 'legacy' else 1]
+    args = (paths[:-1], paths[-1], output_path) if kind == 'newsc' else (paths, output_path)
+    baseline = max_rss_kb()
+    tracemalloc.start()
+    started = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - started
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    queue.put((elapsed * 1000, (max_rss_kb() - baseline) / 1024, traced_peak / 1024 / 1024))
+
+
+def measure(kind, variant, paths, output_path):
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=run_merge, args=(kind, variant, paths, output_path, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def compare(kind, paths, workdir):
+    print(f"\n[{kind}] 이미지 {len(paths)}장")
+    outputs = {}
+    for variant in ('legacy', 'current'):
+        outputs[variant] = os.path.join(workdir, f"{kind}_{variant}.png")
+        elapsed, rss_mb, traced_mb = measure(kind, variant, paths, outputs[variant])
+        print(f"  {variant:<8} {elapsed:8.1f} ms | RSS 증가 {rss_mb:7.1f} MB | numpy 최대 {traced_mb:7.1f} MB")
+
+    legacy = cv2.imread(outputs['legacy'], cv2.IMREAD_COLOR)
+    current = cv2.imread(outputs['current'], cv2.IMREAD_COLOR)
+    if legacy.shape != current.shape:
+        print(f"  결과 크기 불일치: {legacy.shape} != {current.shape}")
+        return False
+    diff = np.abs(legacy.astype(np.int16) - current.astype(np.int16))
+    print(f"  결과 크기 {current.shape[1]}x{current.shape[0]} 일치 | 픽셀 차이 평균 {diff.mean():.2f}, "
+          f"최대 {diff.max()} (리사이즈를 한 번만 하므로 보간 차이만 있음)")
+    return True
+
+
+def synthetic_set(workdir, count, height=2105, width=1488):
+    paths = []
+    for index in range(count):
+        path = os.path.join(workdir, f"sheet_{index}.png")
+        cv2.imwrite(path, synthetic_sheet(height, width, seed=index))
+        paths.append(path)
+    return paths
+
+
+def main():
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        if len(sys.argv) > 2:
+            results.append(compare(sys.argv[1], sys.argv[2:], workdir))
+        else:
+            results.append(compare('uta', synthetic_set(workdir, 4, 1754, 1240), workdir))
+            paths = synthetic_set(workdir, 4)
+            results.append(compare('juxta', paths, workdir))
+            results.append(compare('newsc', paths, workdir))
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == '__main__':
+    main()
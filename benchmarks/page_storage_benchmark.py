@@ -0,0 +1,99 @@
+"""
+Process/Master 페이지 저장 형식 벤치마크 (디스크 크기, 읽기 시간, 무손실 여부)
+
+사용법:
+    python benchmarks/page_storage_benchmark.py                     # 부서별 크기의 합성 체크시트로 측정
+    python benchmarks/page_storage_benchmark.py CheckSheet/3186/Process/S123/S123_1.png ...  # 실제 이미지로 측정
+
+rgb(24비트 PNG, 이전 방식: PIL로 읽어 RGB 변환)와 gray(8비트 PNG + 색 오버레이, PageImage.read)를
+색 표시가 없는 페이지와 빨강/노랑 표시가 있는 페이지에서 비교하고,
+다시 읽은 픽셀과 체크박스 인식 결과가 같은지 확인합니다.
+"""
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ImageProcessor import ImageProcessor  # noqa: E402
+from PageImage import PageImage  # noqa: E402
+from encode_benchmark import SHEET_SIZES, synthetic_sheet  # noqa: E402
+
+REPEAT = 5
+
+
+def with_marks(image):
+    """빨간 원, 노란 칸 채우기 등 색 표시를 더한 페이지를 만듭니다."""
+    marked = image.copy()
+    height, width = marked.shape[:2]
+    for y in range(120, height - 200, 270):
+        cv2.circle(marked, (width // 2, y), 40, (0, 0, 255), 3)
+        cv2.rectangle(marked, (width - 398, y + 14), (width - 384, y + 28), (0, 255, 255), -1)
+    return marked
+
+
+def legacy_read(path):
+    """이전 upload_image 읽기 (PIL RGB 변환 후 BGR 배열)"""
+    with Image.open(path) as img:
+        return np.asarray(img.convert('RGB'))[:, :, ::-1]
+
+
+def timed(func, path):
+    timings = []
+    result = None
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        result = func(path)
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000, result
+
+
+def stored_bytes(path):
+    overlay_path = PageImage.overlay_path(path)
+    return os.path.getsize(path) + (os.path.getsize(overlay_path) if os.path.exists(overlay_path) else 0)
+
+
+def compare(name, image, workdir):
+    paths = {}
+    for mode in PageImage.MODES:
+        paths[mode] = os.path.join(workdir, f"{mode}.png")
+        PageImage.write(paths[mode], image, mode, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+
+    legacy_ms, legacy = timed(legacy_read, paths['rgb'])
+    gray_ms, page = timed(PageImage.read, paths['gray'])
+    rgb_kb = stored_bytes(paths['rgb']) / 1024
+    gray_kb = stored_bytes(paths['gray']) / 1024
+    overlay = '오버레이 있음' if os.path.exists(PageImage.overlay_path(paths['gray'])) else '오버레이 없음'
+    print(f"  {name:<28} rgb {rgb_kb:8.1f} KB {legacy_ms:7.1f} ms | gray {gray_kb:8.1f} KB {gray_ms:7.1f} ms "
+          f"({page.ndim}차원, {overlay})")
+
+    lossless = np.array_equal(PageImage.to_bgr(page), legacy)
+    _, legacy_boxes = ImageProcessor.find_checkboxes(np.ascontiguousarray(legacy), '11', dept='3186')
+    _, boxes = ImageProcessor.find_checkboxes(page, '11', dept='3186')
+    same_boxes = boxes == legacy_boxes
+    print(f"    픽셀 {'일치' if lossless else '불일치'}, 체크박스 {len(boxes)}개 {'일치' if same_boxes else '불일치'}")
+    return lossless and same_boxes
+
+
+def main():
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        if len(sys.argv) > 1:
+            for path in sys.argv[1:]:
+                image = PageImage.to_bgr(PageImage.read(path))
+                results.append(compare(os.path.basename(path), image, workdir))
+        else:
+            for name, (height, width) in SHEET_SIZES.items():
+                print(name)
+                sheet = synthetic_sheet(height, width)
+                results.append(compare('흑백', sheet, workdir))
+                results.append(compare('색 표시', with_marks(sheet), workdir))
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == '__main__':
+    main()
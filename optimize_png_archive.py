@@ -0,0 +1,55 @@
+"""
+저장된 체크시트 PNG 무손실 재압축 스크립트
+
+사용법:
+    python optimize_png_archive.py --dry-run --max-files 1000   # 교체하지 않고 절감량만 확인
+    python optimize_png_archive.py                              # NETWORK_PATH, UPLOAD_FOLDER 전체 최적화
+    python optimize_png_archive.py --root D:/CheckSheet --throttle 0.2
+
+처리한 파일은 PNG_OPTIMIZE_DB(SQLite)에 기록되어 다시 실행하면 이어서 진행합니다.
+"""
+import argparse
+import logging
+import os
+
+from dotenv import load_dotenv
+
+from CacheManager import SQLiteCacheStore
+from MergeWorker import MergeWorker
+from PngOptimizer import PngOptimizer
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Checked/Merged PNG 무손실 재압축')
+    parser.add_argument('--root', action='append', help='대상 루트 (여러 번 지정 가능, 기본: NETWORK_PATH, UPLOAD_FOLDER)')
+    parser.add_argument('--max-files', type=int, help='최적화를 시도할 최대 파일 수')
+    parser.add_argument('--throttle', type=float, default=float(os.getenv('PNG_OPTIMIZE_THROTTLE', '0.05')),
+                        help='파일 사이 대기 시간(초)')
+    parser.add_argument('--min-age-hours', type=float, default=24, help='이 시간보다 최근에 바뀐 파일은 건너뜀')
+    parser.add_argument('--dry-run', action='store_true', help='파일을 교체하지 않고 절감량만 계산')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    roots = args.root or [os.getenv('NETWORK_PATH'), os.getenv('UPLOAD_FOLDER')]
+    store_path = os.getenv('PNG_OPTIMIZE_DB', 'cache/png_optimized.sqlite')
+    optimizer = PngOptimizer(
+        roots,
+        store=SQLiteCacheStore(store_path, table='png_optimized') if store_path else None,
+        throttle_seconds=args.throttle,
+        min_age_seconds=args.min_age_hours * 3600,
+        # 서버의 병합 작업 큐에서 대기/처리 중인 시리얼은 건너뜀
+        busy_serials=lambda: MergeWorker.read_active_serials(os.getenv('MERGE_QUEUE_DB', 'cache/merge_queue.sqlite'))
+    )
+    report = optimizer.run(max_files=args.max_files, dry_run=args.dry_run)
+    before = report['bytes_before'] / 1024 / 1024
+    after = report['bytes_after'] / 1024 / 1024
+    logging.info(f"대상 {report['scanned']}개 중 {report['attempted']}개 시도, {report['optimized']}개 축소 | "
+                 f"{before:.1f}MB → {after:.1f}MB ({report['bytes_saved'] / 1024 / 1024:.1f}MB 절감), "
+                 f"{report['seconds']}초")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,19 @@
+-- 이력 조회 화면용 요약 테이블 (시리얼/부서/공정별 1행)
+-- 생성 후 backfill_history_summary.py로 기존 DCS_HISTORY를 채우고 HISTORY_SUMMARY_ENABLED=1로 전환
+CREATE TABLE DCS_PROCESS_SUMMARY (
+    SERIAL_NO       VARCHAR2(30)  NOT NULL,
+    DEPT_CODE       VARCHAR2(20)  NOT NULL,
+    PROCESS_CODE    VARCHAR2(10)  NOT NULL,
+    LINE_CODE       VARCHAR2(20)  NOT NULL,   -- 검색용 라인 코드 (3165/3186/3188)
+    STATUS          NUMBER,
+    EMP_NO          VARCHAR2(20),
+    EVENT_D         DATE,                     -- 최근 작업 시간 (RENEWAL_D, 없으면 ENTRY_D)
+    FIRST_ENTRY_D   DATE,
+    LAST_ENTRY_D    DATE,
+    UPDATED_D       DATE DEFAULT SYSDATE,
+    CONSTRAINT PK_DCS_PROCESS_SUMMARY PRIMARY KEY (SERIAL_NO, DEPT_CODE, PROCESS_CODE)
+);
+
+CREATE INDEX IX_DCS_SUMMARY_LINE_SERIAL ON DCS_PROCESS_SUMMARY (LINE_CODE, SERIAL_NO);
+
+CREATE INDEX IX_DCS_SUMMARY_LINE_ENTRY ON DCS_PROCESS_SUMMARY (LINE_CODE, LAST_ENTRY_D);
@@ -0,0 +1,5 @@
+SELECT E.EMP_NO, E.EMP_NAMEK, E.DEPT_CODE, D.DEPT_NAMEK,
+       CASE WHEN E.GUBUN = '0' AND CO.CODE_CODE IS NOT NULL THEN 1 ELSE 0 END ACTIVE
+FROM EMPM E, DEPTM D, ETC2 CO
+WHERE E.DEPT_CODE = D.DEPT_CODE (+) AND CO.CODE_TYPE (+) = '10'
+      AND CO.CODE_CODE (+) = TRIM(E.JIKKUB)
\ No newline at end of file
@@ -28,7 +28,7 @@ JOIN
 LEFT JOIN
     PDSD0010 c ON a.PROD_NO = c.PROD_NO
 WHERE
-    a.INDEX_NO = '{index_no}'
-    AND a.INDEX_NO_SFIX = '{index_no_sfix}'
+    a.INDEX_NO = :index_no
+    AND a.INDEX_NO_SFIX = :index_no_sfix
 ORDER BY a.ENTRY_D DESC
 FETCH FIRST 1 ROW ONLY
\ No newline at end of file